@@ -0,0 +1,80 @@
+"""
+接口压测.
+
+并发请求同一个接口, 输出吞吐量和延迟分位数.
+
+    python benchmarks/api_load.py --url http://127.0.0.1:8000/bidding/notice/20250101 -c 32 -n 2000
+"""
+
+import time
+import argparse
+import threading
+import requests
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run_load(url: str, concurrency: int, total: int, headers: dict = None) -> dict:
+    """用 concurrency 个线程共发送 total 个请求, 每个线程复用一个连接."""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        nonlocal errors
+        session = requests.Session()
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            start = time.perf_counter()
+            try:
+                response = session.get(url, headers=headers, timeout=30)
+                ok = response.status_code in (200, 304)
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors += 1
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duration = time.perf_counter() - start
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / duration if duration else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def format_result(name: str, result: dict) -> str:
+    return (f"{name}: {result['requests']} 请求, {result['errors']} 失败, {result['rps']:.1f} req/s, "
+            f"p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="API load test")
+    parser.add_argument('--url', type=str, required=True, help="Endpoint to request")
+    parser.add_argument('-c', '--concurrency', type=int, default=16, help="Number of concurrent clients")
+    parser.add_argument('-n', '--requests', type=int, default=1000, help="Total number of requests")
+    parser.add_argument('--encoding', type=str, default="gzip, br", help="Accept-Encoding header sent by clients")
+    args = parser.parse_args()
+
+    result = run_load(args.url, args.concurrency, args.requests, headers={"Accept-Encoding": args.encoding})
+    print(format_result(args.url, result))
@@ -0,0 +1,106 @@
+"""
+HTML 解析压测.
+
+按站点比较 html.parser / lxml 完整解析和只解析目标部分 (SoupStrainer) 的耗时. 默认使用按真实页面
+结构生成的样例页面, 也可以用 --html 指定保存下来的页面.
+
+    python benchmarks/parse_bench.py -n 50
+    python benchmarks/parse_bench.py --site bidding_notice --html notice.html
+"""
+
+import time
+import argparse
+from llm_tools.utils.html_parser import parse_html, strainer, resolve_features
+from llm_tools.tools.bidding_csg import LIST_ONLY, NOTICE_ONLY
+from llm_tools.tools.taoguba import ARTICLE_ONLY, HOT_LIST_ONLY
+
+# 页面头尾的导航、脚本和样式, 真实页面中这部分往往比正文还大
+PAGE_CHROME = "".join(
+    f'<div class="nav"><ul>{"".join(f"<li><a href=/n{i}_{j}>导航{j}</a></li>" for j in range(20))}</ul></div>'
+    f'<script>var config{i} = {{"key": "{"x" * 200}"}};</script>'
+    for i in range(30)
+)
+
+
+def page(body: str) -> str:
+    return f"<html><head><title>样例</title></head><body>{PAGE_CHROME}{body}{PAGE_CHROME}</body></html>"
+
+
+def bidding_list_page() -> str:
+    items = "".join(
+        f'<li><a href="/zbgg/{i}">招标公告</a><a href="/a/{i}">甲方{i}</a>'
+        f'<a href="/zbgg/{i}.jhtml">某某项目{i}</a><span class="Black14 Gray">2025-01-02</span></li>'
+        for i in range(20)
+    )
+    return page(f'<div class="List2"><ul>{items}</ul></div>')
+
+
+def bidding_notice_page() -> str:
+    rows = "".join(f"<tr><td>标的{i}</td><td>标包{i}</td><td>{i * 10.5}</td></tr>" for i in range(200))
+    return page(
+        '<h1 class="s-title">某某项目招标公告</h1><div class="s-date">2025-01-02</div>'
+        f'<div class="Content"><p>{"公告正文。" * 500}</p><table><tr><td>标的</td><td>标包</td><td>最高限价</td></tr>{rows}</table></div>'
+    )
+
+
+def tgb_article_page() -> str:
+    return page(f'<div class="article-text p_coten">{"<p>正文段落, 讨论行情和交易。</p>" * 300}</div>')
+
+
+def tgb_hot_list_page() -> str:
+    items = "".join(
+        f'<div class="Nbbs-tiezi-lists"><a class="overhide mw300" title="热帖{i}" href="Article/{i}/1">热帖{i}</a>'
+        f'<a class="mw100 overhide">作者{i}</a><div class="left middle-list-post">2025-01-02 10:00</div></div>'
+        for i in range(50)
+    )
+    return page(items)
+
+
+SITES = {
+    "bidding_list": (bidding_list_page, LIST_ONLY, ('div', 'List2')),
+    "bidding_notice": (bidding_notice_page, NOTICE_ONLY, ('div', 'Content')),
+    "tgb_article": (tgb_article_page, ARTICLE_ONLY, ('div', 'article-text p_coten')),
+    "tgb_hot_list": (tgb_hot_list_page, HOT_LIST_ONLY, ('div', 'Nbbs-tiezi-lists')),
+}
+
+
+def bench(html: str, parse_only, target: tuple, features: str, rounds: int) -> float:
+    """返回平均每次解析加查找目标标签的毫秒数"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        soup = parse_html(html, parse_only, features=features)
+        assert soup.find(target[0], class_=target[1]) is not None
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def run(site: str, html: str, rounds: int) -> dict:
+    _, parse_only, target = SITES[site]
+    backends = ["html.parser"]
+    if resolve_features("auto") == "lxml":
+        backends.append("lxml")
+    result = {}
+    for features in backends:
+        result[f"{features} 完整"] = bench(html, None, target, features, rounds)
+        result[f"{features} 部分"] = bench(html, parse_only, target, features, rounds)
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="HTML parse benchmark")
+    parser.add_argument('--site', type=str, choices=list(SITES), help="Only benchmark one site")
+    parser.add_argument('--html', type=str, help="Saved page to parse instead of the generated sample")
+    parser.add_argument('-n', '--rounds', type=int, default=20, help="Parses per backend")
+    args = parser.parse_args()
+
+    sites = [args.site] if args.site else list(SITES)
+    for site in sites:
+        if args.html:
+            with open(args.html, 'r', encoding='utf-8') as file:
+                html = file.read()
+        else:
+            html = SITES[site][0]()
+        result = run(site, html, args.rounds)
+        baseline = result["html.parser 完整"]
+        print(f"{site} ({len(html) // 1024} KB):")
+        for name, ms in result.items():
+            print(f"  {name}: {ms:.2f} ms ({baseline / ms:.1f}x)")
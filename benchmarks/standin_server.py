@@ -0,0 +1,92 @@
+"""
+本地替身服务.
+
+用 fixtures/ 中录制的页面模拟南方电网招标网站和淘股吧, 每个响应前按 --latency 等待, 用于离线压测爬虫.
+列表页按 page 参数改写公告编号和分页信息, 每一页的公告链接都不相同.
+
+    python benchmarks/standin_server.py --port 8765 --latency 0.05
+
+爬虫通过环境变量指向替身服务:
+
+    BIDDING_CSG_BASEURL=http://127.0.0.1:8765 TGB_BASEURL=http://127.0.0.1:8765/ python -m llm_tools.crawlers.tgb
+"""
+
+import os
+import re
+import time
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+LIST_PAGES = 10
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as infile:
+        return infile.read()
+
+
+def render_list_page(template: str, page: int) -> str:
+    """改写列表页的公告编号、当前页和下一页链接"""
+    html = re.sub(r"/zbgg/(\d+)\.jhtml", lambda m: f"/zbgg/{int(m.group(1)) + page * 1000}.jhtml", template)
+    html = html.replace(f"1/{LIST_PAGES}页", f"{page}/{LIST_PAGES}页")
+    if page >= LIST_PAGES:
+        return html.replace('<a href="/dbsearch.jspx?page=2">下一页</a>', '<a disabled="disabled">下一页</a>')
+    return html.replace("/dbsearch.jspx?page=2", f"/dbsearch.jspx?page={page + 1}")
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    fixtures = {}
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlsplit(self.path)
+        if url.path == '/dbsearch.jspx':
+            page = int(parse_qs(url.query).get('page', ['1'])[0])
+            body = render_list_page(self.fixtures['csg_list'], page)
+        elif url.path.startswith('/zbgg/'):
+            body = self.fixtures['csg_detail']
+        elif url.path.startswith('/jinghua/'):
+            body = self.fixtures['tgb_hot_list']
+        elif url.path.startswith('/a/'):
+            body = self.fixtures['tgb_comments'] if re.search(r"-\d+$", url.path) else self.fixtures['tgb_article']
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 0, latency: float = 0.0) -> ThreadingHTTPServer:
+    """在后台线程中启动替身服务, port 为 0 时随机选择端口. 地址见 server.server_address"""
+    fixtures = {name[:-5]: load_fixture(name) for name in os.listdir(FIXTURE_DIR) if name.endswith('.html')}
+    handler = type('Handler', (StandinHandler,), {'latency': latency, 'fixtures': fixtures})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Offline stand-in for the crawled sites")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds to wait before every response")
+    args = parser.parse_args()
+
+    server = start_server(args.port, args.latency)
+    print(f"替身服务: http://127.0.0.1:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
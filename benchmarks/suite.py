@@ -0,0 +1,203 @@
+"""
+离线压测套件.
+
+不访问外网: 解析压测使用 fixtures/ 中录制的页面; 爬虫压测请求本地替身服务 (standin_server);
+接口压测在本地启动 uvicorn, 数据目录使用临时目录. 输出每项的吞吐量和延迟分位数, 部署前对比结果即可发现性能回退.
+
+    python benchmarks/suite.py
+    python benchmarks/suite.py --latency 0.05 --rounds 200 --skip-browser
+
+端到端的 BiddingCrawler.crawl 需要本机安装了 Playwright 的 Chromium, 启动失败时跳过并给出原因.
+"""
+
+import os
+import sys
+import time
+import socket
+import contextlib
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from standin_server import start_server, load_fixture, LIST_PAGES
+from api_load import run_load, percentile
+
+
+def measure(fn, rounds: int) -> dict:
+    """调用 fn rounds 次, 返回吞吐量和延迟分位数. 被测代码的 print 输出丢弃"""
+    latencies = []
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(rounds):
+            t = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - t)
+    duration = time.perf_counter() - start
+    return {
+        "ops": rounds,
+        "ops_per_s": rounds / duration if duration else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def report(name: str, result: dict):
+    if "skipped" in result:
+        print(f"{name:<44} 跳过: {result['skipped']}")
+        return
+    unit = result.get("unit", "ops")
+    print(f"{name:<44} {result['ops']:>6} {unit}  {result['ops_per_s']:>9.1f} {unit}/s  "
+          f"p50 {result['p50_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms")
+
+
+def bench_parsers(rounds: int):
+    from llm_tools.tools.bidding_csg import BiddingCSG, BiddingParser, CONTENT_ONLY
+    from llm_tools.tools.taoguba import extract_comments
+    from llm_tools.utils.html_parser import parse_html
+
+    csg_list = load_fixture('csg_list.html')
+    def parse_list():
+        crawler = BiddingCSG()
+        crawler.end_date = '2000-01-01'
+        crawler.parse(csg_list)
+    report("BiddingCSG.parse", measure(parse_list, rounds))
+
+    content = str(parse_html(load_fixture('csg_detail.html'), CONTENT_ONLY).find('div', class_='Content'))
+    report("BiddingParser.parse_announcement", measure(lambda: BiddingParser(content).parse_announcement(), rounds))
+
+    # Taoguba.read_comments 读取 page.content() 后调用 extract_comments
+    comments = load_fixture('tgb_comments.html')
+    report("Taoguba.read_comments", measure(lambda: extract_comments(comments, '涅盘重升'), rounds))
+
+
+def bench_tgb_fetch(rounds: int):
+    from llm_tools.tools.taoguba import Taoguba
+    tgb = Taoguba()
+    result = measure(tgb.get_hot_articles, rounds)
+    report("Taoguba.get_hot_articles (替身服务)", result)
+
+
+def bench_bidding_crawl():
+    from llm_tools.crawlers.bidding_notification import BiddingCrawler
+    from llm_tools.tools.browser_pool import get_browser_pool
+    try:
+        with get_browser_pool().lease('benchmark'):
+            pass
+    except Exception as e:
+        report("BiddingCrawler.crawl (替身服务)", {"skipped": f"浏览器无法启动 ({str(e).splitlines()[0]})"})
+        return
+    crawler = BiddingCrawler('20250101', incremental=False)
+    start = time.perf_counter()
+    try:
+        crawler.crawl()
+    finally:
+        crawler.close()
+    duration = time.perf_counter() - start
+    count = len(crawler.new_urls)
+    report("BiddingCrawler.crawl (替身服务)", {
+        "ops": count, "unit": "条", "ops_per_s": count / duration if duration else 0.0,
+        "p50_ms": duration * 1000 / max(count, 1), "p99_ms": duration * 1000,
+    })
+
+
+def prepare_api_data(notice_count: int):
+    """在临时数据目录中写入接口读取的公告文件、热帖文件和文章存储"""
+    from llm_tools.config import BIDDING_DIR, TGB_DIR
+    from llm_tools.utils.jsonl import JsonlWriter
+    from llm_tools.tools.article_store import ArticleStore
+    from llm_tools.search.notice_index import NoticeIndex
+
+    notices = [{
+        "title": f"广东电网有限责任公司2025年配网运维服务项目{i}招标公告",
+        "content": "项目已具备招标条件，现对该项目进行公开招标。" * 20,
+        "notice_time": "2025-01-02 10:30:00",
+        "company": "广东电网有限责任公司",
+        "url": f"https://www.bidding.csg.cn/zbgg/{1200000000 + i}.jhtml",
+        "type": "招标公告",
+    } for i in range(notice_count)]
+    filename = os.path.join(BIDDING_DIR, "bidding_notice_20250102.jsonl")
+    with JsonlWriter(filename) as writer:
+        for notice in notices:
+            writer.write(notice)
+    NoticeIndex().add(notices, filename)
+
+    articles = [{
+        "userName": f"交易者{i % 7}", "subject": f"精华帖{i}: 情绪周期与龙头战法复盘",
+        "url": f"https://www.tgb.cn/a/{10000 + i}", "date": "2025-01-02",
+        "content": "短线交易要跟随市场龙头，控制仓位，情绪周期决定进攻和防守。" * 40,
+    } for i in range(200)]
+    with JsonlWriter(os.path.join(TGB_DIR, "hot_articles.jsonl")) as writer:
+        for article in articles[:40]:
+            writer.write(article)
+    ArticleStore().append(articles)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def bench_api(concurrency: int, total: int):
+    import uvicorn
+    from llm_tools.main import app
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    base = f"http://127.0.0.1:{port}"
+    endpoints = [
+        "/bidding/notice/20250102",
+        "/tgb/hot-articles",
+        "/bidding/search?q=运维&page_size=20",
+        "/tgb/search?q=龙头",
+    ]
+    try:
+        for path in endpoints:
+            result = run_load(base + path, concurrency, total, headers={"Accept-Encoding": "gzip, br"})
+            report(f"GET {path}", {"ops": result["requests"], "unit": "req", "ops_per_s": result["rps"],
+                                   "p50_ms": result["p50_ms"], "p99_ms": result["p99_ms"]})
+            if result["errors"]:
+                print(f"{'':<44} {result['errors']} 个请求失败")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Offline benchmark suite")
+    parser.add_argument('--latency', type=float, default=0.02, help="Stand-in server latency per response in seconds")
+    parser.add_argument('--rounds', type=int, default=100, help="Iterations for parse benchmarks")
+    parser.add_argument('--fetch-rounds', type=int, default=5, help="Iterations for the stand-in fetch benchmark")
+    parser.add_argument('-c', '--concurrency', type=int, default=16, help="Concurrent API clients")
+    parser.add_argument('-n', '--requests', type=int, default=1000, help="Requests per API endpoint")
+    parser.add_argument('--notices', type=int, default=2000, help="Notices in the generated API data file")
+    parser.add_argument('--skip-browser', action='store_true', help="Skip the end-to-end browser crawl")
+    args = parser.parse_args()
+
+    # 配置在导入 llm_tools 时读取, 必须先准备好数据目录和替身服务地址
+    standin = start_server(latency=args.latency)
+    standin_url = f"http://127.0.0.1:{standin.server_address[1]}"
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="llm_tools_bench_")
+    os.environ["BIDDING_CSG_BASEURL"] = standin_url
+    os.environ["TGB_BASEURL"] = standin_url + "/"
+    os.environ["CRAWL_HOST_MIN_INTERVAL"] = "0"
+    os.environ["CRAWL_HOST_MAX_INTERVAL"] = "0"
+    os.environ["LLM_CACHE_BYPASS"] = "true"
+    # 接口基准只测请求处理, 不在被测进程中启动定时抓取任务
+    os.environ["SCHEDULER_ENABLE"] = "false"
+    print(f"替身服务 {standin_url}, 延迟 {args.latency * 1000:.0f} ms, 列表 {LIST_PAGES} 页, 数据目录 {os.environ['DATA_DIR']}")
+
+    print("== 解析 ==")
+    bench_parsers(args.rounds)
+    print("== 爬虫 ==")
+    bench_tgb_fetch(args.fetch_rounds)
+    if args.skip_browser:
+        report("BiddingCrawler.crawl (替身服务)", {"skipped": "--skip-browser"})
+    else:
+        bench_bidding_crawl()
+    print("== 接口 ==")
+    prepare_api_data(args.notices)
+    bench_api(args.concurrency, args.requests)
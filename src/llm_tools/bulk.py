@@ -0,0 +1,109 @@
+"""
+批量写数据库.
+
+按唯一键去重插入和按唯一键批量更新, 每 batch_size 行一次往返, 全部写入在同一个事务中完成.
+"""
+
+import time
+from llm_tools.config import DB_BATCH_SIZE
+from llm_tools.logger import get_logger
+from llm_tools.metrics import counter, histogram
+
+logger = get_logger()
+
+DB_ROUND_TRIPS = counter("db_round_trips_total", "数据库往返次数", ["table", "op"])
+DB_ROWS_WRITTEN = counter("db_rows_written_total", "写入数据库的行数", ["table", "op"])
+DB_WRITE_SECONDS = histogram("db_write_seconds", "批量写入耗时 (秒), 含提交", ["table", "op"])
+
+def record_write(table: str, op: str, round_trips: int, rows: int, start: float):
+    """记录一次批量写入的指标, round_trips 包含提交"""
+    DB_ROUND_TRIPS.inc(round_trips, table=table, op=op)
+    DB_ROWS_WRITTEN.inc(rows, table=table, op=op)
+    DB_WRITE_SECONDS.observe(time.perf_counter() - start, table=table, op=op)
+
+def chunked(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def placeholders(n: int) -> str:
+    return ', '.join(['%s'] * n)
+
+def insert_missing(connection, table: str, columns: list, rows: list, key: str = 'url', batch_size: int = DB_BATCH_SIZE) -> int:
+    """插入唯一键在表中不存在的行, 返回插入的行数.
+
+    ## Parameter:
+    connection: 数据库连接, 由调用方负责关闭
+    table: 表名
+    columns: 列名, 与 rows 中每个元组的顺序一致
+    rows: 待插入的行
+    key: 唯一键列名, 必须在 columns 中
+    batch_size: 每次查询或插入的行数
+    """
+    key_index = columns.index(key)
+
+    # 输入内部去重, 保留第一次出现的行
+    unique_rows = {}
+    for row in rows:
+        unique_rows.setdefault(row[key_index], row)
+
+    cursor = connection.cursor()
+    round_trips = 0
+    start = time.perf_counter()
+    try:
+        existing = set()
+        keys = list(unique_rows.keys())
+        for chunk in chunked(keys, batch_size):
+            cursor.execute(f"SELECT {key} FROM {table} WHERE {key} IN ({placeholders(len(chunk))})", chunk)
+            existing.update(row[0] for row in cursor.fetchall())
+            round_trips += 1
+
+        new_rows = [row for k, row in unique_rows.items() if k not in existing]
+        insert_query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders(len(columns))})"
+        for chunk in chunked(new_rows, batch_size):
+            cursor.executemany(insert_query, chunk)
+            round_trips += 1
+        connection.commit()
+        record_write(table, "insert", round_trips + 1, len(new_rows), start)
+        logger.info(f"[{table}] 跳过已存在 {len(existing)} 条, 插入 {len(new_rows)} 条, 数据库往返 {round_trips} 次")
+        return len(new_rows)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def update_by_key(connection, table: str, columns: list, rows: list, key: str = 'url', batch_size: int = DB_BATCH_SIZE) -> int:
+    """按唯一键批量更新, 每批一条 UPDATE ... CASE 语句, 返回提交的行数.
+
+    ## Parameter:
+    connection: 数据库连接, 由调用方负责关闭
+    table: 表名
+    columns: 要更新的列名
+    rows: 待更新的行, 每行为 (columns 的值..., 唯一键的值)
+    key: 唯一键列名
+    batch_size: 每条语句更新的行数
+    """
+    cursor = connection.cursor()
+    round_trips = 0
+    start = time.perf_counter()
+    try:
+        for chunk in chunked(rows, batch_size):
+            assignments = []
+            params = []
+            for i, column in enumerate(columns):
+                assignments.append(f"{column} = CASE {key} {' '.join(['WHEN %s THEN %s'] * len(chunk))} END")
+                for row in chunk:
+                    params.extend((row[-1], row[i]))
+            params.extend(row[-1] for row in chunk)
+            update_query = f"UPDATE {table} SET {', '.join(assignments)} WHERE {key} IN ({placeholders(len(chunk))})"
+            cursor.execute(update_query, params)
+            round_trips += 1
+        connection.commit()
+        record_write(table, "update", round_trips + 1, len(rows), start)
+        logger.info(f"[{table}] 更新 {len(rows)} 条, 数据库往返 {round_trips} 次")
+        return len(rows)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
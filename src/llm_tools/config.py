@@ -25,6 +25,8 @@ CONSOLE_HANDLER.setLevel(logging.DEBUG)
 ##########################################
 # 数据库配置
 ##########################################
+# 数据库后端: sqlite (本地文件, 无需数据库服务) 或 mysql (需要同时开启 DB_ENABLE)
+DB_BACKEND = os.getenv("DB_BACKEND", "sqlite")
 DB_ENABLE = False
 DB_HOST=os.getenv("DB_HOST", "localhost")
 DB_USER=os.getenv("DB_USER", "jfsok")
@@ -36,6 +38,8 @@ DB_CONFIG = {
     "host": DB_HOST,
     "database": DB_DATABASE
 }
+# 批量写入时每次数据库往返处理的行数
+DB_BATCH_SIZE = int(os.getenv("DB_BATCH_SIZE", "500"))
 
 ##########################################
 # 存储目录配置
@@ -43,19 +47,110 @@ DB_CONFIG = {
 DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.expanduser("~"), 'llm_tools'))
 BIDDING_DIR = os.path.join(DATA_DIR, 'bidding')
 TGB_DIR = os.path.join(DATA_DIR, 'tgb')
-for dir in [DATA_DIR, BIDDING_DIR, TGB_DIR]:
+# 定时任务写入运行指标的目录
+METRICS_DIR = os.path.join(DATA_DIR, 'metrics')
+for dir in [DATA_DIR, BIDDING_DIR, TGB_DIR, METRICS_DIR]:
     if not os.path.exists(dir):
         os.mkdir(dir)
+# SQLite 数据库后端的数据文件
+SQLITE_DB_FILE = os.path.join(DATA_DIR, 'llm_tools.db')
+# 招标公告全文检索索引
+NOTICE_INDEX_FILE = os.path.join(BIDDING_DIR, 'notice_index.db')
+# 淘股吧文章存储 (只追加)
+TGB_ARTICLE_STORE = os.path.join(TGB_DIR, 'articles.jsonl')
+# 爬取结果 (JSON Lines) 每写入多少条记录 fsync 一次
+JSONL_FSYNC_EVERY = int(os.getenv("JSONL_FSYNC_EVERY", "50"))
+
+##########################################
+# 爬虫配置
+##########################################
+# 南方电网招标网站地址, 压测时指向本地替身服务
+BIDDING_CSG_BASEURL = os.getenv("BIDDING_CSG_BASEURL", "https://www.bidding.csg.cn")
+# 并发读取招标公告详情页的工作线程数
+BIDDING_WORKERS = int(os.getenv("BIDDING_WORKERS", "4"))
+# 列表页与详情页工作线程之间的队列长度
+BIDDING_QUEUE_SIZE = int(os.getenv("BIDDING_QUEUE_SIZE", "100"))
+# 同一主机同时进行中的页面访问数
+CRAWL_HOST_CONCURRENCY = int(os.getenv("CRAWL_HOST_CONCURRENCY", "4"))
+# 同一主机相邻两次页面访问的间隔 (秒), 在最小值和最大值之间随机
+CRAWL_HOST_MIN_INTERVAL = float(os.getenv("CRAWL_HOST_MIN_INTERVAL", "0.5"))
+CRAWL_HOST_MAX_INTERVAL = float(os.getenv("CRAWL_HOST_MAX_INTERVAL", "1.5"))
+# 浏览器池中一个上下文最多被租用的次数和最长存活秒数
+BROWSER_LEASE_MAX_USES = int(os.getenv("BROWSER_LEASE_MAX_USES", "100"))
+BROWSER_LEASE_MAX_AGE = float(os.getenv("BROWSER_LEASE_MAX_AGE", "1800"))
+# 浏览器池中常驻工作线程的数量, 每个线程持有一个浏览器
+BROWSER_WORKERS = int(os.getenv("BROWSER_WORKERS", "4"))
+# 是否拦截图片、字体、样式表和统计脚本等与解析无关的请求
+RESOURCE_BLOCKING = os.getenv("RESOURCE_BLOCKING", "true").lower() == "true"
+# HTTP 抓取: 同时进行的请求数、同一主机同时进行的请求数、超时秒数、条件请求缓存文件
+HTTP_CONCURRENCY = int(os.getenv("HTTP_CONCURRENCY", "16"))
+HTTP_HOST_CONCURRENCY = int(os.getenv("HTTP_HOST_CONCURRENCY", "8"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_CACHE_FILE = os.path.join(DATA_DIR, 'http_cache.db')
+
+##########################################
+# HTML 解析配置
+##########################################
+# 解析器: auto 表示安装了 lxml 时使用 lxml, 否则使用 html.parser
+HTML_PARSER = os.getenv("HTML_PARSER", "auto")
+# 是否只为需要的标签建树 (SoupStrainer)
+HTML_PARTIAL_PARSE = os.getenv("HTML_PARTIAL_PARSE", "true").lower() == "true"
+
+##########################################
+# 接口配置
+##########################################
+# 文件数据接口的响应缓存条数
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "64"))
+# 响应内容超过该字节数时按 Accept-Encoding 压缩
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+# 超过该字节数的 JSON Lines 数据文件不进入响应缓存, 逐行流式返回; 流式响应每块的字节数
+RESPONSE_STREAM_MIN_SIZE = int(os.getenv("RESPONSE_STREAM_MIN_SIZE", str(1024 * 1024)))
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", str(64 * 1024)))
+
+##########################################
+# 定时任务配置
+##########################################
+# 是否在接口进程内运行定时任务 (多个接口进程时只应在一个进程中开启)
+SCHEDULER_ENABLE = os.getenv("SCHEDULER_ENABLE", "true").lower() == "true"
+# 运行周期秒数 (按整周期对齐) 和整周期之后随机推迟的最大秒数
+SCHEDULER_INTERVAL = float(os.getenv("SCHEDULER_INTERVAL", "3600"))
+SCHEDULER_JITTER = float(os.getenv("SCHEDULER_JITTER", "120"))
+# 每个任务保留的运行记录条数, 执行任务的常驻线程数
+SCHEDULER_HISTORY = int(os.getenv("SCHEDULER_HISTORY", "20"))
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "2"))
 
 ##########################################
 # 大模型配置
 ##########################################
 LLM_API_KEY=os.environ.get("DEEPSEEK_API_KEY")
 LLM_BASE_URL="https://api.deepseek.com"
+# 大模型响应缓存: 缓存文件、最长保存秒数、总大小上限、是否压缩、是否跳过缓存
+LLM_CACHE_FILE = os.path.join(DATA_DIR, 'llm_cache.db')
+LLM_CACHE_MAX_AGE = float(os.getenv("LLM_CACHE_MAX_AGE", str(30 * 24 * 3600)))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+LLM_CACHE_COMPRESS = os.getenv("LLM_CACHE_COMPRESS", "true").lower() == "true"
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "false").lower() == "true"
+# 批量调用大模型: 并发请求数、每分钟请求数和 token 数上限 (0 表示不限制)、失败重试次数
+LLM_WORKERS = int(os.getenv("LLM_WORKERS", "8"))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", "3"))
+# 大模型网关: 读超时和连接超时秒数、客户端重试次数、连接池大小、是否流式输出、慢调用告警阈值秒数
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_CLIENT_RETRIES = int(os.getenv("LLM_CLIENT_RETRIES", "2"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_STREAM = os.getenv("LLM_STREAM", "false").lower() == "true"
+LLM_SLOW_CALL_SECONDS = float(os.getenv("LLM_SLOW_CALL_SECONDS", "30"))
 
 ##########################################
 # 淘股吧配置
 ##########################################
 TGB_USERNAME = os.environ.get('TGB_USERNAME')
 TGB_PASSWORD = os.environ.get('TGB_PASSWORD')
-TGB_BASEURL = 'https://www.tgb.cn/'
\ No newline at end of file
+TGB_BASEURL = os.getenv('TGB_BASEURL', 'https://www.tgb.cn/')
+# 并发爬取博客帖子的浏览器上下文数
+TGB_BLOG_WORKERS = int(os.getenv("TGB_BLOG_WORKERS", "4"))
+# 并发读取帖子评论页的浏览器上下文数, 单页失败后的重试次数
+TGB_PAGE_WORKERS = int(os.getenv("TGB_PAGE_WORKERS", "4"))
+TGB_PAGE_RETRIES = int(os.getenv("TGB_PAGE_RETRIES", "2"))
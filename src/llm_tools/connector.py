@@ -1,24 +1,164 @@
-import mysql.connector
-from mysql.connector.pooling import PooledMySQLConnection 
-from llm_tools.config import DB_CONFIG, DB_ENABLE
+"""
+数据库连接.
+
+支持两种存储后端, 由 DB_BACKEND 选择:
+- mysql: MySQL 连接池, 需要同时设置 DB_ENABLE
+- sqlite: 本地 SQLite 数据库 (WAL 模式), 适合单机部署, 不需要数据库服务
+
+两种后端的连接都提供 cursor/commit/rollback/close/is_connected, SQL 统一使用 %s 占位符
+和 llm_tools.<表名> 形式的表名, SQLite 后端在执行前自动转换.
+"""
+
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from llm_tools.config import DB_CONFIG, DB_ENABLE, DB_BACKEND, SQLITE_DB_FILE
 
 from llm_tools.logger import get_logger
 
 log = get_logger()
 
-# 连接到 MySQL 数据库
-connection_pool = None
-if DB_ENABLE:
-    connection_pool = mysql.connector.pooling.MySQLConnectionPool(
-        pool_name="llm_tool_db_pool",
-        pool_size=10,
-        pool_reset_session=True,
-        **DB_CONFIG
-    )
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bidding_csg (
+    project TEXT,
+    part_a TEXT,
+    type TEXT,
+    create_date DATE,
+    url TEXT NOT NULL UNIQUE,
+    summary TEXT,
+    price TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_bidding_csg_project ON bidding_csg (project);
+CREATE INDEX IF NOT EXISTS idx_bidding_csg_type ON bidding_csg (type);
+CREATE INDEX IF NOT EXISTS idx_bidding_csg_create_date ON bidding_csg (create_date);
+
+CREATE TABLE IF NOT EXISTS bidding_notice (
+    title TEXT,
+    content TEXT,
+    notice_time DATETIME,
+    company TEXT,
+    url TEXT NOT NULL UNIQUE,
+    type TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_bidding_notice_type ON bidding_notice (type);
+CREATE INDEX IF NOT EXISTS idx_bidding_notice_notice_time ON bidding_notice (notice_time);
+"""
+
+# 与 MySQL 一样, DATE/DATETIME 列读出为 date/datetime 对象
+sqlite3.register_adapter(date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(sep=' '))
+sqlite3.register_converter("DATE", lambda b: date.fromisoformat(b.decode()))
+sqlite3.register_converter("DATETIME", lambda b: datetime.fromisoformat(b.decode()))
+
+SCHEMA_PREFIX = re.compile(r"\bllm_tools\.")
+
+def to_sqlite(query: str) -> str:
+    """把 MySQL 风格的 SQL 转换为 SQLite 可执行的 SQL."""
+    return SCHEMA_PREFIX.sub("", query).replace("%s", "?")
+
+
+class SQLiteCursor:
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    def execute(self, query: str, params=()):
+        return self._cursor.execute(to_sqlite(query), tuple(params))
+
+    def executemany(self, query: str, seq_of_params):
+        return self._cursor.executemany(to_sqlite(query), seq_of_params)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+        self._closed = False
+
+    def cursor(self) -> SQLiteCursor:
+        return SQLiteCursor(self._connection.cursor())
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def is_connected(self) -> bool:
+        return not self._closed
+
+    def close(self):
+        self._connection.close()
+        self._closed = True
+
+
+class SQLiteBackend:
+    def __init__(self, filename: str = SQLITE_DB_FILE):
+        self.filename = filename
+        connection = sqlite3.connect(filename)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SQLITE_SCHEMA)
+        finally:
+            connection.close()
+
+    def get_connection(self) -> SQLiteConnection:
+        connection = sqlite3.connect(self.filename, timeout=30, detect_types=sqlite3.PARSE_DECLTYPES)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return SQLiteConnection(connection)
+
+
+class MySQLBackend:
+    def __init__(self):
+        import mysql.connector.pooling
+        # 连接到 MySQL 数据库
+        self.connection_pool = mysql.connector.pooling.MySQLConnectionPool(
+            pool_name="llm_tool_db_pool",
+            pool_size=10,
+            pool_reset_session=True,
+            **DB_CONFIG
+        )
+
+    def get_connection(self):
+        return self.connection_pool.get_connection()
+
+
+BACKENDS = {
+    "sqlite": SQLiteBackend,
+    "mysql": MySQLBackend,
+}
+
+backend = None
+_backend_lock = threading.Lock()
+
+def get_backend():
+    """按配置创建存储后端. MySQL 后端未启用时返回 None."""
+    global backend
+    with _backend_lock:
+        if backend is None:
+            if DB_BACKEND == "mysql" and not DB_ENABLE:
+                return None
+            if DB_BACKEND not in BACKENDS:
+                log.error(f"不支持的数据库后端: {DB_BACKEND}")
+                return None
+            backend = BACKENDS[DB_BACKEND]()
+        return backend
 
 # 获取连接
-def getConnection() -> PooledMySQLConnection:
-    if DB_ENABLE:
-        return connection_pool.get_connection()
-    else:
+def getConnection():
+    current = get_backend()
+    if current is None:
         return None
+    return current.get_connection()
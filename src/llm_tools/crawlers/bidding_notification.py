@@ -4,40 +4,224 @@
 
 import os
 import re
-import json
+import time
+import queue
+import threading
 import argparse
 from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor, wait
 from llm_tools.tools.bidding_csg import BiddingCSG
+from llm_tools.tools.resource_policy import log_policy_stats
+from llm_tools.utils.seen_index import SeenIndex
+from llm_tools.utils.file_lock import FileLock
+from llm_tools.utils.jsonl import JsonlWriter, PARTIAL_SUFFIX, data_file, iter_records, read_jsonl, truncate_torn_tail
+from llm_tools.search.notice_index import get_notice_index
 from llm_tools.connector import getConnection, get_logger
-from llm_tools.config import BIDDING_DIR
+from llm_tools.bulk import insert_missing
+from llm_tools import metrics
+from llm_tools.config import BIDDING_DIR, BIDDING_WORKERS, BIDDING_QUEUE_SIZE, BIDDING_CSG_BASEURL
 
 logger = get_logger()
 
+_detail_executor = None
+_detail_workers = 0
+_detail_executor_lock = threading.Lock()
+
+def detail_executor(workers: int) -> ThreadPoolExecutor:
+    """读取详情页的常驻工作线程, 线程内的浏览器在多次爬取之间保持预热.
+
+    详情页工作线程在整个爬取期间占用线程, 所以不使用浏览器池的共享线程池, 以免占满共享线程池
+    使其他短任务等待到爬取结束. 需要的线程数超过现有线程池时换用更大的线程池.
+    """
+    global _detail_executor, _detail_workers
+    with _detail_executor_lock:
+        if _detail_executor is None or _detail_workers < workers:
+            if _detail_executor is not None:
+                _detail_executor.shutdown(wait=False)
+            _detail_workers = max(workers, BIDDING_WORKERS)
+            _detail_executor = ThreadPoolExecutor(max_workers=_detail_workers, thread_name_prefix="bidding-detail")
+        return _detail_executor
+
 def format_date(date_str):
     return datetime.strptime(date_str, "%Y%m%d").strftime("%Y-%m-%d")
 
+# 中断的运行写入的公告移到该后缀的文件中, 下次保存时排在新公告之后
+RECOVERED_SUFFIX = '.recovered'
+# 同一天同时只允许一个运行写入, 写入期间持有该后缀的文件锁
+LOCK_SUFFIX = '.lock'
+
+def notice_filename(date_str: str) -> str:
+    return os.path.join(BIDDING_DIR, f"bidding_notice_{date_str}.jsonl")
+
 class BiddingCrawler:
-    def __init__(self, end_date: str):
+    def __init__(self, end_date: str, workers: int = BIDDING_WORKERS, incremental: bool = True):
         """
         ## Parameter:
         end_date: 结束日期，格式为：20250102 形式
+        workers: 并发读取详情页的工作线程数, 每个线程使用独立的浏览器页面
+        incremental: 增量爬取. 根据当天已保存的公告和已见 URL 索引, 只读取新公告并合并到当天的文件
         """
-        self.start_url = "https://www.bidding.csg.cn/dbsearch.jspx?channelId=309&types=%E6%9C%8D%E5%8A%A1&org=&q="
-        self.bidding_notices = []
+        self.start_url = f"{BIDDING_CSG_BASEURL}/dbsearch.jspx?channelId=309&types=%E6%9C%8D%E5%8A%A1&org=&q="
+        self.date_str = end_date
         self.end_date = format_date(end_date)
+        self.workers = max(1, workers)
+        self.incremental = incremental
+        self.seen = SeenIndex(os.path.join(BIDDING_DIR, f"bidding_seen_{end_date}.json"))
+        self.filename = notice_filename(end_date)
+        self.recovered = self.filename + RECOVERED_SUFFIX
+        self.file_lock = FileLock(self.filename + LOCK_SUFFIX)
+        self.writer = None
+        self.new_urls = set()
+        self.recovered_urls = set()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._next_index = 0
+
+    def open(self):
+        """打开当天公告文件的写入器.
+
+        增量模式下, 上次运行中断时留在 .partial 文件中的公告移到 .recovered 文件, 视为已见,
+        不再读取; 保存时排在本次的新公告之后、当天已有的公告之前.
+        当天的公告文件不存在时已见索引失效, 需要全量爬取.
+
+        打开前先锁住当天的文件, 直到 close 才释放. 其他运行 (另一个进程或接口进程内的调度器)
+        正在写入当天的文件时抛出 RuntimeError, 不移动它的 .partial 文件.
+        """
+        if not self.lock():
+            raise RuntimeError(f"{self.date_str} 的公告正在由其他运行写入")
+        if not self.incremental or data_file(self.filename) is None:
+            self.seen.clear()
+        if self.incremental:
+            self.set_aside_partial()
+        else:
+            for name in (self.filename + PARTIAL_SUFFIX, self.recovered):
+                if os.path.exists(name):
+                    os.remove(name)
+        self.writer = JsonlWriter(self.filename)
+        if os.path.exists(self.recovered):
+            for notice in read_jsonl(self.recovered):
+                self.seen.add(notice['url'])
+                self.recovered_urls.add(notice['url'])
+
+    def lock(self) -> bool:
+        """尝试锁住当天的公告文件, 已被其他运行锁住时返回 False"""
+        return self.file_lock.acquire()
+
+    def set_aside_partial(self):
+        """把中断的运行留下的 .partial 文件移到 .recovered 文件. 已有 .recovered 文件 (连续中断) 时
+        合并, 较新的 .partial 中的公告排在前面."""
+        partial = self.filename + PARTIAL_SUFFIX
+        if not os.path.exists(partial):
+            return
+        truncate_torn_tail(partial)
+        if not os.path.exists(self.recovered):
+            os.replace(partial, self.recovered)
+            return
+        urls = set()
+        with JsonlWriter(self.recovered) as writer:
+            for notice in read_jsonl(partial):
+                urls.add(notice['url'])
+                writer.write(notice)
+            for notice in read_jsonl(self.recovered):
+                if notice['url'] not in urls:
+                    writer.write(notice)
+        os.remove(partial)
 
     def crawl(self):
+        """爬取招标公告.
+
+        列表页在当前线程中翻页解析, 每解析完一页就把其中的招标公告放入有界队列;
+        self.workers 个工作线程从队列中取出公告并发读取详情页. 读取结果按列表顺序逐条
+        写入 .partial 文件, 中途失败时已写入的公告保留到下次运行. save 发布文件.
+
+        增量模式下跳过已见的公告; 如果上次运行没有失败待重试的公告, 翻页遇到第一条已见
+        公告即停止. 新公告排在当天已有公告之前.
+        """
+        self.open()
+        logger.info(f"已见 URL {len(self.seen)} 个, 待重试 {len(self.seen.pending)} 个, 恢复 {len(self.recovered_urls)} 条")
+
+        tasks = queue.Queue(maxsize=BIDDING_QUEUE_SIZE)
+        succeeded = set()
+        executor = detail_executor(self.workers)
+        workers = [executor.submit(self.read_worker, tasks, succeeded) for _ in range(self.workers)]
+
+        enqueued = []
+        def enqueue(items):
+            for item in items:
+                if item['type'] == '招标公告' and item['url'] not in self.seen:
+                    tasks.put((len(enqueued), item))
+                    enqueued.append(item)
+
+        # 有待重试的公告时不能提前停止, 否则排在已见公告之后的失败公告永远不会被重试
+        known_urls = self.seen.urls if self.incremental and not self.seen.pending else None
         crawler = BiddingCSG()
-        crawler.search("", end_date=self.end_date, query_url=self.start_url)
+        try:
+            crawler.search("", end_date=self.end_date, query_url=self.start_url, on_items=enqueue, known_urls=known_urls)
+        finally:
+            crawler.close()
+            for _ in workers:
+                tasks.put(None)
+            wait(workers)
+            self.writer.sync()
+
+        logger.info(f"共读取 {len(succeeded)}/{len(enqueued)} 条新招标公告")
+        log_policy_stats()
+
+        # 更新已见索引: 读取失败的公告记为待重试
         for item in crawler.bidding_list:
-            if item['type'] == '招标公告':
+            if item['type'] != '招标公告':
+                self.seen.add(item['url'])
+        for index, item in enumerate(enqueued):
+            if index in succeeded:
+                self.seen.add(item['url'])
+            else:
+                self.seen.add_pending(item['url'])
+
+    def deliver(self, index: int, notice: dict):
+        """按列表顺序写出读取结果, notice 为 None 表示读取失败. 先完成的结果暂存到轮到它为止"""
+        with self._lock:
+            self._pending[index] = notice
+            while self._next_index in self._pending:
+                notice = self._pending.pop(self._next_index)
+                if notice is not None:
+                    self.writer.write(notice)
+                    self.new_urls.add(notice['url'])
+                self._next_index += 1
+
+    def read_worker(self, tasks: queue.Queue, succeeded: set):
+        """详情页工作线程: 从队列中读取 (序号, 公告), 结果交给 deliver 按序号写出."""
+        try:
+            reader = BiddingCSG()
+            # 立即租用浏览器上下文, 浏览器启动失败时在这里发现
+            reader.page
+        except Exception as e:
+            logger.error(f"详情页工作线程启动失败: {e}")
+            reader = None
+        try:
+            while True:
+                task = tasks.get()
+                if task is None:
+                    break
+                index, item = task
+                if reader is None:
+                    # 继续消费队列, 避免列表页线程阻塞
+                    self.deliver(index, None)
+                    continue
                 print(item['project'], ':', item['url'])
-                result = crawler.read_bidding_page(item['url'])
+                try:
+                    result = reader.read_bidding_page(item['url'])
+                except Exception as e:
+                    logger.error(f"读取招标公告失败 {item['url']}: {e}")
+                    result = None
+                if result is None:
+                    self.deliver(index, None)
+                    continue
                 print(f"    title: {result['title']}")
                 print(f"    date: {result['date']}")
                 print(f"    content: {result['content']}")
                 print('-' * 50)
-                self.bidding_notices.append({
+                succeeded.add(index)
+                self.deliver(index, {
                     'title': result['title'],
                     'content': result['content'],
                     'notice_time': self.filter_time(result['date']),
@@ -45,7 +229,9 @@ class BiddingCrawler:
                     'url': item['url'],
                     'type': item['type']
                 })
-                logger.info(self.bidding_notices)
+        finally:
+            if reader is not None:
+                reader.close()
 
     def filter_time(self, text):
         pattern = r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}'
@@ -67,74 +253,131 @@ class BiddingCrawler:
 
         return time_str
     
-    def save(self, date_str: str):
-        with open(os.path.join(BIDDING_DIR, f"bidding_notice_{date_str}.json"), 'w', encoding='utf-8') as outfile:
-            json.dump(self.bidding_notices, outfile, indent=2, ensure_ascii=False)
-        return len(self.bidding_notices)
+    def save(self) -> int:
+        """在新公告之后逐条追加中断的运行恢复的公告和当天已有的公告 (仅增量模式), 把 .partial 文件发布为
+        当天的公告文件, 返回公告数."""
+        if self.writer is None:
+            self.open()
+        if self.recovered_urls:
+            for notice in read_jsonl(self.recovered):
+                if notice['url'] not in self.new_urls:
+                    self.writer.write(notice)
+        existing = data_file(self.filename)
+        # 全量爬取得到的是当天完整的公告, 不合并已有的文件, 已下架的公告随之删除
+        if existing is not None and self.incremental:
+            for notice in iter_records(existing):
+                if notice['url'] not in self.new_urls and notice['url'] not in self.recovered_urls:
+                    self.writer.write(notice)
+        count = self.writer.commit()
+        if os.path.exists(self.recovered):
+            os.remove(self.recovered)
+        # 发布后删除旧版本的整文件 JSON, 避免重复索引
+        if existing is not None and existing != self.filename:
+            os.remove(existing)
+        # 公告写入后再保存已见索引, 保证索引中的公告一定在文件中
+        self.seen.save()
+        # 更新全文检索索引, 失败时不影响已保存的文件, 下次 sync_dir 会补上
+        try:
+            get_notice_index().add(read_jsonl(self.filename), self.filename)
+        except Exception as e:
+            logger.error(f"更新公告索引失败: {e}")
+        return count
 
-    def save_to_db(self):
-        # 插入数据的 SQL 语句
-        insert_query = """
-        INSERT INTO bidding_notice (title, content, notice_time, company, url, type)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """
+    def close(self):
+        """关闭写入器但不发布, 已写入的公告留在 .partial 文件中, 下次运行时恢复. 然后释放文件锁"""
+        if self.writer is not None:
+            self.writer.close()
+        self.file_lock.release()
 
-        # 检查 URL 是否存在的 SQL 语句
-        check_url_query = """
-        SELECT url FROM bidding_notice WHERE url = %s
-        """
+    def save_to_db(self):
+        columns = ["title", "content", "notice_time", "company", "url", "type"]
+        filename = data_file(self.filename)
+        rows = [tuple(item[c] for c in columns) for item in iter_records(filename)] if filename else []
 
+        connection = None
         try:
             # 连接数据库
             connection = getConnection()
             if connection is None:
                 logger.warning("数据库未启用")
                 return
-            cursor = connection.cursor()
-
-            # 用于存储唯一的数据
-            unique_data_to_insert = []
-
-            for item in self.bidding_notices:
-                url = item["url"]
-                # 检查 URL 是否已存在
-                cursor.execute(check_url_query, (url,))
-                result = cursor.fetchone()
-
-                if not result:  # 如果 URL 不存在
-                    unique_data_to_insert.append((item["title"], item["content"], item["notice_time"], item["company"], item["url"], item["type"]))
-                else:
-                    logger.info(f"URL 已存在，跳过: {url}")
-
-            # 执行批量插入
-            if unique_data_to_insert:
-                cursor.executemany(insert_query, unique_data_to_insert)
-                connection.commit()
-                logger.info(f"成功插入 {cursor.rowcount} 条数据")
-                return cursor.rowcount
-            else:
-                logger.info("没有新数据需要插入")
-                return 0
+            # URL 已存在的公告跳过, 批量插入其余公告
+            count = insert_missing(connection, "bidding_notice", columns, rows, key="url")
+            logger.info(f"成功插入 {count} 条数据")
+            return count
 
         except Exception as e:
             logger.error(f"数据库错误: {e}")
 
         finally:
             # 关闭连接
-            if connection.is_connected():
-                cursor.close()
+            if connection is not None and connection.is_connected():
                 connection.close()
                 logger.info("数据库连接已关闭")
 
+def recover_partials(exclude: str = None) -> int:
+    """发布中断的运行留下的 .partial / .recovered 文件 (与当天已有的公告合并), 返回处理的日期数.
+
+    ## Parameter:
+    exclude: 跳过该日期, 通常是即将爬取的日期, 其中断的公告在爬取时恢复
+
+    其他运行正在写入的日期 (文件锁被持有) 不处理, 其 .partial 文件不是中断留下的.
+    """
+    suffixes = '|'.join(re.escape(suffix) for suffix in (PARTIAL_SUFFIX, RECOVERED_SUFFIX))
+    dates = set()
+    for name in os.listdir(BIDDING_DIR):
+        match = re.fullmatch(rf"bidding_notice_(\d{{8}})\.jsonl(?:{suffixes})", name)
+        if match is not None and match.group(1) != exclude:
+            dates.add(match.group(1))
+    count = 0
+    for date_str in sorted(dates):
+        crawler = BiddingCrawler(date_str)
+        if not crawler.lock():
+            logger.info(f"{date_str} 的公告正在由其他运行写入, 跳过")
+            continue
+        try:
+            logger.info(f"发布 {date_str} 中断运行留下的公告")
+            crawler.save()
+            count += 1
+        finally:
+            crawler.close()
+    return count
+
+def crawl_notices(date_str: str = None, incremental: bool = True) -> int:
+    """爬取并保存某天的招标公告, 返回当天的公告数. 供命令行和接口进程内的调度器调用
+
+    ## Parameter:
+    date_str: 日期, 格式为 20250102, 默认为今天
+    incremental: 是否增量爬取
+    """
+    date_str = date_str or date.today().strftime('%Y%m%d')
+    recover_partials(exclude=date_str)
+    crawler = BiddingCrawler(date_str, incremental=incremental)
+    try:
+        crawler.crawl()
+        return crawler.save()
+    finally:
+        crawler.close()
+
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Bidding Crawler Script")
     parser.add_argument('--date', type=str, default=date.today().strftime('%Y%m%d'),
                         help="Specify the date in YYYYMMDD format (default: today's date)")
+    parser.add_argument('--full', action='store_true',
+                        help="Re-crawl every notice instead of only the ones not seen before")
 
     args = parser.parse_args()
     date_str = args.date  # 使用命令行参数中的日期
 
-    crawler = BiddingCrawler(date_str)
-    crawler.crawl()
-    crawler.save(date_str) 
\ No newline at end of file
+    # 命令行运行使用单独的 job 标签, 与接口进程内调度的同名任务区分, 两者的指标都保留
+    job = 'bidding_notification_cli'
+    start = time.perf_counter()
+    try:
+        count = crawl_notices(date_str, incremental=not args.full)
+        metrics.record_job(job, time.perf_counter() - start, count)
+    except Exception:
+        metrics.record_job(job, time.perf_counter() - start, ok=False)
+        raise
+    finally:
+        metrics.push(job)
\ No newline at end of file
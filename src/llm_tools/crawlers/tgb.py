@@ -1,24 +1,70 @@
-import os, json
-from datetime import date
+import os
+import time
 from llm_tools.tools.taoguba import Taoguba
+from llm_tools.utils.http_client import FetchError
+from llm_tools.tools.article_store import ArticleStore
+from llm_tools.utils.jsonl import JsonlWriter
 from llm_tools.config import TGB_DIR
+from llm_tools.logger import get_logger
+from llm_tools import metrics
+
+logger = get_logger()
+
+# hot_articles.jsonl 中每篇文章的字段
+HOT_ARTICLE_FIELDS = ('userName', 'subject', 'url', 'date', 'content')
 
 class TgbCrawler:
-    def __init__(self):
+    def __init__(self, store: ArticleStore = None):
         self.hot_articles = []
+        self.store = store if store is not None else ArticleStore()
 
     def crawl(self):
+        """只下载存储中没有或列表信息有变化的文章正文, 其余文章从文章存储中读取.
+
+        热帖列表获取失败或为空时抛出 FetchError, 不调用 save, 保留上一次的 hot_articles.jsonl.
+        """
         tgb = Taoguba()
-        self.hot_articles = tgb.get_hot_articles()
-        
+        try:
+            listing = tgb.get_hot_list()
+            if not listing:
+                raise FetchError("热帖列表为空, 保留上一次的热帖")
+            stale = self.store.stale(listing)
+            fetched = tgb.get_articles(stale)
+        finally:
+            tgb.close()
+        # 正文读取失败的文章不写入存储, 下次运行时重新下载
+        records = self.store.append([a for a in fetched if a['content']])
+        logger.info(f"热帖 {len(listing)} 篇, 下载正文 {len(stale)} 篇, 文章存储新增 {len(records)} 篇")
+
+        self.hot_articles = []
+        for article in listing:
+            stored = self.store.get(article['url'])
+            source = stored if stored is not None else dict(article, content="")
+            self.hot_articles.append({field: source.get(field) for field in HOT_ARTICLE_FIELDS})
 
     def save(self):
-        with open(os.path.join(TGB_DIR, f"hot_articles.json"), 'w', encoding='utf-8') as outfile:
-            json.dump(self.hot_articles, outfile, indent=2, ensure_ascii=False)
+        # 写完后整体替换, 接口不会读到写了一半的文件
+        with JsonlWriter(os.path.join(TGB_DIR, "hot_articles.jsonl")) as writer:
+            for article in self.hot_articles:
+                writer.write(article)
         return len(self.hot_articles)
     
-if __name__ == '__main__':
-    date_str = date.today().isoformat()
+def crawl_hot_articles() -> int:
+    """爬取并保存淘股吧热帖, 返回热帖数. 供命令行和接口进程内的调度器调用"""
     crawler = TgbCrawler()
     crawler.crawl()
-    crawler.save()
+    return crawler.save()
+
+
+if __name__ == '__main__':
+    # 命令行运行使用单独的 job 标签, 与接口进程内调度的同名任务区分, 两者的指标都保留
+    job = 'tgb_cli'
+    start = time.perf_counter()
+    try:
+        count = crawl_hot_articles()
+        metrics.record_job(job, time.perf_counter() - start, count)
+    except Exception:
+        metrics.record_job(job, time.perf_counter() - start, ok=False)
+        raise
+    finally:
+        metrics.push(job)
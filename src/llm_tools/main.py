@@ -1,53 +1,289 @@
-import os, json
+import os, re, json
+import time
+import anyio
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Union
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Query
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Any
 from llm_tools.tools.taoguba import get_tgb_hot_articles
 from llm_tools.crawlers.bidding_notification import BiddingCrawler
-from llm_tools.config import BIDDING_DIR, TGB_DIR
+from llm_tools.config import BIDDING_DIR, TGB_DIR, RESPONSE_CACHE_SIZE, COMPRESS_MIN_SIZE, SCHEDULER_ENABLE, \
+    RESPONSE_STREAM_MIN_SIZE, STREAM_CHUNK_SIZE
+from llm_tools.utils.response_cache import FileResponseCache, etag_matches
+from llm_tools.utils.compression import negotiate, compressor
+from llm_tools.utils import fast_json, jsonl
+from llm_tools.search.notice_index import get_notice_index
+from llm_tools.search.article_index import get_article_index
+from llm_tools.scheduler import get_scheduler
+from llm_tools import metrics
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 爬虫任务在接口进程内定时运行, 代替每次启动新解释器的 cron
+    scheduler = get_scheduler()
+    if SCHEDULER_ENABLE:
+        scheduler.start()
+    yield
+    await scheduler.stop()
+
+app = FastAPI(lifespan=lifespan)
+
+# 文件数据接口的响应缓存, 缓存序列化好的响应内容
+response_cache = FileResponseCache(max_entries=RESPONSE_CACHE_SIZE)
 
 class LLMToolResponse(BaseModel):
     code: int
     data: Any
     msg: str
 
+# JSON Lines 数据文件拼接成功响应时数组前后的内容
+JSONL_RESPONSE_HEAD = b'{"code":200,"data":['
+JSONL_RESPONSE_TAIL = '],"msg":"成功."}'.encode('utf-8')
+
+def serialize_file(filename: str) -> bytes:
+    """读取数据文件, 序列化为成功响应. 字段与 LLMToolResponse 一致.
+
+    JSON Lines 文件的每一行已经是序列化好的记录, 直接拼接为数组, 不逐条解析.
+    """
+    if filename.endswith('.jsonl'):
+        return JSONL_RESPONSE_HEAD + b','.join(jsonl.read_lines(filename)) + JSONL_RESPONSE_TAIL
+    with open(filename, 'rb') as infile:
+        json_obj = fast_json.loads(infile.read())
+    return fast_json.dumps({"code": 200, "data": json_obj, "msg": "成功."})
+
+async def cached_file_response(request: Request, filename: str):
+    """返回文件对应的缓存响应, 支持 If-None-Match 协商和压缩. 文件不存在 (或 filename 为 None) 时返回 None.
+
+    缓存项在检查间隔内直接在事件循环中返回; 需要访问文件或第一次压缩时在线程中执行, 不阻塞事件循环.
+    """
+    if filename is None:
+        return None
+    entry = response_cache.peek(filename)
+    if entry is None:
+        entry = await anyio.to_thread.run_sync(response_cache.get, filename, serialize_file)
+    if entry is None:
+        return None
+
+    encoding = None
+    if len(entry.body) >= COMPRESS_MIN_SIZE:
+        encoding = negotiate(request.headers.get("accept-encoding"))
+    if entry.has_encoding(encoding):
+        body, etag = entry.encoded(encoding)
+    else:
+        body, etag = await anyio.to_thread.run_sync(entry.encoded, encoding)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def chunks(parts, size: int = STREAM_CHUNK_SIZE):
+    """把小块内容攒成约 size 字节的块再输出, 减少流式响应的线程切换和发送次数"""
+    buffer = []
+    buffered = 0
+    for part in parts:
+        buffer.append(part)
+        buffered += len(part)
+        if buffered >= size:
+            yield b''.join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield b''.join(buffer)
+
+def compressed(parts, encoding: str):
+    compress, flush = compressor(encoding)
+    for part in parts:
+        data = compress(part)
+        if data:
+            yield data
+    yield flush()
+
+def jsonl_response_parts(infile):
+    """与 serialize_file 相同的响应内容, 逐行生成. 生成结束时关闭文件"""
+    try:
+        yield JSONL_RESPONSE_HEAD
+        for i, line in enumerate(jsonl.iter_lines(infile)):
+            yield line if i == 0 else b',' + line
+        yield JSONL_RESPONSE_TAIL
+    finally:
+        infile.close()
+
+def should_stream(filename: str) -> bool:
+    """较大的 JSON Lines 数据文件流式返回, 不进入响应缓存"""
+    if filename is None or not filename.endswith('.jsonl'):
+        return False
+    try:
+        return os.path.getsize(filename) >= RESPONSE_STREAM_MIN_SIZE
+    except FileNotFoundError:
+        return False
+
+def streamed_file_response(request: Request, filename: str):
+    """逐行流式返回 JSON Lines 数据文件, 内存占用与文件大小无关. 文件不存在时返回 None.
+
+    ETag 由文件的修改时间和大小生成. 文件先打开再取状态, 发布新文件 (重命名) 后仍读取打开时的版本.
+    """
+    try:
+        infile = open(filename, 'rb')
+    except FileNotFoundError:
+        return None
+    stat = os.fstat(infile.fileno())
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    tag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}" + (f"-{encoding}" if encoding else "")
+    headers = {"ETag": f'"{tag}"', "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        infile.close()
+        return Response(status_code=304, headers=headers)
+    body = chunks(jsonl_response_parts(infile))
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        body = compressed(body, encoding)
+    return StreamingResponse(body, media_type="application/json", headers=headers)
+
+API_SECONDS = metrics.histogram("api_request_seconds", "接口请求耗时 (秒)", ["method", "route", "status"])
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    start = time.perf_counter()
+    # 处理函数抛出异常时客户端收到 500, 同样记录, 然后继续抛出交给外层处理
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # 使用路由模板作为标签, 避免路径参数产生大量标签值
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        API_SECONDS.observe(time.perf_counter() - start, method=request.method, route=path, status=status)
+
+@app.get("/metrics")
+def read_metrics():
+    """Prometheus 文本格式的运行指标, 包含定时任务写入的指标"""
+    # 在本进程内调度的任务只输出进程内的指标. 命令行运行以 <任务名>_cli 写入, 照常合并
+    scheduler = get_scheduler()
+    skip = set(scheduler.jobs) if scheduler.started else ()
+    return Response(content=metrics.render_all(skip=skip), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/jobs")
+def list_jobs():
+    """定时任务的状态、下一次运行时间和最近的运行记录"""
+    return LLMToolResponse(code=200, data=get_scheduler().status(), msg=f"成功.")
+
+@app.post("/jobs/{name}/run")
+def run_job(name: str):
+    """手动触发一次任务. 任务正在运行时不会重复启动, 返回正在进行的运行记录"""
+    try:
+        run, started = get_scheduler().trigger(name)
+    except KeyError:
+        return LLMToolResponse(code=404, data=None, msg=f"找不到任务 {name}.")
+    if not started:
+        return LLMToolResponse(code=409, data=run.to_dict(), msg=f"任务 {name} 正在运行.")
+    return LLMToolResponse(code=200, data=run.to_dict(), msg=f"已启动.")
+
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
 
 @app.get("/tgb/hot-articles")
-def read_root():
+async def read_root(request: Request):
     try:
-        filename = os.path.join(TGB_DIR, f"hot_articles.json")
-        if not os.path.exists(filename):
+        filename = jsonl.data_file(os.path.join(TGB_DIR, "hot_articles.jsonl"))
+        response = await cached_file_response(request, filename)
+        if response is None:
             return LLMToolResponse(code=404, data=None, msg=f"找不到淘股吧热帖.")
-        else:
-            with open(filename, 'r', encoding="utf-8") as infile:
-                json_obj = json.load(infile)
-                return LLMToolResponse(code=200, data=json_obj, msg=f"成功.")
+        return response
     except ValueError:
         return LLMToolResponse(code=200, data="", msg=f"Error.")
 
 
+@app.get("/tgb/search")
+def search_articles(q: str, page: int = 1, page_size: int = 20):
+    result = get_article_index().search(q, page=page, page_size=page_size)
+    return LLMToolResponse(code=200, data=result, msg=f"成功.")
+
+
 @app.get("/items/{item_id}")
 def read_item(item_id: int, q: Union[str, None] = None):
     return {"item_id": item_id, "q": q}
 
+@app.get("/bidding/search")
+def search_notice(q: Union[str, None] = None, company: Union[str, None] = None, type: Union[str, None] = None,
+                  date_from: Union[str, None] = Query(default=None, alias="from"),
+                  date_to: Union[str, None] = Query(default=None, alias="to"),
+                  page: int = 1, page_size: int = 20):
+    try:
+        result = get_notice_index().search(q=q, company=company, type=type, date_from=date_from, date_to=date_to,
+                                           page=page, page_size=page_size)
+        return LLMToolResponse(code=200, data=result, msg=f"成功.")
+    except ValueError:
+        return LLMToolResponse(code=400, data=None, msg="输入的日期格式不正确，请使用 YYYYMMDD 格式。")
+
+def notice_files(date_from: str, date_to: str) -> list:
+    """日期范围内 (包含两端, YYYYMMDD) 的每日公告文件, 按日期排序. 只列一次目录, 与范围大小无关.
+
+    同一天同时有 JSON Lines 文件和旧版本的 JSON 文件时使用 JSON Lines 文件.
+    """
+    files = {}
+    for name in os.listdir(BIDDING_DIR):
+        match = re.fullmatch(r"bidding_notice_(\d{8})\.json(l?)", name)
+        if match is None or not date_from <= match.group(1) <= date_to:
+            continue
+        if match.group(2) or match.group(1) not in files:
+            files[match.group(1)] = os.path.join(BIDDING_DIR, name)
+    return [files[day] for day in sorted(files)]
+
+def notice_lines(date_from: str, date_to: str, type: str = None, fields: list = None):
+    """逐条生成日期范围内的公告, 每条一行 JSON. 每次只读取一行, 内存占用与范围大小无关.
+
+    ## Parameter:
+    date_from, date_to: 日期范围, YYYYMMDD, 包含两端
+    type: 公告类型, 精确匹配
+    fields: 只输出这些字段. 与 type 都未指定时直接输出文件中的原始行, 不解析
+    """
+    for filename in notice_files(date_from, date_to):
+        if filename.endswith('.jsonl') and type is None and fields is None:
+            for line in jsonl.read_lines(filename):
+                yield line + b'\n'
+            continue
+        for notice in jsonl.iter_records(filename):
+            if type is not None and notice.get('type') != type:
+                continue
+            if fields is not None:
+                notice = {field: notice.get(field) for field in fields}
+            yield fast_json.dumps(notice) + b'\n'
+
+@app.get("/bidding/notices")
+def stream_notices(date_from: str = Query(alias="from"), date_to: str = Query(alias="to"),
+                   type: Union[str, None] = None, fields: Union[str, None] = None):
+    """按日期范围以 NDJSON 流式返回公告. fields 为逗号分隔的字段名"""
+    try:
+        start = datetime.strptime(date_from, "%Y%m%d")
+        end = datetime.strptime(date_to, "%Y%m%d")
+    except ValueError:
+        return LLMToolResponse(code=400, data=None, msg="输入的日期格式不正确，请使用 YYYYMMDD 格式。")
+    if start > end:
+        return LLMToolResponse(code=400, data=None, msg="开始日期不能晚于结束日期。")
+    field_list = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+    # 逐行输出时每行一次线程切换和发送, 攒成块后再输出
+    lines = notice_lines(start.strftime("%Y%m%d"), end.strftime("%Y%m%d"), type, field_list)
+    return StreamingResponse(chunks(lines), media_type="application/x-ndjson")
+
 @app.get("/bidding/notice/{date_str}")
-def get_notice(date_str: str):
+async def get_notice(date_str: str, request: Request):
     try:
-        bidding_filename = os.path.join(BIDDING_DIR, f"bidding_notice_{date_str}.json")
-        if not os.path.exists(bidding_filename):
-            return LLMToolResponse(code=404, data=None, msg=f"找不到 {date_str} 日的招标公告.")
+        bidding_filename = jsonl.data_file(os.path.join(BIDDING_DIR, f"bidding_notice_{date_str}.jsonl"))
+        if should_stream(bidding_filename):
+            response = streamed_file_response(request, bidding_filename)
         else:
-            with open(bidding_filename, 'r', encoding="utf-8") as infile:
-                json_obj = json.load(infile)
-                return LLMToolResponse(code=200, data=json_obj, msg=f"成功.")
+            response = await cached_file_response(request, bidding_filename)
+        if response is None:
+            return LLMToolResponse(code=404, data=None, msg=f"找不到 {date_str} 日的招标公告.")
+        return response
     except ValueError:
-        return {"error": "输入的日期格式不正确，请使用 YYYYMMDD 格式。"}
\ No newline at end of file
+        return {"error": "输入的日期格式不正确，请使用 YYYYMMDD 格式。"}
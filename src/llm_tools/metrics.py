@@ -0,0 +1,276 @@
+"""
+运行指标.
+
+进程内的计数器、直方图和瞬时值, 以 Prometheus 文本格式从 /metrics 接口输出.
+
+定时任务如果在独立进程中运行 (命令行启动的爬虫), 结束时调用 push(job) 把本进程的指标累加到
+METRICS_DIR/<job>.json; 接口进程输出 /metrics 时合并这些文件, 并加上 job 标签.
+
+    NAVIGATIONS = histogram("crawl_navigation_seconds", "页面访问耗时", ["host"])
+    with NAVIGATIONS.time(host=host):
+        page.goto(url)
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from llm_tools.config import METRICS_DIR
+from llm_tools.logger import get_logger
+
+logger = get_logger()
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def samples(self) -> list:
+        """返回 [(标签值, 数据)], 供输出和写文件使用"""
+        with self._lock:
+            return [(key, self._copy(value)) for key, value in self._values.items()]
+
+    def _copy(self, value):
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """记录 with 块的耗时, 块内抛出异常时也记录"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _copy(self, value):
+        return {"buckets": list(value["buckets"]), "sum": value["sum"], "count": value["count"]}
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.metrics = {}
+
+    def register(self, cls, name: str, help: str, labels=(), **kwargs) -> Metric:
+        """同名指标只创建一次, 模块重复导入时返回已有的指标"""
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help, labels, **kwargs)
+            return metric
+
+    def snapshot(self) -> dict:
+        result = {}
+        for name, metric in list(self.metrics.items()):
+            entry = {"kind": metric.kind, "help": metric.help, "labels": list(metric.labels),
+                     "samples": [[list(key), value] for key, value in metric.samples()]}
+            if isinstance(metric, Histogram):
+                entry["buckets"] = list(metric.buckets)
+            result[name] = entry
+        return result
+
+
+REGISTRY = Registry()
+
+def counter(name: str, help: str, labels=()) -> Counter:
+    return REGISTRY.register(Counter, name, help, labels)
+
+def gauge(name: str, help: str, labels=()) -> Gauge:
+    return REGISTRY.register(Gauge, name, help, labels)
+
+def histogram(name: str, help: str, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram, name, help, labels, buckets=buckets)
+
+
+def format_labels(names: list, values: list, extra: dict = None) -> str:
+    # 指标自带的标签优先, 例如定时任务指标本身就有 job 标签
+    pairs = list(zip(names, values)) + [(k, v) for k, v in (extra or {}).items() if k not in names]
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(snapshots: list) -> str:
+    """把 [(额外标签, 快照)] 输出为 Prometheus 文本格式, 同名指标合并在一起"""
+    merged = {}
+    for extra, snapshot in snapshots:
+        for name, entry in snapshot.items():
+            merged.setdefault(name, (entry, []))[1].append((extra, entry))
+
+    lines = []
+    for name in sorted(merged):
+        head, entries = merged[name]
+        lines.append(f"# HELP {name} {head['help']}")
+        lines.append(f"# TYPE {name} {head['kind']}")
+        for extra, entry in entries:
+            names = entry["labels"]
+            for values, value in entry["samples"]:
+                if entry["kind"] != "histogram":
+                    lines.append(f"{name}{format_labels(names, values, extra)} {format_number(value)}")
+                    continue
+                for bound, count in zip(entry["buckets"], value["buckets"]):
+                    labels = format_labels(names + ["le"], values + [format_number(float(bound))], extra)
+                    lines.append(f"{name}_bucket{labels} {count}")
+                labels = format_labels(names + ["le"], values + ["+Inf"], extra)
+                lines.append(f"{name}_bucket{labels} {value['count']}")
+                lines.append(f"{name}_sum{format_labels(names, values, extra)} {format_number(value['sum'])}")
+                lines.append(f"{name}_count{format_labels(names, values, extra)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+JOB_RUNS = counter("job_runs_total", "定时任务运行次数", ["job", "result"])
+JOB_DURATION = gauge("job_duration_seconds", "定时任务最近一次运行的耗时 (秒)", ["job"])
+JOB_ITEMS = gauge("job_items", "定时任务最近一次运行处理的条数", ["job"])
+JOB_LAST_SUCCESS = gauge("job_last_success_timestamp_seconds", "定时任务最近一次成功的时间戳", ["job"])
+
+def record_job(job: str, duration: float, items: int = None, ok: bool = True):
+    """记录一次定时任务运行, 用于按吞吐量和最近成功时间告警"""
+    JOB_RUNS.inc(job=job, result="success" if ok else "failure")
+    JOB_DURATION.set(duration, job=job)
+    if items is not None:
+        JOB_ITEMS.set(items, job=job)
+    if ok:
+        JOB_LAST_SUCCESS.set(time.time(), job=job)
+
+
+def merge_snapshots(previous: dict, current: dict) -> dict:
+    """把上一次写入的快照累加到本次快照上.
+
+    每次命令行运行都是新进程, 计数器从 0 开始; 累加后写入文件的计数器和直方图跨运行单调递增,
+    increase()/rate() 才有意义. 瞬时值以本次为准, 本次没有的序列 (例如失败时的最近成功时间)
+    沿用上一次的值. 直方图分桶变化时丢弃上一次的数据.
+    """
+    merged = {}
+    for name in set(previous) | set(current):
+        old, new = previous.get(name), current.get(name)
+        if new is None or old is None or old["kind"] != new["kind"] or old.get("buckets") != new.get("buckets"):
+            merged[name] = new if new is not None else old
+            continue
+        samples = {tuple(key): value for key, value in old["samples"]}
+        for key, value in new["samples"]:
+            key = tuple(key)
+            base = samples.get(key)
+            if base is None or new["kind"] == "gauge":
+                samples[key] = value
+            elif new["kind"] == "counter":
+                samples[key] = base + value
+            else:
+                samples[key] = {"buckets": [a + b for a, b in zip(base["buckets"], value["buckets"])],
+                                "sum": base["sum"] + value["sum"], "count": base["count"] + value["count"]}
+        merged[name] = dict(new, samples=[[list(key), value] for key, value in samples.items()])
+    return merged
+
+
+def push(job: str, directory: str = METRICS_DIR):
+    """把本进程的指标累加到共享目录中该 job 的文件上, 供接口进程合并输出"""
+    filename = os.path.join(directory, f"{job}.json")
+    tmp = f"{filename}.tmp"
+    snapshot = REGISTRY.snapshot()
+    try:
+        with open(filename, 'r', encoding='utf-8') as infile:
+            snapshot = merge_snapshots(json.load(infile)["metrics"], snapshot)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"读取上一次的指标文件失败, 重新开始累计: {e}")
+    try:
+        with open(tmp, 'w', encoding='utf-8') as outfile:
+            json.dump({"job": job, "pushed_at": time.time(), "metrics": snapshot}, outfile, ensure_ascii=False)
+        os.replace(tmp, filename)
+    except OSError as e:
+        logger.error(f"写入指标文件失败: {e}")
+
+
+def remove_pushed(job: str, directory: str = METRICS_DIR):
+    """删除 job 写入的指标文件. 任务改为在接口进程内运行时, 旧文件会与进程内的指标重复"""
+    try:
+        os.remove(os.path.join(directory, f"{job}.json"))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"删除指标文件失败: {job}, {e}")
+
+
+def load_pushed(directory: str = METRICS_DIR, skip=()) -> list:
+    """读取定时任务写入的指标文件, 返回 [(额外标签, 快照)]. skip 中的 job 不读取"""
+    result = []
+    if not os.path.isdir(directory):
+        return result
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name), 'r', encoding='utf-8') as infile:
+                data = json.load(infile)
+            if data["job"] in skip:
+                continue
+            result.append(({"job": data["job"]}, data["metrics"]))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"读取指标文件失败: {name}, {e}")
+    return result
+
+
+def render_all(directory: str = METRICS_DIR, skip=()) -> str:
+    """输出本进程和定时任务的全部指标. skip 为在本进程内运行的 job, 不合并它们写入的文件"""
+    return render([({}, REGISTRY.snapshot())] + load_pushed(directory, skip))
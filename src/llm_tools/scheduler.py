@@ -0,0 +1,197 @@
+"""
+接口进程内的定时任务调度.
+
+调度循环运行在 uvicorn 的事件循环中, 到点后把任务交给调度器自己的常驻线程执行:
+任务中的 Playwright 同步 API 和 asyncio.run 都不能在事件循环线程中调用, 也不能放进
+浏览器池的共享线程池 (长时间占用线程, 其他短任务只能等待). 常驻线程中的浏览器
+在多次运行之间保持预热.
+
+同一任务同时只运行一次: 到点或手动触发时如果上一次还没结束, 本次直接跳过.
+每个任务保留最近若干次运行记录, 并通过 metrics.record_job 记录运行指标.
+"""
+
+import time
+import random
+import asyncio
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from llm_tools.config import SCHEDULER_INTERVAL, SCHEDULER_JITTER, SCHEDULER_HISTORY, SCHEDULER_WORKERS
+from llm_tools.crawlers.bidding_notification import crawl_notices
+from llm_tools.crawlers.tgb import crawl_hot_articles
+from llm_tools.logger import get_logger
+from llm_tools import metrics
+
+logger = get_logger()
+
+_run_ids = itertools.count(1)
+
+
+class JobRun:
+    """一次任务运行的记录."""
+    def __init__(self, job: str, trigger: str):
+        self.id = next(_run_ids)
+        self.job = job
+        self.trigger = trigger
+        self.started = time.time()
+        self.finished = None
+        self.status = "running"
+        self.items = None
+        self.error = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "job": self.job,
+            "trigger": self.trigger,
+            "started": self.started,
+            "finished": self.finished,
+            "duration": None if self.finished is None else self.finished - self.started,
+            "status": self.status,
+            "items": self.items,
+            "error": self.error,
+        }
+
+
+class Job:
+    def __init__(self, name: str, func, interval: float = SCHEDULER_INTERVAL, jitter: float = SCHEDULER_JITTER,
+                 history: int = SCHEDULER_HISTORY):
+        """
+        ## Parameter:
+        name: 任务名, 同时用作指标的 job 标签
+        func: 无参数的任务函数, 返回处理的条数 (可以为 None)
+        interval: 运行周期秒数, 按整周期对齐 (3600 即每个整点)
+        jitter: 在整周期之后随机推迟的最大秒数, 避免多个任务同时访问同一站点
+        history: 保留的运行记录条数
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = max(0.0, jitter)
+        self.running = None
+        self.history = deque(maxlen=history)
+        self.next_run = None
+
+    def schedule_next(self, now: float = None) -> float:
+        """计算下一次运行时间: 下一个整周期加上随机抖动"""
+        now = time.time() if now is None else now
+        self.next_run = (now // self.interval + 1) * self.interval + random.uniform(0, self.jitter)
+        return self.next_run
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "next_run": self.next_run,
+            "running": None if self.running is None else self.running.to_dict(),
+            "history": [run.to_dict() for run in self.history],
+        }
+
+
+class Scheduler:
+    def __init__(self, workers: int = SCHEDULER_WORKERS):
+        """
+        ## Parameter:
+        workers: 执行任务的常驻线程数, 不超过该数量的不同任务可以同时运行
+        """
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="scheduler")
+        self._task = None
+
+    def add(self, job: Job):
+        self.jobs[job.name] = job
+
+    def trigger(self, name: str, trigger: str = "manual"):
+        """启动一次运行, 返回 (运行记录, 是否新启动). 任务正在运行时返回正在进行的运行记录.
+
+        任务名不存在时抛出 KeyError.
+        """
+        job = self.jobs[name]
+        with self._lock:
+            if job.running is not None:
+                return job.running, False
+            run = JobRun(name, trigger)
+            job.running = run
+        self._executor.submit(self._run, job, run)
+        return run, True
+
+    def _run(self, job: Job, run: JobRun):
+        logger.info(f"[{job.name}] 任务开始 ({run.trigger})")
+        start = time.perf_counter()
+        ok = False
+        try:
+            run.items = job.func()
+            ok = True
+        except Exception as e:
+            logger.exception(f"[{job.name}] 任务失败: {e}")
+            run.error = repr(e)
+        finally:
+            duration = time.perf_counter() - start
+            metrics.record_job(job.name, duration, run.items, ok=ok)
+            with self._lock:
+                run.finished = time.time()
+                run.status = "success" if ok else "failure"
+                job.history.appendleft(run)
+                job.running = None
+            logger.info(f"[{job.name}] 任务结束: {run.status}, 耗时 {duration:.1f}s, 条数 {run.items}")
+
+    async def run_forever(self):
+        """调度循环: 到点的任务交给常驻线程执行, 不等待任务结束"""
+        for job in self.jobs.values():
+            job.schedule_next()
+        while True:
+            now = time.time()
+            for job in self.jobs.values():
+                if job.next_run > now:
+                    continue
+                run, started = self.trigger(job.name, trigger="schedule")
+                if not started:
+                    logger.warning(f"[{job.name}] 上一次运行 ({run.id}) 尚未结束, 跳过本次")
+                job.schedule_next(now)
+            wake = min((job.next_run for job in self.jobs.values()), default=now + 60)
+            await asyncio.sleep(min(max(wake - time.time(), 0.5), 60))
+
+    def start(self):
+        """在当前事件循环中启动调度循环"""
+        if self._task is None:
+            # 删除旧版本命令行运行以任务名写入的指标文件, 避免与本进程的指标重复.
+            # 现在命令行运行以 <任务名>_cli 写入, 不受影响
+            for name in self.jobs:
+                metrics.remove_pushed(name)
+            self._task = asyncio.get_running_loop().create_task(self.run_forever())
+            logger.info(f"调度器已启动, 任务: {', '.join(self.jobs)}")
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    async def stop(self):
+        """停止调度循环. 正在运行的任务不会被中断, 等待中的任务被取消"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def status(self) -> list:
+        with self._lock:
+            return [job.status() for job in self.jobs.values()]
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> Scheduler:
+    """获取接口进程内的调度器, 包含招标公告和淘股吧热帖两个任务."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler()
+            _scheduler.add(Job('bidding_notification', crawl_notices))
+            _scheduler.add(Job('tgb', crawl_hot_articles))
+        return _scheduler
@@ -0,0 +1,169 @@
+"""
+淘股吧文章倒排索引.
+
+对文章存储 (ArticleStore) 中的标题和正文做中文二元分词, 在内存中建立倒排索引, 按 BM25 打分.
+倒排表使用 array 存储文档编号和词频, 比 list/dict 紧凑得多. 索引记录已读取到的存储文件偏移,
+update() 只读取新追加的文章; 同一 URL 的新版本会替换旧版本, 被替换的旧文档在倒排表中积累到
+一定数量后统一清理.
+"""
+
+import math
+import threading
+from array import array
+from llm_tools.search.tokenizer import tokenize
+from llm_tools.search.snippet import make_snippet
+from llm_tools.tools.article_store import ArticleStore
+
+# BM25 参数
+K1 = 1.2
+B = 0.75
+# 标题中的词按正文词频的倍数计入
+SUBJECT_BOOST = 3
+# 被替换的旧文档超过当前文档数的该比例 (且不少于最小数量) 时清理倒排表
+COMPACT_DELETED_RATIO = 0.25
+COMPACT_MIN_DELETED = 64
+
+
+class Postings:
+    __slots__ = ("doc_ids", "freqs")
+
+    def __init__(self):
+        self.doc_ids = array('I')
+        self.freqs = array('H')
+
+    def add(self, doc_id: int, freq: int):
+        self.doc_ids.append(doc_id)
+        self.freqs.append(min(freq, 65535))
+
+    def without(self, deleted: set) -> "Postings":
+        postings = Postings()
+        for doc_id, freq in zip(self.doc_ids, self.freqs):
+            if doc_id not in deleted:
+                postings.doc_ids.append(doc_id)
+                postings.freqs.append(freq)
+        return postings
+
+
+class ArticleIndex:
+    def __init__(self, store: ArticleStore = None):
+        self.store = store if store is not None else ArticleStore()
+        self._lock = threading.RLock()
+        self.offset = 0
+        self.postings = {}
+        # 文档编号 -> 文档长度 / 存储文件中的偏移
+        self.doc_lengths = array('I')
+        self.doc_offsets = array('Q')
+        self.doc_urls = []
+        # url -> 当前有效的文档编号
+        self.url_docs = {}
+        self.deleted = set()
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.url_docs)
+
+    def update(self) -> int:
+        """索引存储中新追加的文章, 返回新增的文档数."""
+        with self._lock:
+            if self.store.size() <= self.offset:
+                return 0
+            count = 0
+            for record, start, end in self.store.iter_records(self.offset):
+                self.add(record, start)
+                self.offset = end
+                count += 1
+            if len(self.deleted) >= max(COMPACT_MIN_DELETED, COMPACT_DELETED_RATIO * len(self.url_docs)):
+                self.compact()
+            return count
+
+    def compact(self):
+        """从倒排表中删除被替换的旧文档, 避免内存随文章的重复追加增长"""
+        with self._lock:
+            postings = {}
+            for token, entry in self.postings.items():
+                entry = entry.without(self.deleted)
+                if entry.doc_ids:
+                    postings[token] = entry
+            self.postings = postings
+            self.deleted = set()
+
+    def add(self, record: dict, offset: int):
+        doc_id = len(self.doc_urls)
+        url = record['url']
+        if url in self.url_docs:
+            old_id = self.url_docs[url]
+            self.deleted.add(old_id)
+            self.total_length -= self.doc_lengths[old_id]
+
+        freqs = {}
+        for token in tokenize(record.get('subject')):
+            freqs[token] = freqs.get(token, 0) + SUBJECT_BOOST
+        for token in tokenize(record.get('content')):
+            freqs[token] = freqs.get(token, 0) + 1
+        for token, freq in freqs.items():
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = Postings()
+            postings.add(doc_id, freq)
+
+        length = sum(freqs.values())
+        self.doc_lengths.append(length)
+        self.doc_offsets.append(offset)
+        self.doc_urls.append(url)
+        self.url_docs[url] = doc_id
+        self.total_length += length
+
+    def search(self, q: str, page: int = 1, page_size: int = 20) -> dict:
+        """按 BM25 检索文章, 返回当前页的文章和总命中数."""
+        terms = list(dict.fromkeys(tokenize(q)))
+        page = max(1, page)
+        page_size = max(1, min(page_size, 100))
+        with self._lock:
+            doc_count = len(self.url_docs)
+            if not terms or doc_count == 0:
+                return {"total": 0, "page": page, "page_size": page_size, "items": []}
+            avg_length = self.total_length / doc_count
+            scores = {}
+            for term in terms:
+                postings = self.postings.get(term)
+                if postings is None:
+                    continue
+                # 文档频率只统计当前有效的文档, 否则被替换的旧版本会使 idf 变成负数
+                live = [(doc_id, freq) for doc_id, freq in zip(postings.doc_ids, postings.freqs)
+                        if doc_id not in self.deleted]
+                idf = math.log(1 + (doc_count - len(live) + 0.5) / (len(live) + 0.5))
+                for doc_id, freq in live:
+                    norm = K1 * (1 - B + B * self.doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (K1 + 1) / (freq + norm)
+
+            ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+            hits = ranked[(page - 1) * page_size:page * page_size]
+            offsets = [(self.doc_offsets[doc_id], score) for doc_id, score in hits]
+
+        # 只为当前页的文章读取正文生成摘要
+        keywords = q.split()
+        items = []
+        for offset, score in offsets:
+            record = self.store.read_at(offset)
+            items.append({
+                "url": record['url'],
+                "subject": record.get('subject'),
+                "userName": record.get('userName'),
+                "date": record.get('date'),
+                "score": round(score, 4),
+                "snippet": make_snippet(record.get('content'), keywords),
+            })
+        return {"total": len(ranked), "page": page, "page_size": page_size, "items": items}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_article_index() -> ArticleIndex:
+    """获取进程内共享的文章索引, 并索引存储中新追加的文章."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ArticleIndex()
+    _index.update()
+    return _index
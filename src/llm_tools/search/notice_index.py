@@ -0,0 +1,234 @@
+"""
+招标公告全文检索索引.
+
+基于 SQLite FTS5 的 trigram 分词器, 中文无需分词即可做子串匹配. 少于 3 个字的检索词无法
+使用 trigram 索引, 退化为在过滤后的结果上做 LIKE 匹配.
+
+索引随 BiddingCrawler.save 增量写入, 也可以从已保存的每日公告文件重建:
+
+    python -m llm_tools.search.notice_index
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from llm_tools.config import BIDDING_DIR, NOTICE_INDEX_FILE
+from llm_tools.logger import get_logger
+from llm_tools.utils.jsonl import iter_records
+from llm_tools.search.snippet import make_snippet, HIGHLIGHT_START, HIGHLIGHT_END
+
+logger = get_logger()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notices (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT,
+    content TEXT,
+    company TEXT,
+    type TEXT,
+    notice_time TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_notices_notice_time ON notices (notice_time);
+CREATE INDEX IF NOT EXISTS idx_notices_company ON notices (company);
+CREATE INDEX IF NOT EXISTS idx_notices_type ON notices (type);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS notices_fts USING fts5(
+    title, content, company,
+    content='notices', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS notices_ai AFTER INSERT ON notices BEGIN
+    INSERT INTO notices_fts (rowid, title, content, company) VALUES (new.id, new.title, new.content, new.company);
+END;
+CREATE TRIGGER IF NOT EXISTS notices_ad AFTER DELETE ON notices BEGIN
+    INSERT INTO notices_fts (notices_fts, rowid, title, content, company) VALUES ('delete', old.id, old.title, old.content, old.company);
+END;
+CREATE TRIGGER IF NOT EXISTS notices_au AFTER UPDATE ON notices BEGIN
+    INSERT INTO notices_fts (notices_fts, rowid, title, content, company) VALUES ('delete', old.id, old.title, old.content, old.company);
+    INSERT INTO notices_fts (rowid, title, content, company) VALUES (new.id, new.title, new.content, new.company);
+END;
+
+CREATE TABLE IF NOT EXISTS indexed_files (
+    name TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER
+);
+"""
+
+UPSERT_QUERY = """
+INSERT INTO notices (url, title, content, company, type, notice_time)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(url) DO UPDATE SET
+    title = excluded.title, content = excluded.content, company = excluded.company,
+    type = excluded.type, notice_time = excluded.notice_time
+"""
+
+SNIPPET_TOKENS = 32
+
+# trigram 分词器能使用索引的最短检索词长度
+MIN_FTS_TERM = 3
+
+
+def to_iso_date(date_str: str) -> str:
+    """把 20250102 或 2025-01-02 形式的日期转换为 2025-01-02."""
+    if re.fullmatch(r"\d{8}", date_str):
+        return datetime.strptime(date_str, "%Y%m%d").strftime("%Y-%m-%d")
+    return datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m-%d")
+
+
+def fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+class NoticeIndex:
+    def __init__(self, filename: str = NOTICE_INDEX_FILE):
+        self.filename = filename
+        self._local = threading.local()
+        with self.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        """每个线程使用独立的连接. WAL 模式下读写互不阻塞."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.filename, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def add(self, notices: list, filename: str = None) -> int:
+        """按 URL 插入或更新公告, 返回处理的条数.
+
+        ## Parameter:
+        notices: 公告列表或迭代器, 字段与每日公告文件中的记录一致
+        filename: 公告所在的每日文件. 指定时记录文件状态, sync_dir 不再重复索引该文件
+        """
+        rows = [
+            (n['url'], n.get('title'), n.get('content'), n.get('company'), n.get('type'), n.get('notice_time'))
+            for n in notices
+        ]
+        with self.connection() as connection:
+            connection.executemany(UPSERT_QUERY, rows)
+            if filename is not None:
+                stat = os.stat(filename)
+                connection.execute("INSERT OR REPLACE INTO indexed_files (name, mtime_ns, size) VALUES (?, ?, ?)",
+                                   (os.path.basename(filename), stat.st_mtime_ns, stat.st_size))
+        return len(rows)
+
+    def sync_dir(self, directory: str = BIDDING_DIR) -> int:
+        """索引目录中新增或修改过的每日公告文件, 返回处理的公告条数."""
+        connection = self.connection()
+        indexed = {row[0]: (row[1], row[2]) for row in connection.execute("SELECT name, mtime_ns, size FROM indexed_files")}
+        count = 0
+        for name in sorted(os.listdir(directory)):
+            # 每日公告文件为 JSON Lines, 旧版本为整文件 JSON 数组
+            if not re.fullmatch(r"bidding_notice_\d{8}\.jsonl?", name):
+                continue
+            stat = os.stat(os.path.join(directory, name))
+            if indexed.get(name) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            try:
+                notices = list(iter_records(os.path.join(directory, name)))
+            except ValueError as e:
+                logger.warning(f"跳过无法解析的公告文件 {name}: {e}")
+                continue
+            count += self.add(notices, os.path.join(directory, name))
+        if count:
+            logger.info(f"公告索引新增/更新 {count} 条")
+        return count
+
+    def search(self, q: str = None, company: str = None, type: str = None,
+               date_from: str = None, date_to: str = None, page: int = 1, page_size: int = 20) -> dict:
+        """检索公告.
+
+        ## Parameter:
+        q: 检索词, 多个词以空格分隔, 需要同时出现在标题、正文或招标方中
+        company: 招标方, 子串匹配
+        type: 公告类型, 精确匹配
+        date_from, date_to: 公告时间范围, 20250102 或 2025-01-02 形式, 包含两端
+        page, page_size: 分页, page 从 1 开始
+        """
+        terms = q.split() if q else []
+        fts_terms = [t for t in terms if len(t) >= MIN_FTS_TERM]
+        like_terms = [t for t in terms if len(t) < MIN_FTS_TERM]
+
+        where = []
+        params = []
+        if fts_terms:
+            where.append("notices_fts MATCH ?")
+            params.append(" AND ".join(fts_phrase(t) for t in fts_terms))
+        for term in like_terms:
+            where.append("(n.title LIKE ? OR n.content LIKE ? OR n.company LIKE ?)")
+            params.extend([f"%{term}%"] * 3)
+        if company:
+            where.append("n.company LIKE ?")
+            params.append(f"%{company}%")
+        if type:
+            where.append("n.type = ?")
+            params.append(type)
+        if date_from:
+            where.append("n.notice_time >= ?")
+            params.append(to_iso_date(date_from))
+        if date_to:
+            where.append("n.notice_time <= ?")
+            params.append(f"{to_iso_date(date_to)} 23:59:59")
+        where_clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+        # 只有全部检索词都经过 FTS 时才能用 FTS 生成摘要和高亮
+        fts_snippet = bool(fts_terms) and not like_terms
+        if fts_terms:
+            source = "notices_fts JOIN notices n ON n.id = notices_fts.rowid"
+            order = "ORDER BY notices_fts.rank"
+        else:
+            source = "notices n"
+            order = "ORDER BY n.notice_time DESC"
+        if fts_snippet:
+            columns = (f"highlight(notices_fts, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}'), "
+                       f"snippet(notices_fts, 1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', {SNIPPET_TOKENS})")
+        else:
+            columns = "n.title, n.content"
+
+        page = max(1, page)
+        page_size = max(1, min(page_size, 100))
+        connection = self.connection()
+        total = connection.execute(f"SELECT count(*) FROM {source} {where_clause}", params).fetchone()[0]
+        rows = connection.execute(
+            f"SELECT n.url, n.company, n.type, n.notice_time, {columns} FROM {source} {where_clause} {order} LIMIT ? OFFSET ?",
+            params + [page_size, (page - 1) * page_size]
+        ).fetchall()
+
+        items = []
+        for url, company_name, notice_type, notice_time, title, text in rows:
+            if not fts_snippet:
+                title = make_snippet(title, terms, width=len(title or ""))
+                text = make_snippet(text, terms)
+            items.append({
+                "url": url,
+                "title": title,
+                "company": company_name,
+                "type": notice_type,
+                "notice_time": notice_time,
+                "snippet": text,
+            })
+        return {"total": total, "page": page, "page_size": page_size, "items": items}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_notice_index() -> NoticeIndex:
+    """获取进程内共享的公告索引. 第一次获取时索引已保存但尚未索引的公告文件."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = NoticeIndex()
+            _index.sync_dir()
+        return _index
+
+
+if __name__ == '__main__':
+    NoticeIndex().sync_dir()
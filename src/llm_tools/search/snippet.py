@@ -0,0 +1,17 @@
+HIGHLIGHT_START = "<em>"
+HIGHLIGHT_END = "</em>"
+SNIPPET_CHARS = 60
+
+
+def make_snippet(text: str, terms: list, width: int = SNIPPET_CHARS) -> str:
+    """在 text 中找到第一个检索词, 截取前后 width 个字符并高亮所有检索词."""
+    text = text or ""
+    positions = [text.find(t) for t in terms if t and text.find(t) >= 0]
+    start = max(0, min(positions) - width // 2) if positions else 0
+    snippet = text[start:start + width]
+    for term in sorted(set(terms), key=len, reverse=True):
+        if term:
+            snippet = snippet.replace(term, f"{HIGHLIGHT_START}{term}{HIGHLIGHT_END}")
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + width < len(text) else ""
+    return f"{prefix}{snippet}{suffix}"
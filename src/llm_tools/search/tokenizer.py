@@ -0,0 +1,26 @@
+"""
+中文二元分词.
+
+连续的汉字切分为相邻两个字组成的词 (单个汉字保留为一个词), 连续的字母数字作为一个词并转为小写,
+其余字符作为分隔符丢弃. 例如 "龙头股ABC" 切分为 ["龙头", "头股", "abc"].
+"""
+
+import re
+
+TOKEN_PATTERN = re.compile(r"[一-鿿]+|[0-9a-zA-Z]+")
+
+
+def is_cjk(text: str) -> bool:
+    return '一' <= text[0] <= '鿿'
+
+
+def tokenize(text: str) -> list:
+    tokens = []
+    for run in TOKEN_PATTERN.findall(text or ""):
+        if not is_cjk(run):
+            tokens.append(run.lower())
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
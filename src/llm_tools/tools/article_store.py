@@ -0,0 +1,109 @@
+"""
+淘股吧文章存储.
+
+只追加的 JSONL 文件, 每行一篇文章. 同一 URL 的文章内容或列表信息 (作者、标题、日期) 变化时追加
+新版本, 以最后一个版本为准. 每条记录带有正文的内容哈希, 内容和列表信息都不变的文章不会重复写入.
+
+爬虫用 stale() 找出需要下载正文的文章, 其余文章直接用 get() 从存储中读取.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from llm_tools.config import TGB_ARTICLE_STORE
+
+
+# 列表页上的文章信息, 变化时重新下载正文
+LISTING_FIELDS = ('userName', 'subject', 'date')
+
+
+def content_hash(article: dict) -> str:
+    return hashlib.sha1((article.get('content') or '').encode('utf-8')).hexdigest()
+
+
+def listing_key(article: dict) -> tuple:
+    return tuple(article.get(field) for field in LISTING_FIELDS)
+
+
+class ArticleStore:
+    def __init__(self, filename: str = TGB_ARTICLE_STORE):
+        self.filename = filename
+        self._lock = threading.Lock()
+        # url -> 最新版本的内容哈希 / 列表信息 / 记录偏移
+        self.hashes = {}
+        self.listings = {}
+        self.offsets = {}
+        for record, start, _ in self.iter_records():
+            self._index(record, start)
+
+    def _index(self, record: dict, offset: int):
+        url = record['url']
+        self.hashes[url] = record['content_hash']
+        self.listings[url] = listing_key(record)
+        self.offsets[url] = offset
+
+    def iter_records(self, offset: int = 0):
+        """从字节偏移 offset 开始读取完整的记录, 生成 (记录, 起始偏移, 结束偏移).
+
+        末尾没有换行的不完整行 (正在写入) 不会读取, 写入中断留下的损坏行会被跳过.
+        """
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, 'rb') as infile:
+            infile.seek(offset)
+            while True:
+                start = infile.tell()
+                line = infile.readline()
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                yield record, start, infile.tell()
+
+    def size(self) -> int:
+        return os.path.getsize(self.filename) if os.path.exists(self.filename) else 0
+
+    def read_at(self, offset: int) -> dict:
+        """读取 offset 处的一条记录."""
+        with open(self.filename, 'rb') as infile:
+            infile.seek(offset)
+            return json.loads(infile.readline())
+
+    def get(self, url: str) -> dict:
+        """读取 url 的最新版本, 不在存储中时返回 None."""
+        offset = self.offsets.get(url)
+        return self.read_at(offset) if offset is not None else None
+
+    def stale(self, listing: list) -> list:
+        """返回列表中尚未存储或列表信息有变化, 需要重新下载正文的文章."""
+        return [a for a in listing if self.listings.get(a['url']) != listing_key(a)]
+
+    def append(self, articles: list) -> list:
+        """追加新文章以及内容或列表信息有变化的文章, 返回实际写入的记录."""
+        records = []
+        with self._lock:
+            for article in articles:
+                digest = content_hash(article)
+                url = article['url']
+                if self.hashes.get(url) == digest and self.listings.get(url) == listing_key(article):
+                    continue
+                record = dict(article, content_hash=digest, stored_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                records.append(record)
+                self.hashes[url] = digest
+                self.listings[url] = listing_key(article)
+            if records:
+                with open(self.filename, 'ab+') as outfile:
+                    # 上次写入中断时末尾可能留下不完整的行, 先补上换行, 避免与新记录粘在一起
+                    end = outfile.seek(0, os.SEEK_END)
+                    if end > 0:
+                        outfile.seek(end - 1)
+                        if outfile.read(1) != b'\n':
+                            end = outfile.write(b'\n') + end
+                    for record in records:
+                        self.offsets[record['url']] = end
+                        end += outfile.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+        return records
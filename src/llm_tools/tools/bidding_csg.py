@@ -3,22 +3,35 @@ import csv
 import random
 import json
 import time
-from openai import OpenAI
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+from llm_tools.utils.html_parser import parse_html, strainer
+from llm_tools.tools.browser_pool import get_browser_pool
 from llm_tools.connector import getConnection
+from llm_tools.bulk import insert_missing, update_by_key
 from llm_tools.logger import get_logger
-from llm_tools.config import LLM_API_KEY, LLM_BASE_URL
+from llm_tools.config import BIDDING_CSG_BASEURL
+from llm_tools.config import CRAWL_HOST_CONCURRENCY, CRAWL_HOST_MIN_INTERVAL, CRAWL_HOST_MAX_INTERVAL
 from llm_tools.utils.number_util import is_number
+from llm_tools.utils.throttle import HostThrottle
+from llm_tools.utils.title_matcher import TitleMatcher
+from llm_tools.tools.llm_gateway import get_llm_gateway
 
 logger = get_logger()
 
+# 所有 BiddingCSG 实例共享的访问限速, 多线程并发读取时同样生效
+HOST_THROTTLE = HostThrottle(CRAWL_HOST_CONCURRENCY, CRAWL_HOST_MIN_INTERVAL, CRAWL_HOST_MAX_INTERVAL)
+
+# 各页面只解析用到的部分
+TABLE_ONLY = strainer('table')
+LIST_ONLY = strainer('div', class_='List2')
+CONTENT_ONLY = strainer('div', class_='Content')
+NOTICE_ONLY = strainer(['h1', 'div'], class_=['s-title', 's-date', 'Content'])
+
 class BiddingParser:
     def __init__(self, html: str):
         self.html_text = html
 
     def parse_announcement(self):
-        soup = BeautifulSoup(self.html_text, 'html.parser')
+        soup = parse_html(self.html_text, TABLE_ONLY)
         tables = soup.findAll('table') # 找到内容部分
 
         all_table_data = []
@@ -86,33 +99,67 @@ class BiddingParser:
     def is_max_price(self, text: str):
         return text.startswith('最高限价')
 
+def read_tender_price(url: str) -> list:
+    """读取招标公告页面, 解析各标包的最高限价. 在浏览器池的工作线程中执行."""
+    with get_browser_pool().lease('bidding_csg') as lease:
+        with HOST_THROTTLE.slot(url):
+            lease.page.goto(url, wait_until='load')
+            html = lease.page.content()
+    soup = parse_html(html, CONTENT_ONLY)
+    content_div = soup.find('div', class_='Content') # 找到内容部分
+    return BiddingParser(str(content_div)).parse_bid_price()
+
 class BiddingCSG:
     """
     不要使用 requests, 目标网站有爬虫检测, 简单爬虫容易被检测到, 导致封 IP.
     """
     def __init__(self):
-        """初始化 Playwright 和浏览器实例"""
-        self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(headless=True, args=["--disable-blink-features=AutomationControlled"])  # 设置为 False 以便调试
-        self.context = self.browser.new_context()
-        self.page = self.context.new_page()
+        """浏览器上下文在第一次使用时才从浏览器池租用, 只解析页面时不启动浏览器"""
+        self.lease = None
+        self._page = None
         self.prev_page = None
         self.bidding_list = []
         self.filtered_list = []
         self.end_date = None
         self.stop_crawl = True
-
-    def search(self, keyword, max_page=65535, end_date=None, query_url=None):
+        self.on_items = None
+        self.known_urls = None
+
+    def _lease(self):
+        if self.lease is None:
+            self.lease = get_browser_pool().acquire('bidding_csg')
+        return self.lease
+
+    @property
+    def context(self):
+        return self._lease().context
+
+    @property
+    def page(self):
+        """当前操作的页面. 检索结果在新标签页中打开, 之后切换到新标签页"""
+        if self._page is None:
+            self._page = self._lease().page
+        return self._page
+
+    @page.setter
+    def page(self, value):
+        self._page = value
+
+    def search(self, keyword, max_page=65535, end_date=None, query_url=None, on_items=None, known_urls=None):
         """检索公告
         ## 参数
         - keyword: 检索关键字
         - max_page: 最大爬取页数
         - end_date: 要爬取公告的结束日期。取值为 None 或者 “2024-12-06” 格式的的日期字符串。
         - query_url: 检索页面地址，默认为：https://www.bidding.csg.cn/dbsearch.jspx?q=
+        - on_items: 每解析完一页列表后的回调, 参数为该页新增的公告列表
+        - known_urls: 已见公告的 URL 集合. 遇到第一条已见公告即停止翻页
         """
         self.stop_crawl = False
         self.end_date = end_date
-        start_url = f"https://www.bidding.csg.cn/dbsearch.jspx?q=" if query_url is None else query_url
+        self.on_items = on_items
+        self.known_urls = known_urls
+        start_url = f"{BIDDING_CSG_BASEURL}/dbsearch.jspx?q=" if query_url is None else query_url
         self.page.goto(start_url, wait_until='load')
 
         # 填入搜索关键字
@@ -152,6 +199,9 @@ class BiddingCSG:
         self.parse(self.page.content())
         count = 1
         while count < max_page:
+            if self.stop_crawl:
+                logger.info("爬取结束")
+                break
             logger.info(f"正在处理第【{count}】页")
             self.next_page()
             next_page_tag = self.page.locator('text=下一页')
@@ -173,29 +223,38 @@ class BiddingCSG:
     def parse(self, content_text):
         try:
             # 解析网页内容
-            soup = BeautifulSoup(content_text, 'html.parser')
+            soup = parse_html(content_text, LIST_ONLY)
 
             # 查找包含正文内容的 <div> 标签
             content_div = soup.find('div', class_='List2')
 
             # 提取正文内容
             if content_div:
+                items = []
                 for item in content_div.find_all("li"):
                     # print(item)
                     links = item.find_all("a")
                     # print(f"类型：{links[0].text}, 招标方: {links[1].text}, 项目名称: {links[2].text}, 链接：https://www.bidding.csg.cn/{links[2].get('href')}")
                     create_date = item.find('span', class_='Black14 Gray')
                     # print(f"日期: {create_date.text}")
+                    url = f"{BIDDING_CSG_BASEURL}{links[2].get('href')}"
+                    if self.known_urls is not None and url in self.known_urls:
+                        # 列表按时间倒序, 之后的公告都已处理过
+                        self.stop_crawl = True
+                        break
                     if create_date.text < self.end_date:
                         self.stop_crawl = True
                     else:
-                        self.bidding_list.append({
+                        items.append({
                             "type": links[0].text,
                             "part_a": links[1].text,
                             "project": links[2].text,
                             "date": create_date.text,
-                            "url": f"https://www.bidding.csg.cn{links[2].get('href')}"
+                            "url": url
                         })
+                self.bidding_list.extend(items)
+                if self.on_items is not None:
+                    self.on_items(items)
             else:
                 print(f"未找到正文内容")
                 return ""
@@ -207,9 +266,11 @@ class BiddingCSG:
         """阅读标讯.
         """
         try:
-            self.page.goto(url, wait_until='load')
-            self.page.locator('div.s-content').wait_for(state='visible')
-            soup = BeautifulSoup(self.page.content(), 'html.parser')
+            with HOST_THROTTLE.slot(url):
+                self.page.goto(url, wait_until='load')
+                self.page.locator('div.s-content').wait_for(state='visible')
+                html = self.page.content()
+            soup = parse_html(html, NOTICE_ONLY)
 
             title_tag = soup.find('h1', class_='s-title')
             date_tag = soup.find('div', class_='s-date')
@@ -232,7 +293,7 @@ class BiddingCSG:
         for item in bidding_list:
             try:
                 self.page.goto(item['url'], wait_until='load')
-                soup = BeautifulSoup(self.page.content(), 'html.parser')
+                soup = parse_html(self.page.content(), NOTICE_ONLY)
                 content_div = soup.find('div', class_='Content')
 
                 title_tag = soup.find('h1', class_='s-title')
@@ -259,51 +320,23 @@ class BiddingCSG:
         self.update(update_list)
 
     def save_to_db(self):
-        # 插入数据的 SQL 语句
-        insert_query = """
-        INSERT INTO bidding_csg (type, part_a, project, create_date, url)
-        VALUES (%s, %s, %s, %s, %s)
-        """
-
-        # 检查 URL 是否存在的 SQL 语句
-        check_url_query = """
-        SELECT url FROM bidding_csg WHERE url = %s
-        """
+        columns = ["type", "part_a", "project", "create_date", "url"]
+        rows = [(item["type"], item["part_a"], item["project"], item["date"], item["url"]) for item in self.bidding_list]
 
+        connection = None
         try:
             # 连接数据库
             connection = getConnection()
-            cursor = connection.cursor()
-
-            # 用于存储唯一的数据
-            unique_data_to_insert = []
-
-            for item in self.bidding_list:
-                url = item["url"]
-                # 检查 URL 是否已存在
-                cursor.execute(check_url_query, (url,))
-                result = cursor.fetchone()
-
-                if not result:  # 如果 URL 不存在
-                    unique_data_to_insert.append((item["type"], item["part_a"], item["project"], item["date"], item["url"]))
-                else:
-                    logger.info(f"URL 已存在，跳过: {url}")
-
-            # 执行批量插入
-            if unique_data_to_insert:
-                cursor.executemany(insert_query, unique_data_to_insert)
-                connection.commit()
-                logger.info(f"成功插入 {cursor.rowcount} 条数据")
-            else:
-                logger.info("没有新数据需要插入")
+            # URL 已存在的公告跳过, 批量插入其余公告
+            count = insert_missing(connection, "bidding_csg", columns, rows, key="url")
+            logger.info(f"成功插入 {count} 条数据")
 
         except Exception as e:
             logger.error(f"数据库错误: {e}")
 
         finally:
             # 关闭连接
-            if connection.is_connected():
-                cursor.close()
+            if connection is not None and connection.is_connected():
                 connection.close()
                 logger.info("数据库连接已关闭")
 
@@ -358,31 +391,22 @@ class BiddingCSG:
     def update(self, update_list):
         """更新数据库
         """
-        # 更新 SQL 语句
-        update_query = """
-        UPDATE llm_tools.bidding_csg
-        SET summary = %s, project = %s, price = %s
-        WHERE url = %s
-        """
-
+        connection = None
         try:
             # 连接数据库
             connection = getConnection()
-            cursor = connection.cursor()
 
             data_to_update = [(item["summary"], item["project"], item["price"], item["url"]) for item in update_list]
             
             # 执行更新
-            cursor.executemany(update_query, data_to_update)
-            connection.commit()
+            update_by_key(connection, "llm_tools.bidding_csg", ["summary", "project", "price"], data_to_update, key="url")
 
         except Exception as e:
             logger.info(f"数据库错误: {e}")
 
         finally:
             # 关闭连接
-            if connection.is_connected():
-                cursor.close()
+            if connection is not None and connection.is_connected():
                 connection.close()
                 print("数据库连接已关闭")
 
@@ -398,11 +422,9 @@ class BiddingCSG:
 
         print(f"加载了 {len(self.bidding_list)} 条记录")
 
-    def llm_summary(self, user_prompt):
-        """调用大模型总结内容.
+    def llm_summary(self, user_prompt, use_cache=True):
+        """调用大模型总结内容. 相同的内容优先返回缓存的响应.
         """
-        client = OpenAI(api_key=LLM_API_KEY, base_url=LLM_BASE_URL)
-
         SYSTEM_PROMPT = """
         请仔细阅读用户提供的 HTML 内容, 提取信息, 以 JSON 格式输出。只输出 JSON 字符串, 不得输出其他内容, 也不得输出 Markdown 标记.
 
@@ -427,24 +449,13 @@ class BiddingCSG:
 
         """
 
-        response = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": str(user_prompt)},
-            ],
-            stream=False
-        )
-
-        resp = response.choices[0].message.content
+        resp = get_llm_gateway().chat(str(user_prompt), SYSTEM_PROMPT, use_cache=use_cache)
         # print(resp)
         return resp
 
-    def llm_price_extract(self, user_prompt):
-        """调用大模型提取价格信息.
+    def llm_price_extract(self, user_prompt, use_cache=True):
+        """调用大模型提取价格信息. 相同的内容优先返回缓存的响应.
         """
-        client = OpenAI(api_key=LLM_API_KEY, base_url=LLM_BASE_URL)
-
         SYSTEM_PROMPT = """
         请仔细阅读用户提供的 HTML 内容, 提取信息, 以 JSON 格式输出。只输出 JSON 字符串, 不得输出其他内容, 也不得输出 Markdown 标记.
 
@@ -467,21 +478,14 @@ class BiddingCSG:
 
         """
 
-        response = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": str(user_prompt)},
-            ],
-            stream=False
-        )
-
-        resp = response.choices[0].message.content
+        resp = get_llm_gateway().chat(str(user_prompt), SYSTEM_PROMPT, use_cache=use_cache)
         # print(resp)
         return resp
     
     def analyze(self, keyword):
         """分析中标价格和招标价格
+
+        中标记录与招标公告在内存中按项目名称匹配, 招标公告页面在浏览器池的工作线程中并发读取.
         """
         # 查询 SQL 语句
         query_final_price = """
@@ -491,6 +495,7 @@ class BiddingCSG:
 
         results_with_summary = []
         update_list = []
+        connection = None
         try:
             # 连接数据库
             connection = getConnection()
@@ -518,38 +523,43 @@ class BiddingCSG:
             else:
                 logger.info(f"未找到包含关键字 '{keyword}' 的记录。")
             
-            # 过滤出对应的招标公告，并调用大模型来提取招标金额等信息
+            # 一次性读取全部招标公告, 在内存中按项目名称匹配每条中标记录对应的招标公告
+            cursor.execute("""
+            SELECT project, url FROM llm_tools.bidding_csg
+            WHERE type='招标公告'
+            """)
+            matcher = TitleMatcher(cursor.fetchall())
+            matched = []
             for item in results_with_summary:
-                project_key = item['project'][:30]
-                query = """
-                SELECT * FROM llm_tools.bidding_csg
-                WHERE project LIKE %s AND type="招标公告"
-                """
-                logger.info(f"Project key: {project_key}")
-                cursor.execute(query, (f"%{project_key}%",))
-                result = cursor.fetchall()
-                if len(result) > 0:
-                    url = result[0][4]
-                    logger.info(f"查询招标公告 url: {url}")
-                    self.page.goto(url, wait_until='load')
-                    soup = BeautifulSoup(self.page.content(), 'html.parser')
-                    content_div = soup.find('div', class_='Content') # 找到内容部分
-                    bid_parser = BiddingParser(str(content_div))
-                    price_info = bid_parser.parse_bid_price()
-                    logger.info(f"项目【{item['project']}】的报价信息：{price_info}")
-                    # logger.info(f"中标公告: {item['url']}")
-                    # logger.info(f"中标金额: {item['summary']}")
-                    item['price'] = json.dumps(price_info)
+                url = matcher.match(item['project'][:30])
+                if url is not None:
+                    logger.info(f"项目【{item['project']}】的招标公告: {url}")
+                    matched.append((item, url))
+            logger.info(f"{len(matched)}/{len(results_with_summary)} 条中标记录找到了招标公告")
+
+            # 并发读取招标公告, 提取最高限价等信息
+            urls = list(dict.fromkeys(url for _, url in matched))
+            futures = {url: get_browser_pool().executor().submit(read_tender_price, url) for url in urls}
+            prices = {}
+            for url, future in futures.items():
+                try:
+                    prices[url] = future.result()
+                except Exception as e:
+                    logger.error(f"访问链接时发生错误: {url}。 错误信息: {e}")
+
+            for item, url in matched:
+                if url in prices:
+                    logger.info(f"项目【{item['project']}】的报价信息：{prices[url]}")
+                    item['price'] = json.dumps(prices[url])
                     update_list.append(item)
-                    # self.random_wait()
             self.update(update_list)
-            return result
+            return update_list
         except Exception as e:
             logger.info(f"数据库错误: {e}")
 
         finally:
             # 关闭连接
-            if connection.is_connected():
+            if connection is not None and connection.is_connected():
                 cursor.close()
                 connection.close()
                 logger.info("数据库连接已关闭")
@@ -562,6 +572,13 @@ class BiddingCSG:
         # 等待
         time.sleep(wait_time)
 
+    def close(self):
+        """把浏览器上下文归还给浏览器池. 实例只能在创建它的线程中使用和关闭."""
+        if self.lease is not None:
+            get_browser_pool().release(self.lease)
+            self.lease = None
+            self._page = None
+
 class BiddingCsgAnalyzer:
     def output_as_csv(self):
         # 以 csv 格式输出对比结果
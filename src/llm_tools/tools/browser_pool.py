@@ -0,0 +1,182 @@
+"""
+共享的无头浏览器池.
+
+Playwright 的同步 API 只能在创建它的线程中使用, 所以浏览器池为每个线程维护一个常驻的
+Chromium 进程, 并按 profile (通常是站点名) 复用浏览器上下文. 不同 profile 之间的上下文
+相互隔离 (cookie/缓存不共享); 同一 profile 的上下文在多次租用之间复用, 超过使用次数或
+存活时间后回收. 新建上下文时安装该 profile 的请求拦截策略 (见 resource_policy).
+
+用法:
+
+    with get_browser_pool().lease('bidding_csg') as lease:
+        lease.page.goto(url)
+"""
+
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from playwright.sync_api import sync_playwright
+from llm_tools.config import BROWSER_LEASE_MAX_USES, BROWSER_LEASE_MAX_AGE, BROWSER_WORKERS
+from llm_tools.tools.resource_policy import install_policy
+from llm_tools.logger import get_logger
+
+logger = get_logger()
+
+LAUNCH_ARGS = ["--disable-blink-features=AutomationControlled"]
+
+
+class BrowserLease:
+    """一次浏览器上下文租用."""
+    def __init__(self, profile: str, context, page, recyclable: bool):
+        self.profile = profile
+        self.context = context
+        self.page = page
+        self.recyclable = recyclable
+        self.thread_id = threading.get_ident()
+        self.created = time.monotonic()
+        self.uses = 0
+
+
+class _ThreadBrowser:
+    """单个线程持有的 Playwright 实例、浏览器和空闲上下文."""
+    def __init__(self):
+        self.playwright = None
+        self.browser = None
+        self.idle = {}
+
+
+class BrowserPool:
+    def __init__(self, max_uses: int = BROWSER_LEASE_MAX_USES, max_age: float = BROWSER_LEASE_MAX_AGE, headless: bool = True):
+        """
+        ## Parameter:
+        max_uses: 一个上下文最多被租用的次数, 超过后关闭
+        max_age: 一个上下文最长存活秒数, 超过后关闭
+        headless: 是否以无头模式启动浏览器
+        """
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.headless = headless
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"launches": 0, "contexts": 0, "reuses": 0, "recycled": 0}
+        self._executor = None
+
+    def _thread_browser(self) -> _ThreadBrowser:
+        state = getattr(self._local, 'state', None)
+        if state is None:
+            state = _ThreadBrowser()
+            self._local.state = state
+        if state.browser is None or not state.browser.is_connected():
+            if state.playwright is None:
+                state.playwright = sync_playwright().start()
+            state.browser = state.playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+            state.idle = {}
+            self._count("launches")
+            logger.info(f"浏览器已启动: {threading.current_thread().name}")
+        return state
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def acquire(self, profile: str = 'default', fresh: bool = False, **context_options) -> BrowserLease:
+        """租用一个浏览器上下文.
+
+        ## Parameter:
+        profile: 上下文分组, 不同分组之间互不共享 cookie
+        fresh: 为 True 时总是新建上下文, 归还时直接关闭
+        context_options: 传给 browser.new_context 的参数. 指定时上下文不参与复用
+        """
+        state = self._thread_browser()
+        recyclable = not fresh and not context_options
+        if recyclable:
+            idle = state.idle.get(profile, [])
+            while idle:
+                lease = idle.pop()
+                if lease.page.is_closed():
+                    self._close_context(lease)
+                    continue
+                lease.uses += 1
+                self._count("reuses")
+                return lease
+
+        context = state.browser.new_context(**context_options)
+        install_policy(profile, context)
+        self._count("contexts")
+        lease = BrowserLease(profile, context, context.new_page(), recyclable)
+        lease.uses = 1
+        return lease
+
+    def release(self, lease: BrowserLease):
+        """归还上下文. 只能在租用它的线程中归还, 否则直接丢弃."""
+        if lease.thread_id != threading.get_ident():
+            logger.warning("浏览器上下文不能跨线程归还, 已丢弃")
+            return
+        state = self._local.state
+        expired = lease.uses >= self.max_uses or time.monotonic() - lease.created >= self.max_age
+        if not lease.recyclable or expired or lease.page.is_closed():
+            self._close_context(lease)
+            self._count("recycled")
+            return
+        # 关闭租用期间打开的其他标签页, 只保留初始页面
+        for page in lease.context.pages:
+            if page is not lease.page:
+                page.close()
+        state.idle.setdefault(lease.profile, []).append(lease)
+
+    @contextmanager
+    def lease(self, profile: str = 'default', fresh: bool = False, **context_options):
+        lease = self.acquire(profile, fresh=fresh, **context_options)
+        try:
+            yield lease
+        finally:
+            self.release(lease)
+
+    def _close_context(self, lease: BrowserLease):
+        try:
+            lease.context.close()
+        except Exception as e:
+            logger.warning(f"关闭浏览器上下文失败: {e}")
+
+    def close_thread(self):
+        """关闭当前线程的浏览器和 Playwright 实例."""
+        state = getattr(self._local, 'state', None)
+        if state is None:
+            return
+        try:
+            if state.browser is not None:
+                state.browser.close()
+            if state.playwright is not None:
+                state.playwright.stop()
+        except Exception as e:
+            logger.warning(f"关闭浏览器失败: {e}")
+        self._local.state = None
+
+    def executor(self) -> ThreadPoolExecutor:
+        """常驻的浏览器工作线程池. 线程常驻, 线程内的浏览器在多次任务之间保持预热.
+
+        提交的任务不能再向该线程池提交任务并等待结果, 否则线程池占满时会死锁.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=BROWSER_WORKERS, thread_name_prefix="browser-worker")
+            return self._executor
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_browser_pool() -> BrowserPool:
+    """获取进程内共享的浏览器池."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close_thread)
+        return _pool
@@ -1,21 +1,8 @@
-from openai import OpenAI
-from llm_tools.config import LLM_API_KEY, LLM_BASE_URL
+from llm_tools.config import LLM_STREAM
+from llm_tools.tools.llm_gateway import get_llm_gateway
 
-def deepseek_chat(user_prompt: str, system_prompt="You are a helpful assistant."):
-        """调用 Deepseek 大模型完成任务.
+def deepseek_chat(user_prompt: str, system_prompt="You are a helpful assistant.", use_cache=True, stream=LLM_STREAM):
+        """调用 Deepseek 大模型完成任务. 相同的提示词优先返回缓存的响应.
         """
-        client = OpenAI(api_key=LLM_API_KEY, base_url=LLM_BASE_URL)
-
         print('user prompt:', user_prompt)
-
-        response = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            stream=False
-        )
-
-        resp = response.choices[0].message.content
-        return resp
\ No newline at end of file
+        return get_llm_gateway().chat(user_prompt, system_prompt, use_cache=use_cache, stream=stream)
@@ -0,0 +1,179 @@
+"""
+大模型响应缓存.
+
+以 (模型, 系统提示词, 用户提示词) 的哈希为键, 把响应保存在本地 SQLite 文件中. 相同的提示词
+再次调用时直接返回缓存, 不再请求接口. 缓存按存活时间和总大小淘汰, 可选 zlib 压缩.
+
+设置 LLM_CACHE_BYPASS=true 或调用时传入 use_cache=False 可以跳过缓存.
+"""
+
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from llm_tools.config import LLM_CACHE_FILE, LLM_CACHE_MAX_AGE, LLM_CACHE_MAX_BYTES, LLM_CACHE_COMPRESS, LLM_CACHE_BYPASS
+from llm_tools.logger import get_logger
+from llm_tools.metrics import counter
+
+logger = get_logger()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    model TEXT,
+    created REAL,
+    accessed REAL,
+    size INTEGER,
+    compressed INTEGER,
+    value BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache (created);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed);
+"""
+
+# 每写入多少条检查一次淘汰
+EVICT_INTERVAL = 100
+
+CACHE_REQUESTS = counter("llm_cache_requests_total", "大模型缓存查询次数", ["result"])
+
+
+def cache_key(model: str, system_prompt: str, user_prompt: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model, system_prompt, user_prompt):
+        data = (part or "").encode("utf-8")
+        # 带上长度, 避免不同的拆分方式拼出相同的字符串
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class LLMCache:
+    def __init__(self, filename: str = LLM_CACHE_FILE, max_age: float = LLM_CACHE_MAX_AGE,
+                 max_bytes: int = LLM_CACHE_MAX_BYTES, compress: bool = LLM_CACHE_COMPRESS):
+        """
+        ## Parameter:
+        filename: 缓存文件
+        max_age: 缓存最长保存秒数
+        max_bytes: 缓存内容的总字节数上限, 超过时淘汰最久未访问的条目
+        compress: 是否用 zlib 压缩缓存内容
+        """
+        self.filename = filename
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        with self.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.filename, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, model: str, system_prompt: str, user_prompt: str) -> str:
+        """返回缓存的响应, 没有或已过期时返回 None."""
+        key = cache_key(model, system_prompt, user_prompt)
+        now = time.time()
+        connection = self.connection()
+        row = connection.execute("SELECT created, compressed, value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[0] > self.max_age:
+            with self._lock:
+                self.misses += 1
+            return None
+        with connection:
+            connection.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (now, key))
+        with self._lock:
+            self.hits += 1
+        value = zlib.decompress(row[2]) if row[1] else row[2]
+        return value.decode("utf-8")
+
+    def put(self, model: str, system_prompt: str, user_prompt: str, response: str):
+        key = cache_key(model, system_prompt, user_prompt)
+        value = response.encode("utf-8")
+        if self.compress:
+            value = zlib.compress(value)
+        now = time.time()
+        with self.connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, created, accessed, size, compressed, value) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, now, now, len(value), int(self.compress), value)
+            )
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % EVICT_INTERVAL == 0
+        if evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """删除过期条目, 并在总大小超过上限时按最久未访问的顺序删除, 返回删除的条数."""
+        now = time.time()
+        with self.connection() as connection:
+            removed = connection.execute("DELETE FROM llm_cache WHERE created < ?", (now - self.max_age,)).rowcount
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            if total > self.max_bytes:
+                rows = connection.execute("SELECT key, size FROM llm_cache ORDER BY accessed").fetchall()
+                keys = []
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    keys.append((key,))
+                    total -= size
+                connection.executemany("DELETE FROM llm_cache WHERE key = ?", keys)
+                removed += len(keys)
+        if removed:
+            logger.info(f"大模型缓存淘汰 {removed} 条")
+        return removed
+
+    def stats(self) -> dict:
+        connection = self.connection()
+        count, size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": count,
+                "bytes": size,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache() -> LLMCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+def cached_completion(model: str, system_prompt: str, user_prompt: str, call, use_cache: bool = True) -> str:
+    """先查缓存, 未命中时调用 call() 请求大模型并写入缓存.
+
+    ## Parameter:
+    model, system_prompt, user_prompt: 缓存键
+    call: 无参数函数, 返回大模型的响应文本
+    use_cache: 为 False 时 (或设置了 LLM_CACHE_BYPASS) 直接调用, 不读写缓存
+    """
+    if not use_cache or LLM_CACHE_BYPASS:
+        return call()
+    cache = get_llm_cache()
+    response = cache.get(model, system_prompt, user_prompt)
+    CACHE_REQUESTS.inc(result="hit" if response is not None else "miss")
+    if response is not None:
+        return response
+    response = call()
+    if response is not None:
+        cache.put(model, system_prompt, user_prompt, response)
+    return response
@@ -0,0 +1,202 @@
+"""
+大模型网关.
+
+所有大模型调用共用一个 OpenAI 客户端和 HTTP 连接池, 保持长连接, 并统一设置超时和重试.
+支持流式输出. 每次调用记录首 token 耗时、总耗时和 token 用量, 超过阈值的慢调用打印告警.
+调用先经过本地响应缓存 (llm_cache), 命中缓存时不请求接口, 也不计入耗时统计.
+"""
+
+import time
+import threading
+from collections import deque
+import httpx
+from openai import OpenAI
+from llm_tools.config import LLM_API_KEY, LLM_BASE_URL
+from llm_tools.config import LLM_TIMEOUT, LLM_CONNECT_TIMEOUT, LLM_CLIENT_RETRIES, LLM_MAX_CONNECTIONS, LLM_STREAM, LLM_SLOW_CALL_SECONDS
+from llm_tools.tools.llm_cache import cached_completion
+from llm_tools.logger import get_logger
+from llm_tools.metrics import counter, histogram
+
+logger = get_logger()
+
+DEFAULT_MODEL = "deepseek-chat"
+# 保留最近多少次调用用于计算耗时分位数
+RECENT_CALLS = 1000
+
+LLM_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+LLM_SECONDS = histogram("llm_request_seconds", "大模型调用总耗时 (秒)", ["model", "stream"], buckets=LLM_BUCKETS)
+LLM_TTFT_SECONDS = histogram("llm_ttft_seconds", "大模型首 token 耗时 (秒)", ["model", "stream"], buckets=LLM_BUCKETS)
+LLM_TOKENS = counter("llm_tokens_total", "大模型 token 用量", ["model", "kind"])
+LLM_ERRORS = counter("llm_errors_total", "大模型调用失败次数", ["model"])
+
+
+class CallStats:
+    __slots__ = ("model", "stream", "ttft", "latency", "prompt_tokens", "completion_tokens", "error")
+
+    def __init__(self, model: str, stream: bool):
+        self.model = model
+        self.stream = stream
+        self.ttft = None
+        self.latency = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.error = None
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+class LLMGateway:
+    def __init__(self, api_key: str = LLM_API_KEY, base_url: str = LLM_BASE_URL, timeout: float = LLM_TIMEOUT,
+                 connect_timeout: float = LLM_CONNECT_TIMEOUT, max_retries: int = LLM_CLIENT_RETRIES,
+                 max_connections: int = LLM_MAX_CONNECTIONS, http_client: httpx.Client = None):
+        """
+        ## Parameter:
+        api_key, base_url: 大模型接口
+        timeout: 读超时秒数, 流式输出时为两个数据块之间的最长间隔
+        connect_timeout: 建立连接的超时秒数
+        max_retries: 连接错误、超时、429 和 5xx 时由客户端自动退避重试的次数
+        max_connections: 连接池大小, 多线程共用
+        http_client: 自定义的 httpx 客户端, 不传时按上面的参数创建
+        """
+        if http_client is None:
+            http_client = httpx.Client(
+                timeout=httpx.Timeout(timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            )
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=max_retries,
+                             timeout=httpx.Timeout(timeout, connect=connect_timeout), http_client=http_client)
+        self._lock = threading.Lock()
+        self.recent = deque(maxlen=RECENT_CALLS)
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def chat(self, user_prompt: str, system_prompt: str = "You are a helpful assistant.", model: str = DEFAULT_MODEL,
+             stream: bool = LLM_STREAM, use_cache: bool = True, on_token=None) -> str:
+        """调用大模型, 返回完整的响应文本.
+
+        ## Parameter:
+        user_prompt, system_prompt: 提示词
+        model: 模型名称
+        stream: 是否流式请求. 流式时可以测到首 token 耗时, 长响应也不会因为读超时而失败
+        use_cache: 是否使用本地响应缓存
+        on_token: 流式输出时每收到一段文本调用一次 on_token(text)
+        """
+        return cached_completion(model, system_prompt, user_prompt,
+                                 lambda: self.complete(user_prompt, system_prompt, model, stream, on_token),
+                                 use_cache=use_cache)
+
+    def complete(self, user_prompt: str, system_prompt: str, model: str = DEFAULT_MODEL,
+                 stream: bool = LLM_STREAM, on_token=None) -> str:
+        """不经过缓存直接请求接口, 并记录本次调用的耗时和 token 用量"""
+        stats = CallStats(model, stream)
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        start = time.perf_counter()
+        try:
+            if stream:
+                content = self._stream(model, messages, stats, start, on_token)
+            else:
+                response = self.client.chat.completions.create(model=model, messages=messages, stream=False)
+                stats.ttft = time.perf_counter() - start
+                self._usage(stats, response.usage)
+                content = response.choices[0].message.content
+        except Exception as e:
+            stats.error = repr(e)
+            raise
+        finally:
+            stats.latency = time.perf_counter() - start
+            self.record(stats)
+        return content
+
+    def _stream(self, model: str, messages: list, stats: CallStats, start: float, on_token) -> str:
+        parts = []
+        response = self.client.chat.completions.create(
+            model=model, messages=messages, stream=True, stream_options={"include_usage": True}
+        )
+        for chunk in response:
+            if chunk.usage is not None:
+                self._usage(stats, chunk.usage)
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                if stats.ttft is None:
+                    stats.ttft = time.perf_counter() - start
+                parts.append(text)
+                if on_token is not None:
+                    on_token(text)
+        return "".join(parts)
+
+    @staticmethod
+    def _usage(stats: CallStats, usage):
+        if usage is not None:
+            stats.prompt_tokens = usage.prompt_tokens or 0
+            stats.completion_tokens = usage.completion_tokens or 0
+
+    def record(self, stats: CallStats):
+        with self._lock:
+            self.recent.append(stats)
+            self.calls += 1
+            self.errors += stats.error is not None
+            self.prompt_tokens += stats.prompt_tokens
+            self.completion_tokens += stats.completion_tokens
+        LLM_SECONDS.observe(stats.latency, model=stats.model, stream=stats.stream)
+        if stats.ttft is not None:
+            LLM_TTFT_SECONDS.observe(stats.ttft, model=stats.model, stream=stats.stream)
+        LLM_TOKENS.inc(stats.prompt_tokens, model=stats.model, kind="prompt")
+        LLM_TOKENS.inc(stats.completion_tokens, model=stats.model, kind="completion")
+        if stats.error is not None:
+            LLM_ERRORS.inc(model=stats.model)
+        ttft = f"{stats.ttft:.2f}s" if stats.ttft is not None else "-"
+        message = (f"大模型调用 {stats.model}: 首 token {ttft}, 总耗时 {stats.latency:.2f}s, "
+                   f"tokens {stats.prompt_tokens}/{stats.completion_tokens}")
+        if stats.error is not None:
+            logger.error(f"{message}, 失败: {stats.error}")
+        elif stats.latency > LLM_SLOW_CALL_SECONDS:
+            logger.warning(f"{message}, 慢调用")
+        else:
+            logger.info(message)
+
+    def stats(self) -> dict:
+        """汇总调用次数、token 用量和最近调用的耗时分位数"""
+        with self._lock:
+            recent = [s for s in self.recent if s.error is None]
+            latencies = [s.latency for s in recent]
+            ttfts = [s.ttft for s in recent if s.ttft is not None]
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "latency_p50": percentile(latencies, 0.5),
+                "latency_p95": percentile(latencies, 0.95),
+                "ttft_p50": percentile(ttfts, 0.5),
+                "ttft_p95": percentile(ttfts, 0.95),
+            }
+
+    def close(self):
+        self.client.close()
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_llm_gateway() -> LLMGateway:
+    """获取进程内共享的大模型网关"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
@@ -0,0 +1,110 @@
+"""
+浏览器请求拦截策略.
+
+爬虫只读取 page.content() 交给 BeautifulSoup 解析, 图片、字体、样式表和统计脚本都用不到.
+浏览器池新建上下文时按 profile 安装对应的策略, 在上下文级别拦截这些请求.
+"""
+
+import re
+import threading
+from llm_tools.config import RESOURCE_BLOCKING
+from llm_tools.logger import get_logger
+
+logger = get_logger()
+
+# 被拦截资源的估算大小 (字节), 用于统计节省的流量. 拦截的请求不会下载, 无法得到真实大小.
+ESTIMATED_RESOURCE_BYTES = {
+    "image": 30 * 1024,
+    "media": 200 * 1024,
+    "font": 40 * 1024,
+    "stylesheet": 20 * 1024,
+    "script": 30 * 1024,
+}
+DEFAULT_ESTIMATED_BYTES = 10 * 1024
+
+# 常见统计、广告脚本的地址
+TRACKER_PATTERNS = [
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"hm\.baidu\.com",
+    r"cnzz\.com",
+    r"umeng\.com",
+    r"growingio\.com",
+]
+
+
+class ResourcePolicy:
+    def __init__(self, block_types=(), block_patterns=(), allow_patterns=()):
+        """
+        ## Parameter:
+        block_types: 拦截的资源类型, 取值为 Playwright 的 request.resource_type, 比如 image/font/stylesheet
+        block_patterns: 拦截的 URL 正则表达式
+        allow_patterns: 放行的 URL 正则表达式, 优先级高于前两项
+        """
+        self.block_types = set(block_types)
+        self.block_patterns = [re.compile(p) for p in block_patterns]
+        self.allow_patterns = [re.compile(p) for p in allow_patterns]
+        self._lock = threading.Lock()
+        self.blocked = {}
+        self.allowed = 0
+        self.bytes_saved = 0
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if any(p.search(url) for p in self.allow_patterns):
+            return False
+        if resource_type in self.block_types:
+            return True
+        return any(p.search(url) for p in self.block_patterns)
+
+    def handle(self, route, request):
+        if self.should_block(request.resource_type, request.url):
+            with self._lock:
+                self.blocked[request.resource_type] = self.blocked.get(request.resource_type, 0) + 1
+                self.bytes_saved += ESTIMATED_RESOURCE_BYTES.get(request.resource_type, DEFAULT_ESTIMATED_BYTES)
+            route.abort()
+        else:
+            with self._lock:
+                self.allowed += 1
+            route.continue_()
+
+    def install(self, context):
+        """在浏览器上下文上安装拦截规则."""
+        context.route("**/*", self.handle)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "blocked": sum(self.blocked.values()),
+                "blocked_by_type": dict(self.blocked),
+                "allowed": self.allowed,
+                "estimated_bytes_saved": self.bytes_saved,
+            }
+
+
+# 各站点的拦截策略, key 为浏览器池的 profile.
+# 南网招标网的检索按钮依赖脚本弹出新页面, 不能拦截 script.
+SITE_POLICIES = {
+    "bidding_csg": ResourcePolicy(
+        block_types=["image", "media", "font", "stylesheet"],
+        block_patterns=TRACKER_PATTERNS,
+    ),
+    "taoguba": ResourcePolicy(
+        block_types=["image", "media", "font", "stylesheet"],
+        block_patterns=TRACKER_PATTERNS,
+    ),
+}
+
+
+def install_policy(profile: str, context):
+    """按 profile 给新建的浏览器上下文安装拦截策略, 未配置的 profile 不拦截."""
+    policy = SITE_POLICIES.get(profile)
+    if RESOURCE_BLOCKING and policy is not None:
+        policy.install(context)
+
+
+def log_policy_stats():
+    for profile, policy in SITE_POLICIES.items():
+        stats = policy.stats()
+        if stats["blocked"] or stats["allowed"]:
+            logger.info(f"[{profile}] 拦截请求 {stats['blocked']} 个 {stats['blocked_by_type']}, "
+                        f"放行 {stats['allowed']} 个, 估计节省 {stats['estimated_bytes_saved'] / 1024:.0f} KB")
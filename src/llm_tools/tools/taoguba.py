@@ -1,16 +1,26 @@
 import csv
+import html
 import time
 import json
 import re
 import random
-import requests
 import datetime
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from playwright.sync_api import sync_playwright
-from llm_tools.config import TGB_USERNAME, TGB_PASSWORD, TGB_BASEURL
+from urllib.parse import urljoin
+import queue
+import threading
+from collections import deque
+from llm_tools.utils.html_parser import parse_html, strainer
+from concurrent.futures import ThreadPoolExecutor
+from llm_tools.tools.browser_pool import get_browser_pool
+from llm_tools.config import TGB_USERNAME, TGB_PASSWORD, TGB_BASEURL, TGB_BLOG_WORKERS, TGB_PAGE_WORKERS, TGB_PAGE_RETRIES
+from llm_tools.config import CRAWL_HOST_CONCURRENCY, CRAWL_HOST_MIN_INTERVAL, CRAWL_HOST_MAX_INTERVAL
+from llm_tools.config import LLM_WORKERS, LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, LLM_RETRIES
 from llm_tools.logger import get_logger
 from llm_tools.tools.deepseek import deepseek_chat
+from llm_tools.utils.rate_limit import RateLimiter
+from llm_tools.utils.retry import retry_call
+from llm_tools.utils.throttle import HostThrottle
+from llm_tools.utils.http_client import get_fetcher, FetchError
 
 TGB_GENERATOR_SYSTEM_PROMPT = """
 <!-- version: 0.1 -->
@@ -71,6 +81,13 @@ Alpaca数据处理专家和人工智能数据转换工程师
 
 logger = get_logger()
 
+# 各页面只解析用到的部分
+ARTICLE_ONLY = strainer('div', class_='article-text p_coten')
+HOT_LIST_ONLY = strainer('div', class_='Nbbs-tiezi-lists')
+
+HOST_THROTTLE = HostThrottle(CRAWL_HOST_CONCURRENCY, CRAWL_HOST_MIN_INTERVAL, CRAWL_HOST_MAX_INTERVAL)
+CSV_LOCK = threading.Lock()
+
 def get_tgb_hot_articles():
     tgb = Taoguba()
     return tgb.get_hot_articles()
@@ -83,39 +100,292 @@ def extract_xml(content: str, tag: str):
     dataset_content = content[start_index:end_index]
     return dataset_content
 
-def generate_tgb_dataset(csv_file: str, start=1):
+# 只匹配真正的标签和注释, 正文中的 "<3成"、">5成" 等文字保留
+TAG_PATTERN = re.compile(r"<!--.*?-->|</?[A-Za-z][^>]*>", re.DOTALL)
+USER_CLASS_PREFIX = "user_"
+
+def strip_tags(markup: str) -> str:
+    """去除 HTML 标签并还原实体, 用于 subject 属性中的回帖正文"""
+    return html.unescape(TAG_PATTERN.sub("", markup)).strip()
+
+def extract_comments(page_html: str, username: str, min_length: int = 50) -> list:
+    """从帖子页面中提取指定用户的回帖.
+
+    只遍历一遍文档: 先按用户 id 索引 comment-data 节点, 再逐条处理回帖, 回帖很多时也是线性时间.
+
+    ## Parameter:
+    page_html: 帖子页面
+    username: 只保留该用户的回帖
+    min_length: 正文长度不超过该值的回帖忽略
+    """
+    return comments_from_soup(parse_html(page_html), username, min_length)
+
+def comments_from_soup(soup, username: str, min_length: int = 50) -> list:
+    """同 extract_comments, 用于已经解析过的页面"""
+    comment_data = {}
+    for div in soup.find_all('div', class_='comment-data'):
+        for name in div.get('class', []):
+            if name.startswith(USER_CLASS_PREFIX):
+                # 与按用户查找第一个节点的行为一致
+                comment_data.setdefault(name[len(USER_CLASS_PREFIX):], div)
+
+    comments = []
+    for comment in soup.find_all('div', attrs={"subject": True, "username": True}):
+        user = comment['username'].strip()
+        if user != username:
+            continue
+        subject = strip_tags(comment['subject'])
+        if len(subject) <= min_length:
+            continue
+        user_comment_data = comment_data.get(comment.get('userid'))
+        comment_time = user_comment_data.find('span', class_='pcyclspan').text
+        logger.info(comment_time)
+        comments.append({
+            "subject": subject,
+            "username": user,
+            "comment_time": comment_time
+        })
+        logger.info(f"subject: {subject}")
+        logger.info(f"username: {user}")
+    return comments
+
+def load_checkpoint(filename: str) -> set:
+    """读取检查点文件中已完成的行号"""
+    try:
+        with open(filename, 'r', encoding='utf-8') as file:
+            return {int(line) for line in file if line.strip().isdigit()}
+    except FileNotFoundError:
+        return set()
+
+class DatasetWriter:
+    def __init__(self, output: str, checkpoint: str, ordered: bool = True):
+        """把生成结果追加到 jsonl 文件, 写出后在检查点文件中记录行号.
+
+        ## Parameter:
+        output: 输出的 jsonl 文件
+        checkpoint: 检查点文件, 每行一个已完成的行号
+        ordered: 为 True 时按行号顺序写出, 先完成的行在内存中等待前面的行
+        """
+        self.output = output
+        self.checkpoint = checkpoint
+        self.ordered = ordered
+        self._lock = threading.Lock()
+        self._expected = deque()
+        self._results = {}
+
+    def expect(self, index: int):
+        """按提交顺序登记行号, 有序输出时据此决定写出顺序"""
+        with self._lock:
+            self._expected.append(index)
+
+    def done(self, index: int, content):
+        """记录一行的结果. content 为 None 表示失败, 不写检查点, 下次运行时重试"""
+        with self._lock:
+            if not self.ordered:
+                self._write(index, content)
+                return
+            self._results[index] = content
+            while self._expected and self._expected[0] in self._results:
+                head = self._expected.popleft()
+                self._write(head, self._results.pop(head))
+
+    def _write(self, index: int, content):
+        if content is None:
+            return
+        if len(content) > 0:
+            append_to_file(self.output, content)
+        with open(self.checkpoint, 'a', encoding='utf-8') as file:
+            file.write(f"{index}\n")
+
+def generate_tgb_dataset(csv_file: str, start=1, workers: int = LLM_WORKERS, ordered: bool = True,
+                         requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+                         tokens_per_minute: float = LLM_TOKENS_PER_MINUTE, retries: int = LLM_RETRIES):
     """生成淘股吧数据集.
-    ## parameters
-    - filepath: 原始 csv 数据集路径
+
+    多个线程并发调用大模型, 按每分钟请求数和 token 数限速, 失败时指数退避重试. 已完成的行号记录在
+    检查点文件 (<csv>.checkpoint) 中, 中断后再次运行会跳过这些行. 重试后仍失败的行不记录, 下次运行时重新处理.
+
+    ## Parameter:
+    csv_file: 原始 csv 数据集路径
+    start: 从第几行开始处理 (第 0 行是 header)
+    workers: 同时进行的大模型请求数
+    ordered: 为 True 时输出按 csv 行顺序排列, 否则按完成顺序写出
+    requests_per_minute, tokens_per_minute: 限速, 0 表示不限制. token 数按提示词字符数估算
+    retries: 每行失败后的重试次数
     """
-    with open(csv_file, mode='r', encoding='utf-8') as file:
-        csv_reader = csv.reader(file)
-        index = 0
-        while index < start:
-            logger.info(f"跳过第【{index}】行")
-            next(csv_reader)  # 跳过 header 行
-            index += 1
-        for row in csv_reader:
-            logger.info("-" * 50)
-            logger.info(f"正在处理第【{index}】行")
-            resp = deepseek_chat(user_prompt=row[1], system_prompt=TGB_GENERATOR_SYSTEM_PROMPT)
-            logger.info(resp)
-            content = extract_xml(resp, "dataset")
-            if len(content) > 0:
-                append_to_file(f"{csv_file[:-4]}.jsonl", content)
-            index += 1
+    output = f"{csv_file[:-4]}.jsonl"
+    checkpoint = f"{csv_file[:-4]}.checkpoint"
+    completed = load_checkpoint(checkpoint)
+    if completed:
+        logger.info(f"检查点中已完成 {len(completed)} 行, 将跳过")
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    writer = DatasetWriter(output, checkpoint, ordered=ordered)
+
+    def process(index: int, prompt: str):
+        def call():
+            limiter.acquire(len(prompt) + len(TGB_GENERATOR_SYSTEM_PROMPT))
+            return deepseek_chat(user_prompt=prompt, system_prompt=TGB_GENERATOR_SYSTEM_PROMPT)
+        try:
+            resp = retry_call(call, retries=retries)
+        except Exception as e:
+            logger.error(f"第【{index}】行处理失败: {e}")
+            writer.done(index, None)
+            return
+        logger.info(f"第【{index}】行处理完成")
+        writer.done(index, extract_xml(resp or "", "dataset"))
+
+    # 限制已提交未完成的任务数, 避免一次把整个 csv 读进任务队列
+    in_flight = threading.Semaphore(workers * 2)
+    submitted = 0
+    with open(csv_file, mode='r', encoding='utf-8') as file, ThreadPoolExecutor(max_workers=workers) as executor:
+        for index, row in enumerate(csv.reader(file)):
+            if index < start or index in completed:
+                continue
+            in_flight.acquire()
+            writer.expect(index)
+            future = executor.submit(process, index, row[1])
+            future.add_done_callback(lambda _: in_flight.release())
+            submitted += 1
+    logger.info(f"数据集生成结束, 本次处理 {submitted} 行, 输出文件: {output}")
 
 def append_to_file(filename: str, content: str):
     with open(filename, 'a', encoding='utf-8') as outfile:
         outfile.write(content.lstrip())
 
+def parse_article(page_html: str) -> str:
+    """提取文章正文, 没有正文时返回空字符串"""
+    soup = parse_html(page_html, ARTICLE_ONLY)
+
+    # 查找包含正文内容的 <div> 标签
+    content_div = soup.find('div', class_='article-text p_coten')
+    if not content_div:
+        return ""
+
+    # 移除隐藏的内容（如 style="display:none;" 的部分）
+    for hidden in content_div.find_all(style="display:none;"):
+        hidden.decompose()  # 彻底移除标签
+
+    # 提取文本内容，并去除多余的空格和换行
+    return content_div.get_text(separator="\n", strip=True)
+
+def parse_hot_list(page_html: str) -> list:
+    """解析精华帖列表, 只保留最新一天的帖子"""
+    soup = parse_html(page_html, HOT_LIST_ONLY)
+    div_list = soup.findAll('div', class_='Nbbs-tiezi-lists')
+    article_list = []
+    max_date = None
+    for article in div_list:
+        info = article.find('a', class_='overhide mw300')
+        user = article.find('a', class_='mw100 overhide')
+        create_time = article.find('div', class_='left middle-list-post')
+        create_date = create_time.text.split(' ')[0]
+
+        if max_date == None or create_date >= max_date:
+            max_date = create_date
+
+        article_list.append(
+            {
+                'userName': user.text,
+                'subject': info.get('title'),
+                'url': f"{TGB_BASEURL}{info.get('href')}",
+                'date': create_date
+            }
+        )
+    return [x for x in article_list if x['date'] == max_date]
+
+def parse_recommend(text: str) -> list:
+    """解析推荐帖子接口的响应"""
+    resp = json.loads(text)
+    return [
+        {
+            'userName': x['userName'],
+            'subject': x['subject'],
+            'url': f"{TGB_BASEURL}a/{x['newTopicID']}?sy_jrtj"
+        } for x in resp['dto']['list']
+    ]
+
+NEXT_PAGE_TEXT = re.compile(r"下一页")
+
+def next_page_url(soup, current_url: str):
+    """返回列表页中"下一页"链接的地址, 没有时返回 None"""
+    link = soup.find('a', string=NEXT_PAGE_TEXT)
+    href = link.get('href') if link else None
+    if not href or href.startswith('javascript'):
+        return None
+    return urljoin(current_url, href)
+
+def crawl_in_contexts(items: list, handle, storage_state: dict, concurrency: int) -> dict:
+    """在多个浏览器上下文中并发处理 items, 返回 {下标: 结果}. 处理失败的下标不在结果中.
+
+    每个工作线程用 storage_state 新建一个共享登录状态的上下文, 从队列中依次取任务. 任务运行在浏览器池的
+    工作线程中, handle 内部不能再调用本函数, 否则线程池占满时会死锁.
+
+    ## Parameter:
+    items: 待处理的任务
+    handle: handle(tgb, item) 在工作线程中处理一个任务, tgb 是该线程的 Taoguba 实例
+    storage_state: 登录状态, 来自 context.storage_state()
+    concurrency: 浏览器上下文数
+    """
+    tasks = queue.Queue()
+    for i, item in enumerate(items):
+        tasks.put((i, item))
+    results = {}
+
+    def worker():
+        tgb = Taoguba(storage_state=storage_state)
+        try:
+            while True:
+                try:
+                    i, item = tasks.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    results[i] = handle(tgb, item)
+                except Exception as e:
+                    logger.error(f"处理失败: {item}, 错误: {e}")
+        finally:
+            tgb.close()
+
+    executor = get_browser_pool().executor()
+    futures = [executor.submit(worker) for _ in range(max(1, min(concurrency, len(items))))]
+    for future in futures:
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"浏览器工作线程异常: {e}")
+    return results
+
 class Taoguba:
-    def __init__(self):
-        """初始化 Playwright 和浏览器实例"""
-        self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(headless=True, args=["--disable-blink-features=AutomationControlled"])  # 设置为 False 以便调试
-        self.context = self.browser.new_context()
-        self.page = self.context.new_page()
+    def __init__(self, storage_state: dict = None):
+        """浏览器上下文在第一次使用时才从浏览器池租用, 只走 HTTP 的方法不启动浏览器
+
+        ## Parameter:
+        storage_state: 其他上下文导出的登录状态. 指定时使用带该状态的独立上下文
+        """
+        self.lease = None
+        self.storage_state = storage_state
+
+    def _lease(self):
+        if self.lease is None:
+            if self.storage_state is None:
+                self.lease = get_browser_pool().acquire('taoguba')
+            else:
+                self.lease = get_browser_pool().acquire('taoguba', storage_state=self.storage_state)
+        return self.lease
+
+    @property
+    def context(self):
+        return self._lease().context
+
+    @property
+    def page(self):
+        return self._lease().page
+
+    def goto(self, url: str) -> str:
+        """打开页面并返回页面内容"""
+        with HOST_THROTTLE.slot(url):
+            self.page.goto(url)
+            return self.page.content()
 
     def login(self):
         """
@@ -147,36 +417,83 @@ class Taoguba:
         else:
             logger.info("登录失败，请检查用户名和密码")
 
-    def crawl_blog(self, url: str):
+    def crawl_blog(self, url: str, concurrency: int = TGB_BLOG_WORKERS, max_pages: int = None):
         """爬取用户的全部博客和回帖信息
 
         ## Arguments:
         - url: 个人博客入口链接. 比如: https://www.tgb.cn/user/blog/moreTopic?userID=1116585
+        - concurrency: 并发爬取帖子的浏览器上下文数, 为 1 时在当前页面中顺序爬取
+        - max_pages: 最多读取的帖子列表页数, 默认读取全部
         """
-        # 第一步: 从入口获取所有帖子链接
-        self.page.goto(url)
-        soup = BeautifulSoup(self.page.content(), "html.parser")
-        form_tag = soup.find('form', {'name': 'main'})
-        links = form_tag.findAll('a', {'target': '_blank'})
-        blogs = [
-            {
-                'url': f"{TGB_BASEURL}{x['href']}",
-                'title': x['title']
-            } for x in links
-        ]
-
-        # 第二步: 顺序访问每个帖子，获取作者发言和回帖
-        results = []
-        for blog in blogs:
-            logger.info("-" * 50)
-            logger.info(f"【标题】{blog['title']}")
-            results.append(self.crawl_article(blog['url']))
+        # 第一步: 从入口开始翻页, 获取所有帖子链接
+        blogs = self.list_blogs(url, max_pages)
+        logger.info(f"共 {len(blogs)} 篇帖子")
+
+        # 第二步: 多个上下文并发访问帖子，获取作者发言和回帖. 帖子内的评论页不再并发, 避免嵌套提交任务
+        def crawl(tgb, blog):
+            start = time.perf_counter()
+            article = tgb.crawl_article(blog['url'], concurrency=1)
+            article['elapsed'] = round(time.perf_counter() - start, 2)
+            logger.info(f"【标题】{blog['title']} 用时 {article['elapsed']} 秒, 回帖 {len(article['comments'])} 条")
+            return article
+
+        start = time.perf_counter()
+        done = self.map_items(blogs, crawl, concurrency)
+        results = [done[i] for i in range(len(blogs)) if i in done]
+        failed = [blogs[i]['url'] for i in range(len(blogs)) if i not in done]
+        if failed:
+            logger.error(f"{len(failed)} 篇帖子爬取失败: {failed}")
+        logger.info(f"博客爬取完成, {len(results)} 篇帖子, 用时 {time.perf_counter() - start:.1f} 秒")
+        return results
+
+    def list_blogs(self, url: str, max_pages: int = None) -> list:
+        """沿着"下一页"链接读取帖子列表, 返回 [{'url', 'title'}]"""
+        blogs = []
+        seen = set()
+        visited = set()
+        page_url = url
+        while page_url and page_url not in visited and (max_pages is None or len(visited) < max_pages):
+            visited.add(page_url)
+            soup = parse_html(self.goto(page_url))
+            form_tag = soup.find('form', {'name': 'main'})
+            links = form_tag.findAll('a', {'target': '_blank'}) if form_tag else []
+            count = len(blogs)
+            for x in links:
+                blog_url = f"{TGB_BASEURL}{x['href']}"
+                if blog_url not in seen:
+                    seen.add(blog_url)
+                    blogs.append({'url': blog_url, 'title': x.get('title')})
+            logger.info(f"帖子列表第 {len(visited)} 页: {len(blogs) - count} 篇新帖子")
+            if len(blogs) == count:
+                break
+            page_url = next_page_url(soup, page_url)
+        return blogs
+
+    def map_items(self, items: list, handle, concurrency: int) -> dict:
+        """concurrency 大于 1 时分给多个共享登录状态的上下文并发处理, 否则在当前页面中顺序处理.
+
+        返回 {下标: 结果}, 处理失败的下标不在结果中. 见 crawl_in_contexts.
+        """
+        if concurrency > 1 and len(items) > 1:
+            return crawl_in_contexts(items, handle, self.context.storage_state(), concurrency)
+        results = {}
+        for i, item in enumerate(items):
+            try:
+                results[i] = handle(self, item)
+            except Exception as e:
+                logger.error(f"处理失败: {item}, 错误: {e}")
         return results
 
-    def crawl_article(self, url: str):
+    def crawl_article(self, url: str, concurrency: int = TGB_PAGE_WORKERS):
+        """爬取帖子正文和作者的回帖
+
+        ## Arguments:
+        - url: 帖子链接
+        - concurrency: 并发读取评论页的浏览器上下文数, 为 1 时在当前页面中顺序读取
+        """
         article = {}
-        self.page.goto(url)
-        soup = BeautifulSoup(self.page.content(), "html.parser")
+        page_html = self.goto(url)
+        soup = parse_html(page_html)
 
         # 读取标题
         title_div = soup.find(id='gioMsg')
@@ -193,7 +510,7 @@ class Taoguba:
         if match:
             page_number = match.group(1)  # 提取捕获组中的内容
             total_page = int(page_number)
-            logger.info("总页数：", total_page)
+            logger.info(f"总页数：{total_page}")
         else:
             logger.info("未找到匹配的页数")
 
@@ -201,159 +518,74 @@ class Taoguba:
         content_div = soup.find(id='first')
         article['content'] =content_div.text
 
-        # 读取评论
-        comments = self.read_comments(username)
-        
-        page_count = 2
-        while page_count <= total_page:
-            try:
-                self.page.goto(f"{url}-{str(page_count)}")
-                comments_of_page = self.read_comments(username)
-                comments.extend(comments_of_page)
-            except Exception as e:
-                logger.error(f"异常: {e}")
-            page_count += 1
+        # 读取评论, 第 2 页起的评论页并发读取, 按页码顺序合并
+        comments = comments_from_soup(soup, username)
+        page_urls = [f"{url}-{page_count}" for page_count in range(2, total_page + 1)]
+        pages = self.map_items(page_urls, lambda tgb, page_url: tgb.read_comment_page(page_url, username), concurrency)
+        for i in range(len(page_urls)):
+            comments.extend(pages.get(i, []))
+        failed = [page_urls[i] for i in range(len(page_urls)) if i not in pages]
+        if failed:
+            logger.error(f"{len(failed)} 个评论页读取失败: {failed}")
         article['comments'] = comments
+        article['failed_pages'] = failed
         self.save_comments_to_csv(comments, 'a')
         return article
 
+    def read_comment_page(self, url: str, username: str, retries: int = TGB_PAGE_RETRIES) -> list:
+        """读取一页评论, 失败时重试"""
+        return retry_call(lambda: extract_comments(self.goto(url), username), retries=retries)
+
     def read_comments(self, username: str):
-        comments = []
-        soup = BeautifulSoup(self.page.content(), "html.parser")
-        for comment in soup.find_all('div', attrs={"subject": True, "username": True}):
-            subject_attr = BeautifulSoup(comment['subject'], 'html.parser')
-            # 提取正文内容（去除所有 HTML 标签）
-            subject = subject_attr.get_text(separator='').strip()
-            # subject = comment['subject']
-            user = comment['username'].strip()
-            
-            # logger.info(f"【{user}】{subject}")
-            if user.strip() == username and len(subject) > 50:
-                userid = comment['userid']
-                user_comment_data = soup.find('div', class_=f"comment-data user_{userid}")
-                comment_time = user_comment_data.find('span', class_='pcyclspan').text
-                logger.info(comment_time)
-                comments.append({
-                    "subject": subject,
-                    "username": user,
-                    "comment_time": comment_time
-                })
-                logger.info(f"subject: {subject}")
-                logger.info(f"username: {user}")
-        return comments
+        return extract_comments(self.page.content(), username)
+
+    def close(self):
+        """把浏览器上下文归还给浏览器池"""
+        if getattr(self, 'lease', None) is not None:
+            get_browser_pool().release(self.lease)
+            self.lease = None
 
     def __del__(self):
-        """在类实例销毁时，关闭浏览器和 Playwright"""
-        logger.info("正在关闭浏览器...")
-        if self.browser:
-            self.browser.close()
-        if self.playwright:
-            self.playwright.stop()
+        """在类实例销毁时，归还浏览器上下文"""
+        self.close()
 
     def read_article(self, url: str):
-        try:
-            # 发送HTTP请求获取网页内容
-            response = requests.get(url, timeout=10)
-            response.encoding = 'utf-8'  # 设置编码
-
-            # 解析网页内容
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # 查找包含正文内容的 <div> 标签
-            content_div = soup.find('div', class_='article-text p_coten')
-
-            # 提取正文内容
-            if content_div:
-                # 移除隐藏的内容（如 style="display:none;" 的部分）
-                for hidden in content_div.find_all(style="display:none;"):
-                    hidden.decompose()  # 彻底移除标签
-
-                # 提取文本内容，并去除多余的空格和换行
-                content = content_div.get_text(separator="\n", strip=True)
-                return content
-            else:
-                logger.info(f"未找到正文内容: {url}")
-                return ""
-        except Exception as e:
-            logger.info(f"读取文章失败: {url}, 错误: {e}")
+        content = get_fetcher().run([url], parse=parse_article)[0]
+        if not content:
+            logger.info(f"未找到正文内容: {url}")
             return ""
+        return content
+
+    def get_hot_list(self):
+        """获取精华热帖列表, 不含正文. 列表页读取失败时抛出 FetchError"""
+        # 目标URL
+        url = f"{TGB_BASEURL}jinghua/1-1"
+        article_list = get_fetcher().run([url], parse=parse_hot_list)[0]
+        if article_list is None:
+            raise FetchError(f"读取热帖列表失败: {url}")
+        return article_list
 
     def get_hot_articles(self):
         """获取精华热帖"""
-        # 目标URL
-        url = 'https://www.tgb.cn/jinghua/1-1'
-
-        # 发送GET请求
-        response = requests.get(url, timeout=10)
-        response.encoding = 'utf-8'
-
-         # 解析网页内容
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # 查找包含正文内容的 <div> 标签
-        div_list = soup.findAll('div', class_='Nbbs-tiezi-lists')
-        article_list = []
-        max_date = None
-        for article in div_list:
-            info = article.find('a', class_='overhide mw300')
-            user = article.find('a', class_='mw100 overhide')
-            create_time = article.find('div', class_='left middle-list-post')
-            create_date = create_time.text.split(' ')[0]
-
-            if max_date == None or create_date >= max_date:
-                max_date = create_date
-
-            article_list.append(
-                {
-                    'userName': user.text,
-                    'subject': info.get('title'),
-                    'url': f"https://www.tgb.cn/{info.get('href')}",
-                    'date': create_date
-                }
-            )
-        article_list = [x for x in article_list if x['date'] == max_date]
-        return self.get_articles(article_list)
+        return self.get_articles(self.get_hot_list())
         
     def get_recommend_articles(self):
-        """获取推荐帖子"""
+        """获取推荐帖子. 推荐列表读取失败时抛出 FetchError"""
         # 目标URL
-        url = 'https://www.tgb.cn/newIndex/getNowRecommend?pageNo=1'
-
-        # 发送GET请求
-        response = requests.get(url)
-
-        # 检查请求是否成功
-        if response.status_code == 200:
-            # 打印获取到的内容
-            resp = json.loads(response.text)
-            articles = [
-                {
-                    'userName': x['userName'],
-                    'subject': x['subject'],
-                    'url': f"https://www.tgb.cn/a/{x['newTopicID']}?sy_jrtj"
-                } for x in resp['dto']['list']
-            ]
-            return self.get_articles(articles)
-        else:
-            logger.info(f"请求失败，状态码: {response.status_code}")
-            return []
+        url = f"{TGB_BASEURL}newIndex/getNowRecommend?pageNo=1"
+        articles = get_fetcher().run([url], parse=parse_recommend)[0]
+        if articles is None:
+            raise FetchError(f"读取推荐帖子失败: {url}")
+        return self.get_articles(articles)
 
     def get_articles(self, articles):
+        """并发读取文章正文. 并发数和同一主机的连接数见 HTTP_CONCURRENCY / HTTP_HOST_CONCURRENCY"""
         if not articles:
             return []
 
-        # 使用 ThreadPoolExecutor 并行化读取文章内容
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_article = {executor.submit(self.read_article, a['url']): a for a in articles}
-
-            for future in as_completed(future_to_article):
-                article = future_to_article[future]
-                try:
-                    article['content'] = future.result()
-                except Exception as e:
-                    logger.info(f"处理文章时出错: {article['url']}, 错误: {e}")
-                    article['content'] = ""
-
+        contents = get_fetcher().run([a['url'] for a in articles], parse=parse_article)
+        for article, content in zip(articles, contents):
+            article['content'] = content or ""
         return articles
 
     def random_wait(self):
@@ -369,15 +601,17 @@ class Taoguba:
             return
         csv_list = [['author', 'comments', 'comment_time']]
         filename = f"tgb_comments_{comments[0]['username']}.csv"
-        with open(filename, 'r', encoding='utf-8') as infile:
-            if len(infile.readline()) > 0 and 'a' in mode:
-                csv_list = []
-                logger.info("CSV 文件为追加模式, 不添加表头.")
-        for item in comments:
-            csv_list.append([item['username'], item['subject'], item['comment_time']])
-        with open(filename, mode, encoding='utf-8', newline="") as outfile:
-                writer = csv.writer(outfile)
-                writer.writerows(csv_list)
+        # 多个上下文并发爬取时, 判断表头和追加写入要一起完成
+        with CSV_LOCK:
+            with open(filename, 'r', encoding='utf-8') as infile:
+                if len(infile.readline()) > 0 and 'a' in mode:
+                    csv_list = []
+                    logger.info("CSV 文件为追加模式, 不添加表头.")
+            for item in comments:
+                csv_list.append([item['username'], item['subject'], item['comment_time']])
+            with open(filename, mode, encoding='utf-8', newline="") as outfile:
+                    writer = csv.writer(outfile)
+                    writer.writerows(csv_list)
 
 
 ARTICLE_TEMPLATE = """
@@ -0,0 +1,56 @@
+"""
+HTTP 响应压缩. 根据 Accept-Encoding 选择 br 或 gzip, 安装了 brotli 时优先使用 br.
+"""
+
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def supported_encodings() -> list:
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate(accept_encoding: str) -> str:
+    """从 Accept-Encoding 中选出服务端支持且客户端接受的编码, 没有时返回 None."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in supported_encodings():
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    raise ValueError(f"不支持的编码: {encoding}")
+
+
+def compressor(encoding: str):
+    """流式压缩, 返回 (compress(块) -> bytes, flush() -> bytes)."""
+    if encoding == "br":
+        state = brotli.Compressor(quality=5)
+        return state.process, state.finish
+    if encoding == "gzip":
+        state = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return state.compress, state.flush
+    raise ValueError(f"不支持的编码: {encoding}")
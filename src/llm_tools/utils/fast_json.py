@@ -0,0 +1,23 @@
+"""
+JSON 编解码. 安装了 orjson 时使用 orjson, 否则退回标准库 json.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj) -> bytes:
+    """序列化为 UTF-8 编码的紧凑 JSON, 中文不转义."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
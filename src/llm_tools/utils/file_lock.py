@@ -0,0 +1,45 @@
+import os
+
+try:
+    import fcntl
+except ImportError:  # 非 posix 系统
+    fcntl = None
+
+
+class FileLock:
+    """跨进程的非阻塞文件锁 (flock), 进程退出时由系统自动释放.
+
+    锁文件使用后保留, 不删除: 删除后其他进程可能锁住新建的同名文件, 两把锁同时持有.
+    非 posix 系统上不加锁, acquire 总是成功.
+    """
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._fd = None
+
+    @property
+    def locked(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """尝试加锁, 已被其他进程或其他 FileLock 持有时立即返回 False"""
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+        fd = os.open(self.filename, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        if self._fd >= 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
@@ -0,0 +1,58 @@
+"""
+HTML 解析.
+
+parse_html 统一创建 BeautifulSoup. 安装了 lxml 时使用 C 实现的 lxml 解析器, 否则使用标准库的
+html.parser. 传入 parse_only 时只为匹配的标签及其子孙建树, 页面其余部分在解析时直接丢弃.
+
+设置 HTML_PARSER=html.parser 和 HTML_PARTIAL_PARSE=false 可以退回到完整解析整个页面的行为.
+"""
+
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+from llm_tools.config import HTML_PARSER, HTML_PARTIAL_PARSE
+from llm_tools.metrics import histogram
+
+PARSE_SECONDS = histogram("html_parse_seconds", "HTML 解析耗时 (秒)", ["parser", "partial"])
+
+
+def resolve_features(name: str = HTML_PARSER) -> str:
+    """把 auto 解析为实际可用的解析器"""
+    if name != "auto":
+        return name
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+FEATURES = resolve_features()
+
+
+def strainer(name=None, attrs: dict = None, class_=None) -> SoupStrainer:
+    """创建只保留目标标签的 SoupStrainer, 参数与 soup.find 相同.
+
+    与 soup.find 一样, class_ 可以是其中一个 class, 也可以是完整的 class 字符串 (例如 'article-text p_coten').
+    name 和 class_ 都可以是列表, 表示匹配其中任意一个.
+    """
+    attrs = dict(attrs or {})
+    if class_ is not None:
+        # 解析时拿到的 class 是未拆分的原始字符串, 用正则按空白分隔的边界匹配
+        values = [class_] if isinstance(class_, str) else class_
+        attrs['class'] = re.compile("|".join(rf"(?:^|\s){re.escape(v)}(?:\s|$)" for v in values))
+    return SoupStrainer(name, attrs=attrs)
+
+
+def parse_html(html: str, parse_only: SoupStrainer = None, features: str = None) -> BeautifulSoup:
+    """解析 HTML.
+
+    ## Parameter:
+    html: 页面内容
+    parse_only: 只解析匹配的标签, 为 None 或关闭了 HTML_PARTIAL_PARSE 时解析整个页面
+    features: 解析器, 默认使用 HTML_PARSER 配置
+    """
+    if not HTML_PARTIAL_PARSE:
+        parse_only = None
+    features = features or FEATURES
+    with PARSE_SECONDS.time(parser=features, partial=parse_only is not None):
+        return BeautifulSoup(html, features, parse_only=parse_only)
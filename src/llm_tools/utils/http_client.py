@@ -0,0 +1,209 @@
+"""
+异步 HTTP 抓取.
+
+一次抓取共用一个 httpx.AsyncClient, 按主机复用长连接. 总并发和同一主机的并发分别用信号量限制.
+
+响应正文按 URL 保存在本地 SQLite 文件中, 同时保存响应的 ETag / Last-Modified; 解析结果按
+(URL, 解析函数) 另外保存. 再次抓取时带上 If-None-Match / If-Modified-Since, 服务器返回 304 时直接使用
+该解析函数上次的结果, 不再下载和解析页面. 同一 URL 的不同解析函数互不影响; 某个解析函数第一次遇到
+304 时解析缓存的正文. 正文更新时删除该 URL 的全部解析结果.
+
+    fetcher = get_fetcher()
+    contents = fetcher.run(urls, parse=parse_article)
+"""
+
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from urllib.parse import urlsplit
+import httpx
+from llm_tools.config import HTTP_CONCURRENCY, HTTP_HOST_CONCURRENCY, HTTP_TIMEOUT, HTTP_CACHE_FILE
+from llm_tools.logger import get_logger
+from llm_tools.metrics import counter, histogram
+
+logger = get_logger()
+
+FETCH_SECONDS = histogram("http_fetch_seconds", "HTTP 抓取耗时 (秒)", ["host"])
+FETCHES = counter("http_fetch_total", "HTTP 抓取次数", ["host", "status"])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body TEXT,
+    updated REAL
+);
+
+CREATE TABLE IF NOT EXISTS http_parsed (
+    url TEXT,
+    parser TEXT,
+    value TEXT,
+    PRIMARY KEY (url, parser)
+);
+"""
+
+
+class FetchError(Exception):
+    """页面抓取失败. fetch_all 对失败的 URL 返回 None, 调用方需要区分失败和空结果时抛出"""
+
+
+class RevalidationCache:
+    def __init__(self, filename: str = HTTP_CACHE_FILE):
+        """按 URL 保存校验头和响应正文, 按 (URL, 解析函数) 保存解析结果"""
+        self.filename = filename
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(filename, timeout=30, check_same_thread=False)
+        with self._lock, self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def get(self, url: str):
+        """返回 (etag, last_modified, body), 没有时返回 None"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT etag, last_modified, body FROM http_responses WHERE url = ?", (url,)
+            ).fetchone()
+        return tuple(row) if row is not None else None
+
+    def put(self, url: str, etag: str, last_modified: str, body: str):
+        """保存新的正文, 同时删除该 URL 基于旧正文的解析结果"""
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO http_responses (url, etag, last_modified, body, updated) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, time.time())
+            )
+            self.connection.execute("DELETE FROM http_parsed WHERE url = ?", (url,))
+
+    def get_parsed(self, url: str, parser: str):
+        """返回 (解析结果,), 没有时返回 None. 结果本身可能是 None, 所以包在元组中"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT value FROM http_parsed WHERE url = ? AND parser = ?", (url, parser)
+            ).fetchone()
+        return (json.loads(row[0]),) if row is not None else None
+
+    def put_parsed(self, url: str, parser: str, value):
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO http_parsed (url, parser, value) VALUES (?, ?, ?)",
+                (url, parser, json.dumps(value, ensure_ascii=False))
+            )
+
+
+def parser_name(parse) -> str:
+    return f"{parse.__module__}.{parse.__qualname__}"
+
+
+class AsyncFetcher:
+    def __init__(self, concurrency: int = HTTP_CONCURRENCY, host_concurrency: int = HTTP_HOST_CONCURRENCY,
+                 timeout: float = HTTP_TIMEOUT, cache: RevalidationCache = None, transport=None):
+        """
+        ## Parameter:
+        concurrency: 同时进行的请求数
+        host_concurrency: 同一主机同时进行的请求数
+        timeout: 单个请求的超时秒数
+        cache: 条件请求缓存, 为 None 时不发送条件请求
+        transport: 自定义的 httpx 传输层
+        """
+        self.concurrency = concurrency
+        self.host_concurrency = host_concurrency
+        self.timeout = timeout
+        self.cache = cache
+        self.transport = transport
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "not_modified": 0, "errors": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        return httpx.AsyncClient(timeout=self.timeout, limits=limits, transport=self.transport, follow_redirects=True)
+
+    async def fetch(self, client: httpx.AsyncClient, url: str, parse=None):
+        """请求 url, 返回 parse(响应文本) 的结果. parse 为 None 时返回响应文本.
+
+        页面未修改时返回该解析函数缓存的结果, 没有时解析缓存的正文.
+        """
+        cached = self.cache.get(url) if self.cache is not None else None
+        headers = {}
+        if cached is not None:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        host = urlsplit(url).netloc
+        with FETCH_SECONDS.time(host=host):
+            response = await client.get(url, headers=headers)
+        FETCHES.inc(host=host, status=response.status_code)
+        self._count("requests")
+        cacheable = False
+        if response.status_code == 304 and cached is not None:
+            self._count("not_modified")
+            text = cached[2]
+            if parse is None:
+                return text
+            parsed = self.cache.get_parsed(url, parser_name(parse))
+            if parsed is not None:
+                return parsed[0]
+            cacheable = True
+        else:
+            response.raise_for_status()
+            text = response.content.decode('utf-8', errors='replace')
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if self.cache is not None and (etag or last_modified):
+                self.cache.put(url, etag, last_modified, text)
+                cacheable = True
+        if parse is None:
+            return text
+        value = parse(text)
+        if cacheable:
+            self.cache.put_parsed(url, parser_name(parse), value)
+        return value
+
+    async def fetch_all(self, urls: list, parse=None) -> list:
+        """并发抓取 urls, 按顺序返回结果. 失败的 URL 对应 None"""
+        total = asyncio.Semaphore(self.concurrency)
+        hosts = {}
+
+        async def fetch_one(client, url):
+            host = urlsplit(url).netloc
+            if host not in hosts:
+                hosts[host] = asyncio.Semaphore(self.host_concurrency)
+            async with total, hosts[host]:
+                try:
+                    return await self.fetch(client, url, parse)
+                except Exception as e:
+                    self._count("errors")
+                    logger.info(f"抓取失败: {url}, 错误: {e}")
+                    return None
+
+        async with self.client() as client:
+            return await asyncio.gather(*(fetch_one(client, url) for url in urls))
+
+    def run(self, urls: list, parse=None) -> list:
+        """同步调用 fetch_all, 供爬虫代码使用. 不能在运行中的事件循环里调用"""
+        if not urls:
+            return []
+        return asyncio.run(self.fetch_all(urls, parse))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+def get_fetcher() -> AsyncFetcher:
+    """获取进程内共享的抓取器, 使用默认的条件请求缓存"""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = AsyncFetcher(cache=RevalidationCache())
+        return _fetcher
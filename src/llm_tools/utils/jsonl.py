@@ -0,0 +1,159 @@
+"""
+JSON Lines 数据文件, 每行一条记录.
+
+写入时先追加到 <文件名>.partial, 每 fsync_every 条 fsync 一次, 全部写完后 fsync 并重命名为
+正式文件: 读取方要么看到上一次完整的文件, 要么看到本次完整的文件, 不会读到写了一半的文件.
+运行中断时 .partial 中已经写入的记录保留, 下次以 resume 方式打开时截掉最后一行不完整的
+记录后接着追加.
+
+旧版本保存的整文件 JSON 数组 (.json) 仍可通过 data_file / iter_records 读取.
+"""
+
+import os
+import json
+from llm_tools.config import JSONL_FSYNC_EVERY
+from llm_tools.logger import get_logger
+from llm_tools.utils import fast_json
+
+logger = get_logger()
+
+PARTIAL_SUFFIX = '.partial'
+
+
+def fsync_dir(directory: str):
+    """fsync 目录, 保证重命名在断电后仍然生效. 只在 posix 系统上有效"""
+    if os.name != 'posix':
+        return
+    fd = os.open(directory or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def truncate_torn_tail(filename: str) -> int:
+    """截掉文件末尾不完整或无法解析的记录, 返回保留的记录数"""
+    count = 0
+    valid_end = 0
+    with open(filename, 'rb') as infile:
+        for line in infile:
+            if not line.endswith(b'\n'):
+                break
+            if line.strip():
+                try:
+                    fast_json.loads(line)
+                except ValueError:
+                    break
+                count += 1
+            valid_end += len(line)
+    if valid_end < os.path.getsize(filename):
+        logger.warning(f"{filename} 末尾有不完整的记录, 已截断")
+        with open(filename, 'r+b') as outfile:
+            outfile.truncate(valid_end)
+    return count
+
+
+class JsonlWriter:
+    def __init__(self, filename: str, fsync_every: int = JSONL_FSYNC_EVERY, resume: bool = False):
+        """
+        ## Parameter:
+        filename: 正式文件路径, 写入期间的数据在 filename + '.partial' 中
+        fsync_every: 每写入多少条记录 fsync 一次
+        resume: 为 True 时保留已有的 .partial 文件 (上次运行中断时留下) 并接着追加
+        """
+        self.filename = filename
+        self.partial = filename + PARTIAL_SUFFIX
+        self.fsync_every = max(1, fsync_every)
+        self.count = 0
+        self.recovered = 0
+        self._unsynced = 0
+        if resume and os.path.exists(self.partial):
+            self.recovered = self.count = truncate_torn_tail(self.partial)
+            if self.recovered:
+                logger.info(f"恢复 {self.partial} 中的 {self.recovered} 条记录")
+            self._file = open(self.partial, 'ab')
+        else:
+            self._file = open(self.partial, 'wb')
+
+    def write(self, record):
+        self._file.write(fast_json.dumps(record) + b'\n')
+        self.count += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def commit(self) -> int:
+        """fsync 后把 .partial 文件重命名为正式文件, 返回记录数"""
+        self.sync()
+        self._file.close()
+        os.replace(self.partial, self.filename)
+        fsync_dir(os.path.dirname(self.filename))
+        return self.count
+
+    def close(self):
+        """关闭文件但不发布, .partial 文件保留供下次恢复"""
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.close()
+
+
+def iter_lines(infile):
+    """逐行读取已打开的 JSON Lines 文件 (二进制模式), 返回每条记录的原始字节 (不含换行), 不解析.
+
+    最后一行没有换行符时说明写入中断, 该行被忽略.
+    """
+    for line in infile:
+        if not line.endswith(b'\n'):
+            logger.warning(f"{infile.name} 末尾有不完整的记录, 已忽略")
+            break
+        line = line.strip()
+        if line:
+            yield line
+
+
+def read_lines(filename: str):
+    """逐行读取 JSON Lines 文件, 见 iter_lines"""
+    with open(filename, 'rb') as infile:
+        yield from iter_lines(infile)
+
+
+def read_jsonl(filename: str):
+    """逐条读取 JSON Lines 文件中的记录"""
+    for line in read_lines(filename):
+        yield fast_json.loads(line)
+
+
+def legacy_filename(filename: str) -> str:
+    """旧版本的整文件 JSON 文件名: xxx.jsonl -> xxx.json"""
+    return filename[:-1] if filename.endswith('.jsonl') else filename
+
+
+def data_file(filename: str) -> str:
+    """返回实际存在的数据文件: 优先 JSON Lines 文件, 其次旧版本的 JSON 文件, 都不存在时返回 None"""
+    for name in (filename, legacy_filename(filename)):
+        if os.path.exists(name):
+            return name
+    return None
+
+
+def iter_records(filename: str):
+    """逐条读取数据文件中的记录, 兼容旧版本的 JSON 数组文件 (需要整个读入内存)"""
+    if filename.endswith('.jsonl'):
+        yield from read_jsonl(filename)
+        return
+    with open(filename, 'r', encoding='utf-8') as infile:
+        yield from json.load(infile)
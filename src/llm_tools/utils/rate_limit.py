@@ -0,0 +1,43 @@
+import time
+import threading
+
+
+class TokenBucket:
+    """令牌桶. 容量为每分钟的配额, 按配额匀速补充."""
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """按请求数和 token 数限速, 多线程共享. 配额为 0 表示不限制."""
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self._lock = threading.Lock()
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+    def acquire(self, tokens: float = 0):
+        """阻塞直到有一个请求配额和 tokens 个 token 配额."""
+        buckets = [(b, n) for b, n in ((self.requests, 1), (self.tokens, tokens)) if b is not None]
+        # 单次需求超过桶容量时按容量计算, 否则永远等不到
+        buckets = [(b, min(n, b.capacity)) for b, n in buckets]
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                for bucket, _ in buckets:
+                    bucket.refill(now)
+                wait = max([bucket.wait_time(n) for bucket, n in buckets], default=0.0)
+                if wait <= 0:
+                    for bucket, n in buckets:
+                        bucket.tokens -= n
+                    return
+            time.sleep(wait)
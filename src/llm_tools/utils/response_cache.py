@@ -0,0 +1,113 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from llm_tools.utils.compression import compress
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, etag: str, mtime_ns: int, size: int):
+        self.body = body
+        self.etag = etag
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.checked = time.monotonic()
+        self._encoded = {}
+
+    def has_encoding(self, encoding: str) -> bool:
+        """该编码的压缩结果是否已经缓存. 未缓存时 encoded 需要压缩, 调用方应放到线程中执行."""
+        return encoding is None or encoding in self._encoded
+
+    def encoded(self, encoding: str):
+        """返回 (压缩后的内容, 该表示的 ETag). 压缩结果随缓存项一起缓存."""
+        if encoding is None:
+            return self.body, self.etag
+        if encoding not in self._encoded:
+            self._encoded[encoding] = compress(self.body, encoding)
+        return self._encoded[encoding], f'{self.etag[:-1]}-{encoding}"'
+
+
+class FileResponseCache:
+    """以文件为数据源的响应缓存.
+
+    缓存预先序列化好的响应内容, 以 (mtime, size) 判断文件是否变化, 按 LRU 淘汰.
+    同一文件在 check_interval 秒内重复读取时不再检查文件状态.
+    """
+    def __init__(self, max_entries: int = 64, check_interval: float = 1.0):
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def peek(self, filename: str) -> CachedResponse:
+        """返回 check_interval 内检查过的缓存项, 不访问文件系统. 没有时返回 None."""
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is not None and time.monotonic() - entry.checked < self.check_interval:
+                self._entries.move_to_end(filename)
+                self.hits += 1
+                return entry
+        return None
+
+    def get(self, filename: str, build) -> CachedResponse:
+        """获取文件对应的响应, 文件不存在时返回 None.
+
+        ## Parameter:
+        filename: 数据文件路径
+        build: 缓存未命中时调用 build(filename) 生成响应内容 (bytes)
+        """
+        entry = self.peek(filename)
+        if entry is not None:
+            return entry
+
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            with self._lock:
+                self._entries.pop(filename, None)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                entry.checked = time.monotonic()
+                self._entries.move_to_end(filename)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        body = build(filename)
+        entry = CachedResponse(body, make_etag(body), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            self._entries[filename] = entry
+            self._entries.move_to_end(filename)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def make_etag(body: bytes) -> str:
+    """根据响应内容生成强 ETag."""
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """判断 If-None-Match 请求头是否与 ETag 匹配. 按 RFC 9110 使用弱比较."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
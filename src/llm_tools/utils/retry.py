@@ -0,0 +1,20 @@
+import time
+import random
+from llm_tools.logger import get_logger
+
+logger = get_logger()
+
+
+def retry_call(fn, retries: int = 3, base_delay: float = 1.0, max_delay: float = 30.0, exceptions=(Exception,)):
+    """调用 fn(), 失败时按指数退避加随机抖动重试, 重试 retries 次后抛出最后一次的异常."""
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except exceptions as e:
+            if attempt >= retries:
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+            attempt += 1
+            logger.warning(f"调用失败, {delay:.1f} 秒后第 {attempt} 次重试: {e}")
+            time.sleep(delay)
@@ -0,0 +1,44 @@
+import os
+import json
+
+
+class SeenIndex:
+    """持久化的已见 URL 索引.
+
+    - urls: 已经处理过的 URL
+    - pending: 见过但处理失败、需要在下次运行时重试的 URL
+    """
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.urls = set()
+        self.pending = set()
+        if os.path.exists(filename):
+            with open(filename, 'r', encoding='utf-8') as infile:
+                data = json.load(infile)
+            self.urls = set(data.get('urls', []))
+            self.pending = set(data.get('pending', []))
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.urls
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def add(self, url: str):
+        self.urls.add(url)
+        self.pending.discard(url)
+
+    def add_pending(self, url: str):
+        if url not in self.urls:
+            self.pending.add(url)
+
+    def clear(self):
+        self.urls = set()
+        self.pending = set()
+
+    def save(self):
+        """先写临时文件再替换, 避免中途失败留下不完整的索引."""
+        tmp_filename = f"{self.filename}.tmp"
+        with open(tmp_filename, 'w', encoding='utf-8') as outfile:
+            json.dump({'urls': sorted(self.urls), 'pending': sorted(self.pending)}, outfile, ensure_ascii=False)
+        os.replace(tmp_filename, self.filename)
@@ -0,0 +1,53 @@
+import time
+import random
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from llm_tools.metrics import histogram
+
+NAVIGATION_SECONDS = histogram("crawl_navigation_seconds", "页面访问耗时 (秒), 不含限速等待", ["host"])
+THROTTLE_WAIT_SECONDS = histogram("crawl_throttle_wait_seconds", "按主机限速的等待时间 (秒)", ["host"])
+
+
+class HostThrottle:
+    """按主机限速.
+
+    同一主机同时进行中的请求数不超过 max_concurrency, 且相邻两次请求的发起时间间隔
+    不小于 [min_interval, max_interval] 之间的一个随机值. 多个线程共享同一个实例时,
+    限速对所有线程整体生效.
+    """
+    def __init__(self, max_concurrency: int = 1, min_interval: float = 1.0, max_interval: float = 3.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_start = {}
+
+    def _semaphore(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.max_concurrency)
+            return self._semaphores[host]
+
+    def _reserve(self, host: str) -> float:
+        """预约下一次请求的发起时间, 返回需要等待的秒数."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + random.uniform(self.min_interval, self.max_interval)
+            return start - now
+
+    @contextmanager
+    def slot(self, url: str):
+        """占用 url 所属主机的一个请求名额, 在 with 块内完成页面访问."""
+        host = urlparse(url).netloc
+        semaphore = self._semaphore(host)
+        waited = time.perf_counter()
+        with semaphore:
+            wait_time = self._reserve(host)
+            if wait_time > 0:
+                time.sleep(wait_time)
+            THROTTLE_WAIT_SECONDS.observe(time.perf_counter() - waited, host=host)
+            with NAVIGATION_SECONDS.time(host=host):
+                yield
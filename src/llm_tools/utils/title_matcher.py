@@ -0,0 +1,71 @@
+"""
+项目名称匹配.
+
+对候选标题做归一化 (去掉空白和标点, 英文转小写) 后建立 n-gram 倒排索引. 查询时先用 n-gram
+取出候选, 再校验查询是否为候选标题的子串; 没有子串匹配时, 退化为 n-gram 重合度最高且不低于
+阈值的候选.
+"""
+
+import re
+
+NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_title(title: str) -> str:
+    return NON_WORD.sub("", title or "").lower()
+
+
+def ngrams(text: str, n: int) -> set:
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class TitleMatcher:
+    def __init__(self, candidates: list, n: int = 3):
+        """
+        ## Parameter:
+        candidates: [(标题, 附加数据)], 同等匹配时靠前的候选优先
+        n: n-gram 长度
+        """
+        self.n = n
+        self.titles = []
+        self.payloads = []
+        self.index = {}
+        for i, (title, payload) in enumerate(candidates):
+            normalized = normalize_title(title)
+            self.titles.append(normalized)
+            self.payloads.append(payload)
+            for gram in ngrams(normalized, n):
+                self.index.setdefault(gram, []).append(i)
+
+    def match(self, query: str, threshold: float = 0.8):
+        """返回与 query 匹配的候选的附加数据, 没有匹配时返回 None.
+
+        ## Parameter:
+        query: 查询标题
+        threshold: 没有子串匹配时, 查询的 n-gram 出现在候选中的最低比例
+        """
+        key = normalize_title(query)
+        grams = ngrams(key, self.n)
+        if not grams:
+            return None
+        counts = {}
+        for gram in grams:
+            for i in self.index.get(gram, ()):
+                counts[i] = counts.get(i, 0) + 1
+
+        # 子串匹配的候选必须包含查询的全部 n-gram
+        full = sorted(i for i, c in counts.items() if c == len(grams))
+        for i in full:
+            if key in self.titles[i]:
+                return self.payloads[i]
+
+        best = None
+        best_score = threshold
+        for i, count in sorted(counts.items()):
+            score = count / len(grams)
+            if score > best_score or (best is None and score >= best_score):
+                best = i
+                best_score = score
+        return self.payloads[best] if best is not None else None
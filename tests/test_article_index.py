@@ -0,0 +1,94 @@
+from llm_tools.search.tokenizer import tokenize
+from llm_tools.tools.article_store import ArticleStore
+from llm_tools.search.article_index import ArticleIndex
+
+def article(url, subject, content):
+    return {"url": url, "subject": subject, "userName": "作者", "date": "2025-01-02", "content": content}
+
+def test_tokenize():
+    assert tokenize("龙头股ABC, 情绪") == ["龙头", "头股", "abc", "情绪"]
+    assert tokenize("涨") == ["涨"]
+    assert tokenize(None) == []
+
+def test_store_skips_unchanged(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.jsonl"))
+    assert len(store.append([article("u1", "标题", "正文")])) == 1
+    assert len(store.append([article("u1", "标题", "正文")])) == 0
+    assert len(store.append([article("u1", "标题", "新正文")])) == 1
+    assert len(ArticleStore(store.filename).hashes) == 1
+
+def test_incremental_search(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.jsonl"))
+    index = ArticleIndex(store)
+    store.append([
+        article("u1", "龙头战法", "短线交易要跟随市场龙头, 控制仓位."),
+        article("u2", "情绪周期", "情绪周期决定仓位, 退潮期空仓."),
+    ])
+    assert index.update() == 2
+
+    result = index.search("龙头")
+    assert result["total"] == 1
+    assert result["items"][0]["url"] == "u1"
+    assert "<em>龙头</em>" in result["items"][0]["snippet"]
+    assert index.search("仓位")["total"] == 2
+
+    store.append([article("u2", "情绪周期", "退潮期也可以关注龙头.")])
+    assert index.update() == 1
+    assert index.update() == 0
+    assert len(index) == 2
+    assert index.search("空仓")["total"] == 0
+    assert index.search("龙头")["items"][0]["url"] == "u1"
+    assert index.search("龙头")["total"] == 2
+
+def test_reappended_article_keeps_positive_scores(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.jsonl"))
+    index = ArticleIndex(store)
+    store.append([article(f"u{i}", f"标题{i}", "情绪周期") for i in range(3)])
+    for i in range(6):
+        store.append([article("hot", f"龙头战法{i}", "跟随市场龙头")])
+    index.update()
+    result = index.search("龙头")
+    assert result["total"] == 1
+    assert result["items"][0]["score"] > 0
+
+    index.compact()
+    assert index.deleted == set()
+    assert len(index.postings["龙头"].doc_ids) == 1
+    assert index.search("龙头")["items"][0]["score"] == result["items"][0]["score"]
+
+def test_crawler_fetches_only_stale(tmp_path, monkeypatch):
+    from llm_tools.crawlers import tgb as tgb_crawler
+    listing = [
+        {"userName": "作者", "subject": "标题1", "url": "u1", "date": "2025-01-02"},
+        {"userName": "作者", "subject": "标题2", "url": "u2", "date": "2025-01-02"},
+    ]
+    fetched = []
+
+    class FakeTaoguba:
+        def get_hot_list(self):
+            return [dict(a) for a in listing]
+        def get_articles(self, articles):
+            fetched.extend(a['url'] for a in articles)
+            for a in articles:
+                a['content'] = "" if a['url'] == "u2" and len(fetched) == 2 else f"{a['subject']}正文"
+            return articles
+        def close(self):
+            pass
+
+    monkeypatch.setattr(tgb_crawler, "Taoguba", FakeTaoguba)
+    store = ArticleStore(str(tmp_path / "articles.jsonl"))
+    crawler = tgb_crawler.TgbCrawler(store)
+    crawler.crawl()
+    assert fetched == ["u1", "u2"]
+    assert [a['content'] for a in crawler.hot_articles] == ["标题1正文", ""]
+
+    # 第二次只重新下载上次失败的和列表信息变化的文章
+    listing[0]["subject"] = "标题1(更新)"
+    crawler.crawl()
+    assert fetched == ["u1", "u2", "u1", "u2"]
+    assert [a['content'] for a in crawler.hot_articles] == ["标题1(更新)正文", "标题2正文"]
+    assert set(crawler.hot_articles[0]) == set(tgb_crawler.HOT_ARTICLE_FIELDS)
+
+    crawler.crawl()
+    assert len(fetched) == 4
+    assert store.get("u1")["subject"] == "标题1(更新)"
@@ -0,0 +1,34 @@
+from datetime import date
+from llm_tools.connector import SQLiteBackend
+from llm_tools.bulk import insert_missing, update_by_key
+
+COLUMNS = ["type", "part_a", "project", "create_date", "url"]
+
+def test_insert_missing_and_update(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "test.db"))
+    connection = backend.get_connection()
+    try:
+        rows = [
+            ("招标公告", "甲方A", "项目1", "2025-01-02", "https://example.com/1"),
+            ("中标公告", "甲方B", "项目2", "2025-01-03", "https://example.com/2"),
+            ("招标公告", "甲方A", "项目1 重复", "2025-01-02", "https://example.com/1"),
+        ]
+        assert insert_missing(connection, "llm_tools.bidding_csg", COLUMNS, rows, batch_size=1) == 2
+
+        rows.append(("招标公告", "甲方C", "项目3", "2025-01-04", "https://example.com/3"))
+        assert insert_missing(connection, "llm_tools.bidding_csg", COLUMNS, rows, batch_size=2) == 1
+
+        updates = [
+            ("summary1", "项目1 更新", "[]", "https://example.com/1"),
+            ("summary3", "项目3", "[1]", "https://example.com/3"),
+        ]
+        assert update_by_key(connection, "llm_tools.bidding_csg", ["summary", "project", "price"], updates, batch_size=1) == 2
+
+        cursor = connection.cursor()
+        cursor.execute("SELECT * FROM llm_tools.bidding_csg WHERE url IN (%s, %s) ORDER BY url",
+                       ("https://example.com/1", "https://example.com/2"))
+        result = cursor.fetchall()
+        assert result[0] == ("项目1 更新", "甲方A", "招标公告", date(2025, 1, 2), "https://example.com/1", "summary1", "[]")
+        assert result[1][5] is None
+    finally:
+        connection.close()
@@ -0,0 +1,49 @@
+import csv
+import time
+import random
+from llm_tools.tools import taoguba
+from llm_tools.utils.rate_limit import RateLimiter
+
+def write_csv(path, count):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["id", "comment"])
+        for i in range(1, count + 1):
+            writer.writerow([i, f"row{i}"])
+
+def test_ordered_and_resumable(tmp_path, monkeypatch):
+    csv_file = str(tmp_path / "comments.csv")
+    write_csv(csv_file, 20)
+    failures = {"row5": 1, "row7": 100}
+
+    def fake_chat(user_prompt, system_prompt=None):
+        time.sleep(random.uniform(0, 0.01))
+        if failures.get(user_prompt, 0) > 0:
+            failures[user_prompt] -= 1
+            raise RuntimeError("接口错误")
+        return f"<dataset>{user_prompt}\n</dataset>"
+
+    monkeypatch.setattr(taoguba, "deepseek_chat", fake_chat)
+    monkeypatch.setattr("llm_tools.utils.retry.time.sleep", lambda _: None)
+    taoguba.generate_tgb_dataset(csv_file, workers=4, retries=1)
+
+    output = tmp_path / "comments.jsonl"
+    expected = [f"row{i}" for i in range(1, 21) if i != 7]
+    assert output.read_text(encoding='utf-8').splitlines() == expected
+    assert 7 not in taoguba.load_checkpoint(str(tmp_path / "comments.checkpoint"))
+
+    # 再次运行只处理上次失败的行
+    failures["row7"] = 0
+    taoguba.generate_tgb_dataset(csv_file, workers=4, ordered=False)
+    assert output.read_text(encoding='utf-8').splitlines() == expected + ["row7"]
+    assert taoguba.load_checkpoint(str(tmp_path / "comments.checkpoint")) == set(range(1, 21))
+
+def test_rate_limiter_waits_for_tokens(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("llm_tools.utils.rate_limit.time.monotonic", lambda: clock[0])
+    monkeypatch.setattr("llm_tools.utils.rate_limit.time.sleep", lambda s: clock.__setitem__(0, clock[0] + s))
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600)
+    limiter.acquire(600)
+    assert clock[0] == 0
+    limiter.acquire(300)
+    assert abs(clock[0] - 30) < 1e-6
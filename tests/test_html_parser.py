@@ -0,0 +1,27 @@
+from bs4 import BeautifulSoup
+from llm_tools.utils.html_parser import parse_html, strainer
+from llm_tools.tools.bidding_csg import NOTICE_ONLY, BiddingParser
+
+NOTICE = """<html><body><div class="nav"><div class="Content">导航</div></div>
+<h1 class="s-title">项目A</h1><div class="s-date extra">2025-01-02</div>
+<div class="Content main"><p>正文<b>加粗</b></p>
+<table><tr><td>标的</td><td>标包名称</td><td>最高限价(万元)</td></tr><tr><td>设备</td><td>包1</td><td>332</td></tr></table></div>
+<script>var x = "<div class='Content'>";</script></body></html>"""
+
+def test_partial_parse_matches_full_parse():
+    full = BeautifulSoup(NOTICE, 'html.parser')
+    for features in ('html.parser', 'lxml'):
+        soup = parse_html(NOTICE, NOTICE_ONLY, features=features)
+        for name, class_ in (('h1', 's-title'), ('div', 's-date'), ('div', 'Content')):
+            assert soup.find(name, class_=class_).text == full.find(name, class_=class_).text
+        assert soup.find('div', class_='nav') is None
+
+def test_strainer_class_tokens():
+    html = '<div class="a b">X</div><div class="ab">Y</div><div class="c">Z</div>'
+    assert parse_html(html, strainer('div', class_='a')).get_text() == "X"
+    assert parse_html(html, strainer('div', class_='a b')).get_text() == "X"
+    assert parse_html(html, strainer('div', class_=['c', 'a'])).get_text() == "XZ"
+
+def test_parse_bid_price():
+    content = str(BeautifulSoup(NOTICE, 'html.parser').find('div', class_='Content main'))
+    assert BiddingParser(content).parse_bid_price() == [{"subject": "设备", "package": "包1", "price": "332"}]
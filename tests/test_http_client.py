@@ -0,0 +1,71 @@
+import httpx
+from llm_tools.utils.http_client import AsyncFetcher, RevalidationCache
+from llm_tools.tools.taoguba import parse_article
+
+PAGES = {
+    "http://tgb.test/a/1": ('"v1"', "<div class='article-text p_coten'>正文一</div>"),
+    "http://tgb.test/a/2": (None, "<div class='article-text p_coten'>正文二</div>"),
+}
+
+def handler(request):
+    url = str(request.url)
+    if url not in PAGES:
+        return httpx.Response(404)
+    etag, body = PAGES[url]
+    if etag is not None and request.headers.get("If-None-Match") == etag:
+        return httpx.Response(304)
+    headers = {"ETag": etag} if etag else {}
+    return httpx.Response(200, content=body.encode("utf-8"), headers=headers)
+
+def test_fetch_all_revalidates(tmp_path):
+    parsed = []
+    def parse(text):
+        parsed.append(text)
+        return parse_article(text)
+
+    fetcher = AsyncFetcher(cache=RevalidationCache(str(tmp_path / "http.db")), transport=httpx.MockTransport(handler))
+    urls = list(PAGES) + ["http://tgb.test/missing"]
+    assert fetcher.run(urls, parse) == ["正文一", "正文二", None]
+    assert len(parsed) == 2
+
+    # 带 ETag 的页面第二次返回 304, 不再下载和解析, 直接使用缓存的解析结果
+    assert fetcher.run(urls, parse) == ["正文一", "正文二", None]
+    assert len(parsed) == 3
+    assert fetcher.stats() == {"requests": 6, "not_modified": 1, "errors": 2}
+
+    # 同一 URL 换用其他解析函数时得到的是该函数的结果, 而不是上次缓存的结果
+    assert fetcher.run(["http://tgb.test/a/1"]) == ["<div class='article-text p_coten'>正文一</div>"]
+    assert fetcher.run(["http://tgb.test/a/1"], len) == [len("<div class='article-text p_coten'>正文一</div>")]
+    assert fetcher.stats()["not_modified"] == 3
+
+def test_hot_list_fetch_failure_raises(monkeypatch):
+    import pytest
+    from llm_tools.tools import taoguba
+    from llm_tools.utils.http_client import FetchError
+
+    class FailingFetcher:
+        def run(self, urls, parse=None):
+            return [None for _ in urls]
+
+    monkeypatch.setattr(taoguba, "get_fetcher", FailingFetcher)
+    with pytest.raises(FetchError):
+        taoguba.Taoguba().get_hot_list()
+
+def test_empty_hot_list_keeps_previous_file(monkeypatch, tmp_path):
+    import pytest
+    from llm_tools.tools import taoguba
+    from llm_tools.crawlers import tgb
+    from llm_tools.utils.http_client import FetchError
+
+    class EmptyFetcher:
+        def run(self, urls, parse=None):
+            return [[] for _ in urls]
+
+    previous = tmp_path / "hot_articles.jsonl"
+    previous.write_text('{"url": "old"}\n', encoding="utf-8")
+    monkeypatch.setattr(taoguba, "get_fetcher", EmptyFetcher)
+    monkeypatch.setattr(tgb, "TGB_DIR", str(tmp_path))
+    monkeypatch.setattr(tgb, "ArticleStore", lambda: None)
+    with pytest.raises(FetchError):
+        tgb.crawl_hot_articles()
+    assert previous.read_text(encoding="utf-8") == '{"url": "old"}\n'
@@ -0,0 +1,124 @@
+import json
+import pytest
+from llm_tools.utils.jsonl import JsonlWriter, read_jsonl, data_file, iter_records
+
+def test_commit_and_resume(tmp_path):
+    filename = str(tmp_path / "notices.jsonl")
+    with pytest.raises(RuntimeError):
+        with JsonlWriter(filename, fsync_every=1) as writer:
+            writer.write({"url": "u1", "title": "公告1"})
+            raise RuntimeError("crash")
+    assert data_file(filename) is None
+
+    # 模拟写了一半的最后一行
+    with open(filename + ".partial", "ab") as outfile:
+        outfile.write(b'{"url": "u2", "ti')
+
+    writer = JsonlWriter(filename, resume=True)
+    assert writer.recovered == 1
+    writer.write({"url": "u3", "title": "公告3"})
+    assert writer.commit() == 2
+    assert [r["url"] for r in read_jsonl(filename)] == ["u1", "u3"]
+    assert not (tmp_path / "notices.jsonl.partial").exists()
+
+def test_legacy_json_fallback(tmp_path):
+    legacy = tmp_path / "notices.json"
+    legacy.write_text(json.dumps([{"url": "u1"}]), encoding="utf-8")
+    filename = data_file(str(tmp_path / "notices.jsonl"))
+    assert filename == str(legacy)
+    assert list(iter_records(filename)) == [{"url": "u1"}]
+
+def test_crawler_writes_in_list_order(tmp_path, monkeypatch):
+    from llm_tools.crawlers import bidding_notification
+
+    class FakeIndex:
+        def add(self, notices, filename=None):
+            return len(list(notices))
+
+    monkeypatch.setattr(bidding_notification, "BIDDING_DIR", str(tmp_path))
+    monkeypatch.setattr(bidding_notification, "get_notice_index", FakeIndex)
+    legacy = tmp_path / "bidding_notice_20250102.json"
+    legacy.write_text(json.dumps([{"url": "old"}, {"url": "u1"}]), encoding="utf-8")
+
+    crawler = bidding_notification.BiddingCrawler("20250102")
+    crawler.open()
+    crawler.deliver(1, {"url": "u2"})
+    crawler.deliver(2, None)
+    crawler.deliver(0, {"url": "u1"})
+    assert crawler.save() == 3
+    assert not legacy.exists()
+    records = read_jsonl(str(tmp_path / "bidding_notice_20250102.jsonl"))
+    assert [r["url"] for r in records] == ["u1", "u2", "old"]
+
+def test_crawler_resume_keeps_newest_first(tmp_path, monkeypatch):
+    from llm_tools.crawlers import bidding_notification
+
+    class FakeIndex:
+        def add(self, notices, filename=None):
+            return len(list(notices))
+
+    monkeypatch.setattr(bidding_notification, "BIDDING_DIR", str(tmp_path))
+    monkeypatch.setattr(bidding_notification, "get_notice_index", FakeIndex)
+    with JsonlWriter(str(tmp_path / "bidding_notice_20250102.jsonl")) as writer:
+        writer.write({"url": "old"})
+
+    # 两次中断: 第一次留下 r1, 第二次留下 r2
+    for url in ("r1", "r2"):
+        crawler = bidding_notification.BiddingCrawler("20250102")
+        crawler.open()
+        crawler.deliver(0, {"url": url})
+        crawler.close()
+
+    crawler = bidding_notification.BiddingCrawler("20250102")
+    crawler.open()
+    assert crawler.recovered_urls == {"r1", "r2"} and "r1" in crawler.seen
+    crawler.deliver(0, {"url": "u1"})
+    assert crawler.save() == 4
+    records = read_jsonl(str(tmp_path / "bidding_notice_20250102.jsonl"))
+    assert [r["url"] for r in records] == ["u1", "r2", "r1", "old"]
+    assert sorted(p.name for p in tmp_path.iterdir() if "bidding_notice" in p.name) == [
+        "bidding_notice_20250102.jsonl", "bidding_notice_20250102.jsonl.lock"]
+
+def test_locked_date_is_left_alone(tmp_path, monkeypatch):
+    import pytest
+    from llm_tools.crawlers import bidding_notification
+
+    monkeypatch.setattr(bidding_notification, "BIDDING_DIR", str(tmp_path))
+    running = bidding_notification.BiddingCrawler("20250102")
+    running.open()
+    running.deliver(0, {"url": "u1"})
+    running.writer.sync()
+    partial = tmp_path / "bidding_notice_20250102.jsonl.partial"
+
+    # 正在写入的日期: 另一个运行不能打开, 恢复时跳过, .partial 文件保持原样
+    with pytest.raises(RuntimeError):
+        bidding_notification.BiddingCrawler("20250102").open()
+    assert bidding_notification.recover_partials() == 0
+    assert partial.exists()
+    assert not (tmp_path / "bidding_notice_20250102.jsonl.recovered").exists()
+
+    running.close()
+    other = bidding_notification.BiddingCrawler("20250102")
+    other.open()
+    assert other.recovered_urls == {"u1"}
+    other.close()
+
+def test_full_crawl_replaces_existing_notices(tmp_path, monkeypatch):
+    from llm_tools.crawlers import bidding_notification
+
+    class FakeIndex:
+        def add(self, notices, filename=None):
+            return len(list(notices))
+
+    monkeypatch.setattr(bidding_notification, "BIDDING_DIR", str(tmp_path))
+    monkeypatch.setattr(bidding_notification, "get_notice_index", FakeIndex)
+    with JsonlWriter(str(tmp_path / "bidding_notice_20250102.jsonl")) as writer:
+        writer.write({"url": "withdrawn"})
+
+    crawler = bidding_notification.BiddingCrawler("20250102", incremental=False)
+    crawler.open()
+    crawler.deliver(0, {"url": "u1"})
+    assert crawler.save() == 1
+    crawler.close()
+    records = read_jsonl(str(tmp_path / "bidding_notice_20250102.jsonl"))
+    assert [r["url"] for r in records] == ["u1"]
@@ -0,0 +1,30 @@
+from llm_tools.tools.llm_cache import LLMCache, cache_key
+
+def test_get_put_and_stats(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.db"), max_age=3600, max_bytes=1024 * 1024, compress=True)
+    assert cache.get("model", "system", "user") is None
+    cache.put("model", "system", "user", "响应内容")
+    assert cache.get("model", "system", "user") == "响应内容"
+    assert cache.get("model", "system", "other") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["entries"] == 1
+
+def test_key_separates_fields():
+    assert cache_key("m", "ab", "c") != cache_key("m", "a", "bc")
+
+def test_evict_by_age_and_size(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.db"), max_age=3600, max_bytes=250, compress=False)
+    for i in range(5):
+        cache.put("model", "system", str(i), "x" * 100)
+    assert cache.get("model", "system", "0") == "x" * 100
+    assert cache.evict() == 3
+    assert cache.get("model", "system", "0") == "x" * 100
+    assert cache.get("model", "system", "4") == "x" * 100
+    assert cache.get("model", "system", "1") is None
+
+    cache.max_age = -1
+    assert cache.get("model", "system", "4") is None
+    assert cache.evict() == 2
@@ -0,0 +1,42 @@
+import json
+import httpx
+from llm_tools.tools.llm_gateway import LLMGateway
+
+def completion(content):
+    return {
+        "id": "1", "object": "chat.completion", "created": 0, "model": "deepseek-chat",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 3, "total_tokens": 13},
+    }
+
+def chunk(content=None, usage=None):
+    choices = [] if content is None else [{"index": 0, "delta": {"content": content}, "finish_reason": None}]
+    return {"id": "1", "object": "chat.completion.chunk", "created": 0, "model": "deepseek-chat",
+            "choices": choices, "usage": usage}
+
+def handler(request):
+    body = json.loads(request.content)
+    if body.get("stream"):
+        events = [chunk("你"), chunk("好"), chunk(usage={"prompt_tokens": 8, "completion_tokens": 2, "total_tokens": 10})]
+        text = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+        return httpx.Response(200, text=text, headers={"content-type": "text/event-stream"})
+    return httpx.Response(200, json=completion("hello"))
+
+def make_gateway():
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    return LLMGateway(api_key="test", base_url="http://llm.test/v1", http_client=client)
+
+def test_complete_records_usage():
+    gateway = make_gateway()
+    assert gateway.complete("hi", "system") == "hello"
+    tokens = []
+    assert gateway.complete("hi", "system", stream=True, on_token=tokens.append) == "你好"
+    assert tokens == ["你", "好"]
+
+    stats = gateway.stats()
+    assert stats["calls"] == 2
+    assert stats["errors"] == 0
+    assert stats["prompt_tokens"] == 18
+    assert stats["completion_tokens"] == 5
+    assert gateway.recent[-1].ttft is not None
+    assert gateway.recent[-1].ttft <= gateway.recent[-1].latency
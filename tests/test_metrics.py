@@ -0,0 +1,83 @@
+from llm_tools import metrics
+
+def test_render_and_push(tmp_path):
+    registry = metrics.Registry()
+    requests = registry.register(metrics.Counter, "test_requests_total", "请求数", ["host"])
+    latency = registry.register(metrics.Histogram, "test_seconds", "耗时", ["host"], buckets=(0.1, 1))
+    requests.inc(host="a")
+    requests.inc(2, host="a")
+    latency.observe(0.05, host="a")
+    latency.observe(0.5, host="a")
+    assert registry.register(metrics.Counter, "test_requests_total", "请求数", ["host"]) is requests
+
+    text = metrics.render([({}, registry.snapshot())])
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{host="a"} 3' in text
+    assert 'test_seconds_bucket{host="a",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{host="a",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{host="a",le="+Inf"} 2' in text
+    assert 'test_seconds_count{host="a"} 2' in text
+
+    metrics.record_job("unit_job", 1.5, items=10)
+    metrics.push("unit_job", str(tmp_path))
+    text = metrics.render_all(str(tmp_path))
+    assert 'job_items{job="unit_job"} 10' in text
+    assert 'job_runs_total{job="unit_job",result="success"} 1' in text
+    assert ',job="unit_job",job=' not in text
+
+    # 在接口进程内调度的任务不合并写入的文件
+    metrics.JOB_RUNS.clear()
+    assert 'job_runs_total{job="unit_job"' not in metrics.render_all(str(tmp_path), skip={"unit_job"})
+    metrics.remove_pushed("unit_job", str(tmp_path))
+    assert metrics.load_pushed(str(tmp_path)) == []
+
+    # 命令行运行以 <任务名>_cli 写入, 任务在接口进程内调度时仍然合并输出
+    metrics.record_job("unit_job_cli", 2.0, items=5)
+    metrics.push("unit_job_cli", str(tmp_path))
+    metrics.JOB_RUNS.clear()
+    text = metrics.render_all(str(tmp_path), skip={"unit_job"})
+    assert 'job_runs_total{job="unit_job_cli",result="success"} 1' in text
+    metrics.remove_pushed("unit_job_cli", str(tmp_path))
+
+def test_merge_snapshots_accumulates_across_runs():
+    def run(ok):
+        registry = metrics.Registry()
+        runs = registry.register(metrics.Counter, "runs_total", "运行次数", ["result"])
+        last = registry.register(metrics.Gauge, "last_success", "最近成功时间")
+        seconds = registry.register(metrics.Histogram, "seconds", "耗时", buckets=(1,))
+        runs.inc(result="success" if ok else "failure")
+        seconds.observe(0.5)
+        if ok:
+            last.set(100)
+        return registry.snapshot()
+
+    merged = metrics.merge_snapshots(run(True), run(False))
+    merged = metrics.merge_snapshots(merged, run(False))
+    assert {tuple(k): v for k, v in merged["runs_total"]["samples"]} == {("success",): 1, ("failure",): 2}
+    assert merged["last_success"]["samples"] == [[[], 100]]
+    assert merged["seconds"]["samples"] == [[[], {"buckets": [3], "sum": 1.5, "count": 3}]]
+
+def test_metrics_endpoint():
+    from fastapi.testclient import TestClient
+    from llm_tools.main import app
+    client = TestClient(app)
+    client.get("/items/1")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'api_request_seconds_count{method="GET",route="/items/{item_id}",status="200"}' in response.text
+
+def test_metrics_records_failed_requests():
+    from fastapi.testclient import TestClient
+    from llm_tools.main import app
+
+    def boom():
+        raise RuntimeError("boom")
+
+    app.add_api_route("/test-boom", boom)
+    try:
+        client = TestClient(app, raise_server_exceptions=False)
+        assert client.get("/test-boom").status_code == 500
+        response = client.get("/metrics")
+    finally:
+        app.router.routes.pop()
+    assert 'api_request_seconds_count{method="GET",route="/test-boom",status="500"}' in response.text
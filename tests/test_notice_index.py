@@ -0,0 +1,51 @@
+import json
+from llm_tools.search.notice_index import NoticeIndex
+
+NOTICES = [
+    {
+        "title": "广东电网有限责任公司2025年信息系统运维服务招标公告",
+        "content": "本项目为信息系统运维服务, 投标人须具备相关资质.",
+        "notice_time": "2025-01-02 10:00:00",
+        "company": "广东电网有限责任公司",
+        "url": "https://example.com/1",
+        "type": "招标公告"
+    },
+    {
+        "title": "南方电网数字平台科技有限公司软件开发服务招标公告",
+        "content": "本项目为软件开发服务.",
+        "notice_time": "2025-01-05 09:30:00",
+        "company": "南方电网数字平台科技有限公司",
+        "url": "https://example.com/2",
+        "type": "招标公告"
+    },
+]
+
+def test_search_and_filters(tmp_path):
+    index = NoticeIndex(str(tmp_path / "index.db"))
+    assert index.add(NOTICES) == 2
+
+    result = index.search(q="运维服务")
+    assert result["total"] == 1
+    assert result["items"][0]["url"] == "https://example.com/1"
+    assert "<em>运维服务</em>" in result["items"][0]["snippet"]
+
+    assert index.search(q="服务")["total"] == 2
+    assert index.search(q="服务", company="数字平台")["total"] == 1
+    assert index.search(date_from="20250103", date_to="20250105")["items"][0]["url"] == "https://example.com/2"
+    assert index.search(type="中标公告")["total"] == 0
+
+    page = index.search(q="招标公告", page=2, page_size=1)
+    assert page["total"] == 2
+    assert len(page["items"]) == 1
+
+def test_upsert_and_sync_dir(tmp_path):
+    index = NoticeIndex(str(tmp_path / "index.db"))
+    filename = tmp_path / "bidding_notice_20250105.json"
+    filename.write_text(json.dumps(NOTICES, ensure_ascii=False), encoding="utf-8")
+    assert index.sync_dir(str(tmp_path)) == 2
+    assert index.sync_dir(str(tmp_path)) == 0
+
+    changed = dict(NOTICES[0], content="本项目为数据中心运维服务.")
+    index.add([changed])
+    assert index.search(q="数据中心")["total"] == 1
+    assert index.search(q="相关资质")["total"] == 0
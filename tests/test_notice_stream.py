@@ -0,0 +1,53 @@
+import json
+from fastapi.testclient import TestClient
+from llm_tools import main
+from llm_tools.utils.jsonl import JsonlWriter
+
+def test_stream_notices_range(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "BIDDING_DIR", str(tmp_path))
+    with JsonlWriter(str(tmp_path / "bidding_notice_20250102.jsonl")) as writer:
+        writer.write({"url": "u1", "title": "公告1", "type": "招标公告"})
+        writer.write({"url": "u2", "title": "公告2", "type": "中标公告"})
+    # 旧版本的整文件 JSON 也能读取
+    (tmp_path / "bidding_notice_20250104.json").write_text(
+        json.dumps([{"url": "u3", "title": "公告3", "type": "招标公告"}]), encoding="utf-8")
+
+    client = TestClient(main.app)
+    response = client.get("/bidding/notices", params={"from": "20250101", "to": "20250105"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [n["url"] for n in lines] == ["u1", "u2", "u3"]
+
+    response = client.get("/bidding/notices", params={"from": "20250101", "to": "20250105",
+                                                      "type": "招标公告", "fields": "url,title"})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [{"url": "u1", "title": "公告1"}, {"url": "u3", "title": "公告3"}]
+
+    # 范围很大时只列一次目录, 不逐日检查文件
+    response = client.get("/bidding/notices", params={"from": "00010101", "to": "99991231", "fields": "url"})
+    assert response.status_code == 200
+    assert [json.loads(line)["url"] for line in response.text.splitlines()] == ["u1", "u2", "u3"]
+
+    assert client.get("/bidding/notices", params={"from": "20250105", "to": "20250101"}).json()["code"] == 400
+    assert client.get("/bidding/notices", params={"from": "2025-01-01", "to": "20250101"}).json()["code"] == 400
+
+def test_large_notice_file_is_streamed(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "BIDDING_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "RESPONSE_STREAM_MIN_SIZE", 1)
+    notices = [{"url": f"u{i}", "title": f"公告{i}"} for i in range(3)]
+    with JsonlWriter(str(tmp_path / "bidding_notice_20250102.jsonl")) as writer:
+        for notice in notices:
+            writer.write(notice)
+
+    client = TestClient(main.app)
+    response = client.get("/bidding/notice/20250102", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == {"code": 200, "data": notices, "msg": "成功."}
+    assert str(tmp_path / "bidding_notice_20250102.jsonl") not in main.response_cache._entries
+
+    etag = response.headers["etag"]
+    response = client.get("/bidding/notice/20250102", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+
+def test_chunks_buffers_small_parts():
+    assert list(main.chunks([b"a" * 10] * 5, size=25)) == [b"a" * 30, b"a" * 20]
@@ -0,0 +1,44 @@
+import os
+from llm_tools.utils.response_cache import FileResponseCache, etag_matches
+
+def test_cache_hit_and_invalidate(tmp_path):
+    filename = tmp_path / "data.json"
+    filename.write_text("[1]")
+    builds = []
+    def build(name):
+        builds.append(name)
+        with open(name, 'rb') as infile:
+            return infile.read()
+
+    cache = FileResponseCache(max_entries=2, check_interval=0)
+    first = cache.get(str(filename), build)
+    second = cache.get(str(filename), build)
+    assert first.body == b"[1]"
+    assert second is first
+    assert len(builds) == 1
+
+    filename.write_text("[1, 2]")
+    os.utime(filename, ns=(first.mtime_ns + 1000, first.mtime_ns + 1000))
+    third = cache.get(str(filename), build)
+    assert third.body == b"[1, 2]"
+    assert third.etag != first.etag
+    assert len(builds) == 2
+
+def test_cache_missing_file_and_lru(tmp_path):
+    cache = FileResponseCache(max_entries=2, check_interval=0)
+    assert cache.get(str(tmp_path / "missing.json"), lambda name: b"") is None
+
+    for i in range(3):
+        (tmp_path / f"{i}.json").write_text(str(i))
+        cache.get(str(tmp_path / f"{i}.json"), lambda name: b"x")
+    assert len(cache._entries) == 2
+    assert str(tmp_path / "0.json") not in cache._entries
+
+def test_etag_matches():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"x", "abc"', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"x"', etag)
+    assert not etag_matches(None, etag)
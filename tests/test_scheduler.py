@@ -0,0 +1,42 @@
+import threading
+from llm_tools.scheduler import Scheduler, Job
+
+def test_single_flight_and_history():
+    release = threading.Event()
+    calls = []
+
+    def slow_job():
+        calls.append(1)
+        release.wait(5)
+        return 3
+
+    def failing_job():
+        raise RuntimeError("boom")
+
+    scheduler = Scheduler(workers=2)
+    scheduler.add(Job('slow', slow_job, jitter=0))
+    scheduler.add(Job('failing', failing_job, jitter=0))
+
+    run, started = scheduler.trigger('slow')
+    assert started
+    again, started = scheduler.trigger('slow')
+    assert not started and again is run
+
+    release.set()
+    failed, _ = scheduler.trigger('failing')
+    scheduler._executor.shutdown(wait=True)
+
+    status = {job['name']: job for job in scheduler.status()}
+    assert calls == [1]
+    assert status['slow']['running'] is None
+    assert status['slow']['history'][0]['status'] == 'success'
+    assert status['slow']['history'][0]['items'] == 3
+    assert status['failing']['history'][0]['status'] == 'failure'
+    assert 'boom' in status['failing']['history'][0]['error']
+
+def test_schedule_next_aligns_to_interval():
+    job = Job('hourly', lambda: None, interval=3600, jitter=0)
+    assert job.schedule_next(now=7200.0) == 10800
+    assert job.schedule_next(now=7300.0) == 10800
+    job = Job('hourly', lambda: None, interval=3600, jitter=60)
+    assert 10800 <= job.schedule_next(now=7300.0) <= 10860
@@ -0,0 +1,42 @@
+from llm_tools.tools.taoguba import extract_comments, strip_tags, crawl_in_contexts, next_page_url
+
+LONG = "长文" * 30
+
+def comment(userid, username, subject, time_text):
+    subject = subject.replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
+    return (f'<div class="reply" subject="{subject}" username=" {username} " userid="{userid}"></div>'
+            f'<div class="comment-data user_{userid} left"><span class="pcyclspan">{time_text}</span></div>')
+
+def page(comments):
+    return f"<html><body>{''.join(comments)}</body></html>"
+
+def test_strip_tags():
+    assert strip_tags(" <p>龙头<br/>战法 &amp; <b>情绪</b></p> ") == "龙头战法 & 情绪"
+    assert strip_tags("仓位<3成, 等回调再加>5成<br>明天看<!-- 注释 -->") == "仓位<3成, 等回调再加>5成明天看"
+
+def test_extract_author_comments():
+    html = page([
+        comment(1, "作者", f"<p>{LONG}</p>", "2025-01-02 10:00"),
+        comment(2, "路人", f"<p>{LONG}</p>", "2025-01-02 11:00"),
+        comment(1, "作者", "太短", "2025-01-02 12:00"),
+    ])
+    assert extract_comments(html, "作者") == [
+        {"subject": LONG, "username": "作者", "comment_time": "2025-01-02 10:00"},
+    ]
+
+def test_crawl_in_contexts_keeps_order_and_drops_failures():
+    def handle(tgb, n):
+        if n == 3:
+            raise RuntimeError("页面加载失败")
+        return n * 10
+
+    results = crawl_in_contexts(list(range(6)), handle, storage_state={}, concurrency=3)
+    assert results == {0: 0, 1: 10, 2: 20, 4: 40, 5: 50}
+
+def test_next_page_url():
+    from llm_tools.utils.html_parser import parse_html
+    base = "https://www.tgb.cn/user/blog/moreTopic?userID=1&pageNo=1"
+    soup = parse_html('<div><a href="moreTopic?userID=1&amp;pageNo=2">下一页</a></div>')
+    assert next_page_url(soup, base) == "https://www.tgb.cn/user/blog/moreTopic?userID=1&pageNo=2"
+    assert next_page_url(parse_html('<a href="javascript:void(0)">下一页</a>'), base) is None
+    assert next_page_url(parse_html('<a href="x">上一页</a>'), base) is None
@@ -0,0 +1,19 @@
+from llm_tools.utils.title_matcher import TitleMatcher
+
+TENDERS = [
+    ("广东电网有限责任公司2025年信息系统运维服务招标公告", "u1"),
+    ("南方电网数字平台科技有限公司2025年软件开发服务框架招标公告", "u2"),
+    ("南方电网数字平台科技有限公司2025年软件开发服务框架(二次)招标公告", "u3"),
+]
+
+def test_substring_match_prefers_first_candidate():
+    matcher = TitleMatcher(TENDERS)
+    award = "南方电网数字平台科技有限公司2025年软件开发服务框架中标候选人公示"
+    assert matcher.match(award[:30]) == "u2"
+
+def test_normalized_and_fuzzy_match():
+    matcher = TitleMatcher(TENDERS)
+    assert matcher.match("广东电网有限责任公司 2025年信息系统运维服务") == "u1"
+    assert matcher.match("广东电网有限责任公司2025年信息系统运维服务项目") == "u1"
+    assert matcher.match("云南电网有限责任公司物资采购") is None
+    assert matcher.match("") is None